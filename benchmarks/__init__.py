@@ -0,0 +1,9 @@
+"""
+Performance benchmarks of neura
+
+    python -m benchmarks run --output results.json
+    python -m benchmarks compare baseline.json results.json
+
+Each scenario trains and evaluates a model on synthetic data (always generated
+with the same seed) and records its throughput, wall time and memory usage
+"""
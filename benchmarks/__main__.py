@@ -0,0 +1,45 @@
+import argparse
+import json
+import sys
+
+from benchmarks import runner
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="neura performance benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the benchmarks")
+    run.add_argument("-o", "--output", help="write the results to this json file")
+    run.add_argument("-k", "--filter", default="*", help="only run the scenarios matching this glob pattern")
+    run.add_argument("-r", "--repeat", type=int, default=3, help="measure each metric this many times (the best is kept)")
+    run.add_argument("--samples", type=int, help="override the number of samples of every scenario")
+
+    compare = commands.add_parser("compare", help="compare two results files")
+    compare.add_argument("baseline", help="results of the reference run")
+    compare.add_argument("current", help="results of the run to check")
+    compare.add_argument("-t", "--threshold", type=float, default=.1,
+                         help="relative change considered a regression (default: 0.1)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        results = runner.run(args.filter, repeat=args.repeat, samples=args.samples)
+        if args.output:
+            runner.save(results, args.output)
+        else:
+            print(json.dumps(results, indent=2))
+        return 0
+
+    rows = runner.compare(runner.load(args.baseline), runner.load(args.current), args.threshold)
+    print(runner.format_comparison(rows))
+
+    regressions = sum(row["regression"] for row in rows)
+    if regressions:
+        print(f"\n{regressions} regression(s) above {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
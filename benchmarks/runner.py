@@ -0,0 +1,174 @@
+"""
+Run the scenarios and compare the results of two runs
+"""
+
+import fnmatch
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+from benchmarks.scenarios import Scenario, all_scenarios
+
+
+# the metrics where a bigger value is better, for all the others smaller is better
+HIGHER_IS_BETTER = {"forward_samples_per_sec", "train_samples_per_sec", "evaluate_samples_per_sec"}
+
+
+def _best_time(function: Callable[[], Any], repeat: int) -> float:
+    # the minimum is the least affected by the noise of the other processes
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def _batches(x: np.ndarray, y: np.ndarray, batch_size: int):
+    for start in range(0, len(x), batch_size):
+        yield x[start:start + batch_size], y[start:start + batch_size]
+
+
+def measure_import_time(repeat: int = 5) -> float:
+    """
+    The time needed to import neura in a new interpreter (minus the interpreter startup)
+    """
+    def run(code: str) -> float:
+        return _best_time(lambda: subprocess.run([sys.executable, "-c", code], check=True), repeat)
+
+    return max(run("import neura") - run("import numpy"), 0.)
+
+
+def run_scenario(scenario: Scenario, repeat: int = 3, samples: Optional[int] = None) -> dict[str, float]:
+    """
+    Measure the performance of a scenario
+    """
+    x, y = scenario.data(samples)
+    batch_size = scenario.batch_size
+    model = scenario.build()
+
+    def forward() -> None:
+        for x_batch, _ in _batches(x, y, batch_size):
+            model.forward(x_batch)
+
+    def train_steps() -> None:
+        for x_batch, y_batch in _batches(x, y, batch_size):
+            model.backward(y_batch, model.forward(x_batch))
+
+    def epoch() -> None:
+        model.train(x, y, batch_size=batch_size, epochs=1, verbose=False)
+
+    def evaluate() -> None:
+        model.evaluate(x, y)
+
+    # the first call of each function may allocate optimizer state and caches
+    forward()
+    epoch()
+
+    result = {
+        "build_time": _best_time(scenario.build, repeat),
+        "forward_samples_per_sec": len(x) / _best_time(forward, repeat),
+        "train_samples_per_sec": len(x) / _best_time(train_steps, repeat),
+        "epoch_time": _best_time(epoch, repeat),
+        "evaluate_samples_per_sec": len(x) / _best_time(evaluate, repeat),
+    }
+
+    tracemalloc.start()
+    try:
+        epoch()
+        result["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return result
+
+
+def run(pattern: str = "*", repeat: int = 3, samples: Optional[int] = None,
+        verbose: bool = True) -> dict[str, Any]:
+    """
+    Run all the scenarios matching `pattern` (a glob pattern on their names)
+    """
+    import neura
+
+    scenarios = [s for s in all_scenarios() if fnmatch.fnmatch(s.name, pattern)]
+    results: dict[str, dict[str, float]] = {}
+
+    for scenario in scenarios:
+        if verbose:
+            print(f"running {scenario.name}...", end=" ", flush=True)
+        results[scenario.name] = run_scenario(scenario, repeat=repeat, samples=samples)
+        if verbose:
+            print(f"{results[scenario.name]['train_samples_per_sec']:.0f} samples/s (train)")
+
+    return {
+        "meta": {
+            "date": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "dtype": np.dtype(neura.utils.floatx()).name,
+            "import_time": measure_import_time(),
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict[str, Any], current: dict[str, Any], threshold: float = .1) -> list[dict[str, Any]]:
+    """
+    Compare the metrics of the scenarios present in both runs.
+
+    Returns one row for each metric, where `regression` is True if the metric
+    got worse by more than `threshold` (relative to the baseline)
+    """
+    rows = []
+    baseline_results = dict(baseline["results"])
+    current_results = dict(current["results"])
+
+    # the import time is compared like any other metric
+    baseline_results["import"] = {"import_time": baseline["meta"]["import_time"]}
+    current_results["import"] = {"import_time": current["meta"]["import_time"]}
+
+    for name, metrics in current_results.items():
+        for metric, value in metrics.items():
+            old = baseline_results.get(name, {}).get(metric)
+            if old is None:
+                continue
+
+            change = (value - old) / old if old else 0.
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            rows.append({
+                "scenario": name,
+                "metric": metric,
+                "baseline": old,
+                "current": value,
+                "change": change,
+                "regression": worse > threshold,
+            })
+
+    return rows
+
+
+def format_comparison(rows: list[dict[str, Any]]) -> str:
+    lines = [f"{'scenario':<24} {'metric':<26} {'baseline':>14} {'current':>14} {'change':>9}"]
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        lines.append(f"{row['scenario']:<24} {row['metric']:<26} {row['baseline']:>14.6g} "
+                     f"{row['current']:>14.6g} {row['change']:>+8.1%}{flag}")
+    return "\n".join(lines)
+
+
+def load(path: str) -> dict[str, Any]:
+    with open(path, "r") as fp:
+        return json.load(fp)
+
+
+def save(results: dict[str, Any], path: str) -> None:
+    with open(path, "w") as fp:
+        json.dump(results, fp, indent=2)
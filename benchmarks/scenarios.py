@@ -0,0 +1,172 @@
+"""
+The models and data used by the benchmarks
+"""
+
+from typing import Any, Callable, Optional
+
+import numpy as np
+import neura
+
+
+class Scenario:
+    """
+    A model to benchmark, with the data it is trained on
+
+    - name:           unique name of the scenario
+    - build:          function creating the (compiled) model
+    - input_shape:    the shape of a sample
+    - targets:        the kind of expected outputs ("regression", "onehot", "binary", "sign")
+    - output_size:    the number of outputs of the model
+    - batch_size:     the batch size used for training and prediction
+    - samples:        the number of samples in the dataset
+    """
+
+    def __init__(self,
+                 name: str,
+                 build: Callable[[], neura.Model],
+                 input_shape: tuple[int, ...],
+                 output_size: int,
+                 batch_size: int = 64,
+                 samples: int = 2048,
+                 targets: str = "regression"
+                 ) -> None:
+        self.name = name
+        self.build = build
+        self.input_shape = input_shape
+        self.output_size = output_size
+        self.batch_size = batch_size
+        self.samples = samples
+        self.targets = targets
+
+    def data(self, samples: Optional[int] = None, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Generate the (x, y) dataset of the scenario
+        """
+        samples = self.samples if samples is None else samples
+        generator = np.random.default_rng(seed)
+        x = generator.random((samples, *self.input_shape))
+
+        if self.targets == "onehot":
+            y = np.eye(self.output_size)[generator.integers(0, self.output_size, samples)]
+        elif self.targets == "binary":
+            y = generator.integers(0, 2, (samples, self.output_size)).astype(np.float64)
+        elif self.targets == "sign":
+            y = generator.choice([-1., 1.], (samples, self.output_size))
+        else:
+            y = generator.standard_normal((samples, self.output_size))
+
+        return x, y
+
+
+def _dense(units: int, **kwargs: Any) -> neura.layers.Dense:
+    # the usual initialization of real models, keeps the activations in a sane range
+    return neura.layers.Dense(units, kernel_initializer="glorot_uniform", bias_initializer="zeros", **kwargs)
+
+
+def _model(layers: list[Any], loss: Optional[neura.losses.Loss] = None, optimizer: str = "sgd") -> neura.Model:
+    model = neura.Model(layers, seed=0)
+    model.compile(loss=loss or neura.losses.MeanSquaredError(), optimizer=optimizer)
+    # the parameters barely move, so that repeated runs do the same work
+    # (a model diverging to inf/nan would not be comparable)
+    model.optimizer.learning_rate = 1e-5
+    return model
+
+
+def _mnist(batch_size: int) -> Scenario:
+    return Scenario(
+        f"mnist-batch{batch_size}",
+        lambda: _model([
+            neura.layers.Flatten(input_shape=(28, 28)),
+            _dense(128, activation="relu"),
+            _dense(10, activation="softmax"),
+        ], neura.losses.CategoricalCrossEntropy(), "adam"),
+        input_shape=(28, 28),
+        output_size=10,
+        batch_size=batch_size,
+        # small batches are slow, keep the benchmark short
+        samples=256 if batch_size < 16 else 2048,
+        targets="onehot",
+    )
+
+
+def _deep_narrow() -> Scenario:
+    return Scenario(
+        "deep-narrow",
+        lambda: _model(
+            [_dense(32, activation="tanh", input_shape=(32,))]
+            + [_dense(32, activation="tanh") for _ in range(15)]
+            + [_dense(1)]
+        ),
+        input_shape=(32,),
+        output_size=1,
+    )
+
+
+def _wide() -> Scenario:
+    return Scenario(
+        "wide",
+        lambda: _model([
+            _dense(2048, activation="relu", input_shape=(512,)),
+            _dense(2048, activation="relu"),
+            _dense(16),
+        ]),
+        input_shape=(512,),
+        output_size=16,
+        batch_size=128,
+        samples=1024,
+    )
+
+
+def _activation(name: str, activation: Callable[[], neura.activation.Activation]) -> Scenario:
+    return Scenario(
+        f"activation-{name}",
+        lambda: _model([
+            _dense(256, activation=activation(), input_shape=(64,)),
+            _dense(8),
+        ]),
+        input_shape=(64,),
+        output_size=8,
+    )
+
+
+def _loss(name: str, loss: Callable[[], neura.losses.Loss], activation: str, targets: str) -> Scenario:
+    return Scenario(
+        f"loss-{name}",
+        lambda: _model([
+            _dense(64, activation="relu", input_shape=(64,)),
+            _dense(8, activation=activation),
+        ], loss()),
+        input_shape=(64,),
+        output_size=8,
+        targets=targets,
+    )
+
+
+def all_scenarios() -> list[Scenario]:
+    """
+    Get all the benchmark scenarios, in the order they are run
+    """
+    activations = neura.activation
+    losses = neura.losses
+
+    return [
+        *(_mnist(batch_size) for batch_size in (1, 16, 64, 256, 1024)),
+        _deep_narrow(),
+        _wide(),
+        _activation("linear", activations.Linear),
+        _activation("sigmoid", activations.Sigmoid),
+        _activation("exponential", activations.Exponential),
+        _activation("relu", activations.ReLu),
+        _activation("leaky-relu", activations.LeakyReLu),
+        _activation("tanh", activations.Tanh),
+        _activation("swish", activations.Swish),
+        _activation("prelu", lambda: activations.PReLU(.1)),
+        _activation("softmax", activations.Softmax),
+        _loss("mae", losses.MeanAbsoluteError, "linear", "regression"),
+        _loss("mse", losses.MeanSquaredError, "linear", "regression"),
+        _loss("bce", losses.BinaryCrossEntropy, "sigmoid", "binary"),
+        _loss("cce", losses.CategoricalCrossEntropy, "softmax", "onehot"),
+        _loss("hinge", losses.HingeLoss, "tanh", "sign"),
+        _loss("logcosh", losses.LogCoshLoss, "linear", "regression"),
+        _loss("huber", losses.HuberLoss, "linear", "regression"),
+    ]
@@ -1,10 +1,15 @@
 from . import (
     activation,
+    callbacks,
+    compression,
     evaluation,
+    initializers,
     layers,
     losses,
     model,
     optimizers,
+    profiling,
+    serving,
     utils
 )
 
@@ -1,4 +1,3 @@
-import math as _math
 import random as _random
 import numpy as np
 from typing import  Optional
@@ -8,7 +7,8 @@ from neura.utils.types import InputValue, OutputValue
 from .base_functions import (
     ParametricFunction,
     ScalarFunction,
-    VectorialFunction
+    VectorialFunction,
+    _output_buffer
 )
 
 
@@ -17,68 +17,94 @@ class Linear(ScalarFunction):
     ## f(x) = x
     """
 
-    def apply_formula(self, x: np.float64) -> np.float64:
-        return x
+    def apply_formula(self, x: InputValue, out: Optional[OutputValue] = None) -> OutputValue:
+        if out is None:
+            return x
+        np.copyto(out, x)
+        return out
     
-    def derivative(self, x: np.float64) -> np.float64:
-        return np.float64(1)
+    def derivative(self, x: InputValue, out: Optional[OutputValue] = None) -> OutputValue:
+        out = _output_buffer(x, out)
+        out.fill(1)
+        return out
         
 class Sigmoid(ScalarFunction):
     """
     ## f(x) = 1 / (1 + e^(-x))
     """
 
-    def apply_formula(self, x: np.float64) -> np.float64:
-        return np.float64(1 / (1 + _math.exp(-x)))
-
-    def derivative(self, x: np.float64) -> np.float64:
-        sigmoid_x = self.apply_formula(x)
-        return x * (1 - sigmoid_x)
+    def apply_formula(self, x: InputValue, out: Optional[OutputValue] = None) -> OutputValue:
+        # computed as (1 + tanh(x / 2)) / 2, which can not overflow for large |x|
+        out = np.multiply(x, .5, out=_output_buffer(x, out))
+        np.tanh(out, out=out)
+        out += 1
+        out *= .5
+        return out
+
+    def derivative(self, x: InputValue, out: Optional[OutputValue] = None) -> OutputValue:
+        # sigmoid(x) * (1 - sigmoid(x)) == (1 - tanh(x / 2)^2) / 4
+        out = np.multiply(x, .5, out=_output_buffer(x, out))
+        np.tanh(out, out=out)
+        np.square(out, out=out)
+        np.subtract(1, out, out=out)
+        out *= .25
+        return out
     
 class Exponential(ScalarFunction):
     """
     ## f(x) = e^(x)
     """
 
-    def apply_formula(self, x: np.float64) -> np.float64:
-        return np.float64(_math.exp(x))
+    def apply_formula(self, x: InputValue, out: Optional[OutputValue] = None) -> OutputValue:
+        return np.exp(x, out=_output_buffer(x, out))
     
-    def derivative(self, x: np.float64) -> np.float64:
-        return np.float64(_math.exp(x))
+    def derivative(self, x: InputValue, out: Optional[OutputValue] = None) -> OutputValue:
+        return np.exp(x, out=_output_buffer(x, out))
 
 class ReLu(ScalarFunction):
     """
     ## f(x) = max(0, x)
     """
 
-    def apply_formula(self, x: np.float64) -> np.float64:
-        return np.float64(max(0, x))
+    def apply_formula(self, x: InputValue, out: Optional[OutputValue] = None) -> OutputValue:
+        return np.maximum(x, 0, out=_output_buffer(x, out))
 
-    def derivative(self, x: np.float64) -> np.float64:
-        return np.float64(0 if x <= 0 else 1)
+    def derivative(self, x: InputValue, out: Optional[OutputValue] = None) -> OutputValue:
+        # 0 if x <= 0 else 1
+        return np.heaviside(x, 0, out=_output_buffer(x, out))
     
 class LeakyReLu(ScalarFunction):
     """
     ## f(x) = max(x, 0.1x)
     """
 
-    def apply_formula(self, x: np.float64) -> np.float64:
-        return max(x, .1 * x)
+    def apply_formula(self, x: InputValue, out: Optional[OutputValue] = None) -> OutputValue:
+        negative = np.less(x, 0, out=self._scratch("negative", np.shape(x), np.bool_))
+        out = _output_buffer(x, out)
+        np.copyto(out, x)
+        np.multiply(out, .1, out=out, where=negative)
+        return out
 
-    def derivative(self, x: np.float64) -> np.float64:
-        return np.float64(1 if x >= 0 else .1)
+    def derivative(self, x: InputValue, out: Optional[OutputValue] = None) -> OutputValue:
+        # 1 if x >= 0 else .1
+        out = np.heaviside(x, 1, out=_output_buffer(x, out))
+        out *= .9
+        out += .1
+        return out
 
 class Tanh(ScalarFunction):
     """
     ## f(x) = tanh(x)
     """
 
-    def apply_formula(self, x: np.float64) -> np.float64:
-        return np.float64(_math.tanh(x))
+    def apply_formula(self, x: InputValue, out: Optional[OutputValue] = None) -> OutputValue:
+        return np.tanh(x, out=_output_buffer(x, out))
 
-    def derivative(self, x: np.float64) -> np.float64:
-        tanh_x = self.apply_formula(x)
-        return 1 - tanh_x ** 2
+    def derivative(self, x: InputValue, out: Optional[OutputValue] = None) -> OutputValue:
+        out = np.tanh(x, out=_output_buffer(x, out))
+        np.square(out, out=out)
+        np.subtract(1, out, out=out)
+        return out
     
 class Swish(ScalarFunction):
     """
@@ -88,11 +114,22 @@ class Swish(ScalarFunction):
         super().__init__()
         self.sigmoid = Sigmoid()
     
-    def apply_formula(self, x: np.float64) -> np.float64:
-        return x * self.sigmoid.apply_formula(x)
-
-    def derivative(self, x: np.float64) -> np.float64:
-        return self.sigmoid.apply_formula(x) + x * self.sigmoid.derivative(x)
+    def apply_formula(self, x: InputValue, out: Optional[OutputValue] = None) -> OutputValue:
+        out = _output_buffer(x, out)
+        sigmoid_x = self.sigmoid.apply_formula(x, out=self._scratch("sigmoid", out.shape, out.dtype))
+        return np.multiply(x, sigmoid_x, out=out)
+
+    def derivative(self, x: InputValue, out: Optional[OutputValue] = None) -> OutputValue:
+        # sigmoid(x) + x * sigmoid'(x) == f(x) * (1 - sigmoid(x)) + sigmoid(x)
+        out = _output_buffer(x, out)
+        sigmoid_x = self.sigmoid.apply_formula(x, out=self._scratch("sigmoid", out.shape, out.dtype))
+        np.multiply(x, sigmoid_x, out=out)
+        # 1 - sigmoid(x), reusing the same buffer
+        complement = np.subtract(1, sigmoid_x, out=sigmoid_x)
+        out *= complement
+        out += 1
+        out -= complement
+        return out
     
 class PReLU (ParametricFunction):
     """
@@ -100,33 +137,50 @@ class PReLU (ParametricFunction):
     """
     def __init__(self, a: Optional[float] = None) -> None:
         super().__init__()
-        self.a: np.float64 = np.float64(a if a else _random.gauss(0, 1))
+        # a python float does not change the floating point type of the arrays
+        self.a: float = float(a if a else _random.gauss(0, 1))
         self.params = {"a": self.a}
 
-    def apply_formula(self, x: np.float64) -> np.float64:
-        if x < 0:
-            return self.a * x
-        return x
+    def apply_formula(self, x: InputValue, out: Optional[OutputValue] = None) -> OutputValue:
+        negative = np.less(x, 0, out=self._scratch("negative", np.shape(x), np.bool_))
+        out = _output_buffer(x, out)
+        np.copyto(out, x)
+        np.multiply(out, self.a, out=out, where=negative)
+        return out
 
-    def derivative(self, x: np.float64) -> np.float64:
-        if x < 0:
-            return self.a
-        return np.float64(1) 
+    def derivative(self, x: InputValue, out: Optional[OutputValue] = None) -> OutputValue:
+        # a if x < 0 else 1
+        out = np.heaviside(x, 1, out=_output_buffer(x, out))
+        out *= 1 - self.a
+        out += self.a
+        return out
 
 class Softmax(VectorialFunction):
     """
     ## Softmax activation function
+
+    The derivative of each output depends on all the inputs, use `gradient()`
+    to backpropagate through it. Followed by `CategoricalCrossEntropy`, the model
+    skips it and computes the gradients of the loss directly with respect to its inputs
     """
-    def __init__(self) -> None:
-        super().__init__()
-        self.differentiable = False
 
-    def apply_formula(self, x: InputValue) -> OutputValue:
-        exp_x = map(lambda i: _math.exp(i), x)
-        sum_exp_x = sum(exp_x)
-        return np.array([j / sum_exp_x for j in exp_x], dtype=np.float64)
+    def apply_formula(self, x: InputValue, out: Optional[OutputValue] = None) -> OutputValue:
+        # shifting by the max does not change the result, but avoids overflows in exp
+        result = np.subtract(x, np.max(x, axis=-1, keepdims=True), out=_output_buffer(x, out))
+        np.exp(result, out=result)
+        np.divide(result, np.sum(result, axis=-1, keepdims=True), out=result)
+        return result
 
-    def derivative(self, x: InputValue) -> OutputValue:
+    def derivative(self, x: InputValue, out: Optional[OutputValue] = None) -> OutputValue:
         # Derivative of softmax is a bit more complex, typically used in cross-entropy loss
-        raise NotImplementedError("Softmax derivative is usually combined with cross-entropy loss")
+        raise NotImplementedError("the derivative of softmax is a matrix, use gradient()")
+
+    def gradient(self, x: InputValue, output_gradients: InputValue, out: Optional[OutputValue] = None) -> OutputValue:
+        # the product of the jacobian of softmax (diag(s) - s s^T) and the gradients,
+        # without building the jacobian: s * (g - sum(g * s))
+        result = self.apply_formula(x, out=out)
+        scratch = self._scratch("gradient", result.shape, result.dtype)
+        weighted = np.sum(np.multiply(output_gradients, result, out=scratch), axis=-1, keepdims=True)
+        result *= np.subtract(output_gradients, weighted, out=scratch)
+        return result
     
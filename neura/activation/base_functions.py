@@ -1,33 +1,53 @@
 import numpy as np
 
 from abc import ABC as _ABC, abstractmethod as _abstractmethod
-from typing import Any
+from typing import Any, Optional
 
 from neura.utils.types import InputValue, OutputValue
+from neura.utils.workspace import Workspace, scratch
 
 class Activation(_ABC):
     """
     Base class for all activation functions
+
+    Activation functions work on whole arrays at once, and can write
+    their result into an existing array passed as `out` (with the same
+    shape as `x`), to avoid allocating a new one. The temporary arrays
+    some functions need go in `workspace`, if set (by the layer using the function)
     """
     
     def __init__(self) -> None:
         self.name = self.__class__.__name__
         self.differentiable: bool = True
+        self.workspace: Optional[Workspace] = None
 
     @_abstractmethod
-    def apply_formula(self, x: Any) -> Any:
+    def apply_formula(self, x: Any, out: Optional[OutputValue] = None) -> Any:
         """
         Apply the formula of the activation function
         """
         ...
     
     @_abstractmethod
-    def derivative(self, x: Any) -> Any:
+    def derivative(self, x: Any, out: Optional[OutputValue] = None) -> Any:
         """
         Calculate the derivative in x
         """
         ...
 
+    def gradient(self, x: InputValue, output_gradients: InputValue, out: Optional[OutputValue] = None) -> OutputValue:
+        """
+        Backpropagate `output_gradients` (the gradients of the loss with respect
+        to f(x)) to get the gradients of the loss with respect to x
+        """
+        gradients: OutputValue = self.derivative(x, out=out)
+        np.multiply(output_gradients, gradients, out=gradients)
+        return gradients
+
+    def _scratch(self, name: str, shape: tuple[int, ...], dtype: Any) -> np.ndarray:
+        # a temporary array, reused between calls if there is a workspace
+        return scratch(self.workspace, "activation_" + name, shape, dtype)
+
 
 class ParametricFunction(Activation):
     """
@@ -36,26 +56,37 @@ class ParametricFunction(Activation):
 
     def __init__(self, *args: list[str], **kwargs: dict[str, str]) -> None:
         super().__init__()
-        self.params: dict[str, np.float64] = {} # param_name: value
+        self.params: dict[str, float] = {} # param_name: value
 
 class ScalarFunction(Activation):
     """
-    Base class for an activation function that takes a single value as input
+    Base class for an activation function that is applied to each value independently
     """
     @_abstractmethod
-    def apply_formula(self, x: np.float64) -> np.float64: ... 
+    def apply_formula(self, x: InputValue, out: Optional[OutputValue] = None) -> OutputValue: ... 
     
     @_abstractmethod
-    def derivative(self, x: np.float64) -> np.float64: ...
+    def derivative(self, x: InputValue, out: Optional[OutputValue] = None) -> OutputValue: ...
 
 class VectorialFunction(Activation):
     """
     Base class for an activation function that takes a vector (ndarray) as input
+
+    The function is applied along the last axis of `x`
     """
     @_abstractmethod
-    def apply_formula(self, x: InputValue) -> OutputValue: ...
+    def apply_formula(self, x: InputValue, out: Optional[OutputValue] = None) -> OutputValue: ...
     
     @_abstractmethod
-    def derivative(self, x: InputValue) -> OutputValue: ...
+    def derivative(self, x: InputValue, out: Optional[OutputValue] = None) -> OutputValue: ...
+
+
+def _output_buffer(x: InputValue, out: Optional[OutputValue]) -> OutputValue:
+    """
+    Get the array where to store the result of a function applied to x
+    """
+    if out is not None:
+        return out
 
-    
\ No newline at end of file
+    x = np.asarray(x)
+    return np.empty(x.shape, dtype=x.dtype if x.dtype.kind == "f" else np.float64)
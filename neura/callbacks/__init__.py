@@ -0,0 +1,7 @@
+"""
+Objects notified at each epoch of `Model.train()`
+"""
+
+from .callback import Callback
+from .early_stopping import EarlyStopping
+from .reduce_lr import ReduceLROnPlateau
@@ -0,0 +1,74 @@
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from neura.model import Model
+
+
+class Callback:
+    """
+    Base class for the callbacks of `Model.train()`, every method does nothing by default.
+
+    `logs` contains the same values that are recorded in the `History` of the training.
+    A callback can end the training by setting `self.model.stop_training = True`
+    """
+
+    def __init__(self) -> None:
+        self.model: Optional["Model"] = None
+
+    def set_model(self, model: "Model") -> None:
+        self.model = model
+
+    def on_train_begin(self, logs: Optional[dict[str, float]] = None) -> None:
+        pass
+
+    def on_train_end(self, logs: Optional[dict[str, float]] = None) -> None:
+        pass
+
+    def on_epoch_begin(self, epoch: int, logs: Optional[dict[str, float]] = None) -> None:
+        pass
+
+    def on_epoch_end(self, epoch: int, logs: Optional[dict[str, float]] = None) -> None:
+        pass
+
+
+class MonitorCallback(Callback):
+    """
+    Base class for the callbacks that watch a value of the logs (like "val_loss")
+
+    - monitor:        the value to watch
+    - mode:           "min" if smaller values are better, "max" if bigger values are better,
+                      "auto" to decide from the name of the value (accuracy is maximized)
+    - min_delta:      the minimum change that counts as an improvement
+    """
+
+    def __init__(self, monitor: str = "val_loss", mode: str = "auto", min_delta: float = 0.) -> None:
+        super().__init__()
+
+        if mode not in ("auto", "min", "max"):
+            raise ValueError("mode must be one of 'auto', 'min' or 'max'")
+
+        if mode == "auto":
+            mode = "max" if "acc" in monitor else "min"
+
+        self.monitor = monitor
+        self.mode = mode
+        self.min_delta = abs(min_delta)
+        self.best = np.inf if mode == "min" else -np.inf
+
+    def reset(self) -> None:
+        self.best = np.inf if self.mode == "min" else -np.inf
+
+    def get_monitor_value(self, logs: Optional[dict[str, float]]) -> float:
+        logs = logs or {}
+        if self.monitor not in logs:
+            hint = " (the validation values need validation_data or validation_split)" if self.monitor.startswith("val_") else ""
+            raise ValueError(f"{type(self).__name__} is monitoring '{self.monitor}', which is not available{hint}. " \
+                             f"available values: {', '.join(logs)}")
+        return logs[self.monitor]
+
+    def is_improvement(self, value: float) -> bool:
+        if self.mode == "min":
+            return value < self.best - self.min_delta
+        return value > self.best + self.min_delta
@@ -0,0 +1,65 @@
+from typing import Optional
+
+from neura.callbacks.callback import MonitorCallback
+from neura.utils.types import NodeWeights
+
+
+class EarlyStopping(MonitorCallback):
+    """
+    Stop training when the monitored value stops improving
+
+    parameters:
+
+    - monitor:                the value to watch (see `History`)
+    - min_delta:              the minimum change that counts as an improvement
+    - patience:               the number of epochs without improvement after which
+                              the training is stopped
+    - mode:                   "min", "max" or "auto" (see `MonitorCallback`)
+    - restore_best_weights:   at the end of training, restore the parameters
+                              of the epoch with the best value
+    """
+
+    def __init__(self,
+                 monitor: str = "val_loss",
+                 min_delta: float = 0.,
+                 patience: int = 0,
+                 mode: str = "auto",
+                 restore_best_weights: bool = False
+                 ) -> None:
+        super().__init__(monitor, mode, min_delta)
+
+        self.patience = patience
+        self.restore_best_weights = restore_best_weights
+        self.wait = 0
+        self.stopped_epoch: Optional[int] = None
+        self.best_epoch: Optional[int] = None
+        self.best_weights: Optional[NodeWeights] = None
+
+    def on_train_begin(self, logs: Optional[dict[str, float]] = None) -> None:
+        self.reset()
+        self.wait = 0
+        self.stopped_epoch = None
+        self.best_epoch = None
+        self.best_weights = None
+
+    def on_epoch_end(self, epoch: int, logs: Optional[dict[str, float]] = None) -> None:
+        assert self.model is not None
+        value = self.get_monitor_value(logs)
+
+        if self.is_improvement(value):
+            self.best = value
+            self.best_epoch = epoch
+            self.wait = 0
+            if self.restore_best_weights:
+                self.best_weights = self.model.get_weights()
+            return
+
+        self.wait += 1
+        if self.wait >= self.patience:
+            self.stopped_epoch = epoch
+            self.model.stop_training = True
+
+    def on_train_end(self, logs: Optional[dict[str, float]] = None) -> None:
+        assert self.model is not None
+        if self.restore_best_weights and self.best_weights is not None:
+            self.model.set_weights(self.best_weights)
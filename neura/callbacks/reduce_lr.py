@@ -0,0 +1,77 @@
+from typing import Optional
+
+from neura.callbacks.callback import MonitorCallback
+
+
+class ReduceLROnPlateau(MonitorCallback):
+    """
+    Reduce the learning rate of the optimizer when the monitored value stops improving
+
+    parameters:
+
+    - monitor:        the value to watch (see `History`)
+    - factor:         the learning rate is multiplied by this factor
+    - patience:       the number of epochs without improvement after which it is reduced
+    - mode:           "min", "max" or "auto" (see `MonitorCallback`)
+    - min_delta:      the minimum change that counts as an improvement
+    - cooldown:       how many epochs to wait after a reduction before counting again
+    - min_lr:         the learning rate is never reduced below this value
+    - verbose:        print a message when the learning rate is reduced
+    """
+
+    def __init__(self,
+                 monitor: str = "val_loss",
+                 factor: float = .1,
+                 patience: int = 10,
+                 mode: str = "auto",
+                 min_delta: float = 1e-4,
+                 cooldown: int = 0,
+                 min_lr: float = 0.,
+                 verbose: bool = False
+                 ) -> None:
+        super().__init__(monitor, mode, min_delta)
+
+        if not 0 < factor < 1:
+            raise ValueError("factor must be between 0 and 1")
+
+        self.factor = factor
+        self.patience = patience
+        self.cooldown = cooldown
+        self.min_lr = min_lr
+        self.verbose = verbose
+        self.wait = 0
+        self.cooldown_counter = 0
+
+    def on_train_begin(self, logs: Optional[dict[str, float]] = None) -> None:
+        self.reset()
+        self.wait = 0
+        self.cooldown_counter = 0
+
+    def on_epoch_end(self, epoch: int, logs: Optional[dict[str, float]] = None) -> None:
+        assert self.model is not None
+        value = self.get_monitor_value(logs)
+
+        if self.cooldown_counter > 0:
+            self.cooldown_counter -= 1
+            self.wait = 0
+
+        if self.is_improvement(value):
+            self.best = value
+            self.wait = 0
+            return
+
+        if self.cooldown_counter > 0:
+            return
+
+        self.wait += 1
+        if self.wait >= self.patience:
+            optimizer = self.model.optimizer
+            learning_rate = max(optimizer.learning_rate * self.factor, self.min_lr)
+
+            if learning_rate < optimizer.learning_rate:
+                optimizer.learning_rate = learning_rate
+                if self.verbose:
+                    print(f"Epoch {epoch + 1}: reducing the learning rate to {learning_rate}")
+
+            self.cooldown_counter = self.cooldown
+            self.wait = 0
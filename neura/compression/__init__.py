@@ -0,0 +1,6 @@
+"""
+Make trained models smaller and faster
+"""
+
+from .pruning import get_sparsity, prune, strip_pruning, to_sparse
+from .quantization import quantize
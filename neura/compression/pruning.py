@@ -0,0 +1,73 @@
+"""
+Magnitude pruning: the weights of Dense layers with the smallest absolute values are
+set to 0 and kept there while the model is fine-tuned (see `Layer.weights_mask`).
+
+```
+prune(model, .9)                # 90% of the weights of each Dense layer become 0
+model.train(x, y, epochs=2)     # fine-tune the remaining weights
+sparse = to_sparse(model)       # Dense layers become SparseDense layers (CSR)
+sparse.save("model.neura")
+```
+"""
+
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+from neura.compression.replace import dense_layers, replace_layers
+from neura.layers import SparseDense
+
+if TYPE_CHECKING:
+    from neura.model.model import Model
+
+
+def prune(model: "Model", sparsity: float, layers: Optional[list[int]] = None) -> None:
+    """
+    Set to 0 the `sparsity` fraction of the weights of each Dense layer with the smallest
+    absolute values (the biases are kept), and keep them at 0 during the following trainings.
+
+    `layers` are the indices of the layers to prune, by default all the Dense layers.
+    Pruning again with a bigger `sparsity` removes more weights (the ones already removed
+    are the smallest)
+    """
+    if not 0 <= sparsity < 1:
+        raise ValueError("sparsity must be in [0, 1)")
+
+    for _, layer in dense_layers(model, layers):
+        count = int(round(sparsity * layer.weights.size))
+        mask = np.ones(layer.weights.shape, dtype=bool)
+        if count:
+            smallest = np.argpartition(np.abs(layer.weights), count - 1, axis=None)[:count]
+            mask.flat[smallest] = False
+
+        layer.weights *= mask
+        layer.weights_mask = mask
+
+
+def strip_pruning(model: "Model") -> None:
+    """
+    Let the training change the pruned weights again (the weights are not changed)
+    """
+    for layer in model.layers:
+        layer.weights_mask = None
+
+
+def get_sparsity(model: "Model", layers: Optional[list[int]] = None) -> float:
+    """
+    The fraction of the weights of the Dense layers (or of `layers`) that are 0
+    """
+    selected = dense_layers(model, layers)
+    total = sum(layer.weights.size for _, layer in selected)
+    if not total:
+        return 0.
+    return sum(layer.weights.size - np.count_nonzero(layer.weights) for _, layer in selected) / total
+
+
+def to_sparse(model: "Model", layers: Optional[list[int]] = None) -> "Model":
+    """
+    Create a copy of `model` where the Dense layers (or `layers`) become SparseDense layers,
+    which only store (and compute with) their nonzero weights. The copy predicts the same values.
+
+    The loss, the optimizer and the metrics are shared with `model`
+    """
+    return replace_layers(model, {i: SparseDense.from_dense(layer) for i, layer in dense_layers(model, layers)})
@@ -0,0 +1,56 @@
+"""
+Post-training quantization: the weights of Dense layers become int8 values with
+one scale for each output unit, the inputs of those layers are quantized with
+the ranges seen on some calibration data (see `neura.layers.QuantizedDense`).
+
+```
+quantized = quantize(model, x_train[:1000])
+quantized.save("model.neura")   # the weights are stored as int8
+```
+"""
+
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+from neura.compression.replace import dense_layers, replace_layers
+from neura.layers import Layer, QuantizedDense
+from neura.profiling import Hook
+from neura.utils.types import InputValue
+
+if TYPE_CHECKING:
+    from neura.model.model import Model
+
+
+class _RangeObserver(Hook):
+    """
+    The smallest and the biggest input of some layers
+    """
+
+    def __init__(self, indices: list[int]) -> None:
+        self.ranges: dict[int, tuple[float, float]] = {i: (np.inf, -np.inf) for i in indices}
+
+    def pre_forward(self, index: int, layer: Layer, x: InputValue) -> None:
+        if index in self.ranges and np.size(x):
+            low, high = self.ranges[index]
+            self.ranges[index] = (min(low, float(np.min(x))), max(high, float(np.max(x))))
+
+
+def quantize(model: "Model", calibration_data: InputValue, layers: Optional[list[int]] = None) -> "Model":
+    """
+    Create a copy of `model` for inference where the Dense layers (or `layers`) become
+    QuantizedDense layers, with int8 weights (per output unit scales) and int32 accumulation.
+
+    `calibration_data` is a batch of typical inputs of the model, used to measure
+    the range of the inputs of each layer
+    """
+    selected = dense_layers(model, layers)
+    observer = _RangeObserver([i for i, _ in selected])
+
+    model.add_hook(observer)
+    try:
+        model.predict(np.asarray(calibration_data), verbose=False)
+    finally:
+        model.remove_hook(observer)
+
+    return replace_layers(model, {i: QuantizedDense.from_dense(layer, observer.ranges[i]) for i, layer in selected})
@@ -0,0 +1,55 @@
+from typing import TYPE_CHECKING, Optional
+
+from neura.layers import Dense, Layer
+
+if TYPE_CHECKING:
+    from neura.model.model import Model
+
+
+def dense_layers(model: "Model", layers: Optional[list[int]]) -> list[tuple[int, Dense]]:
+    """
+    The Dense layers of `model` with their index (only the ones at `layers`, if given)
+    """
+    indices = range(len(model.layers)) if layers is None else layers
+    selected = []
+    for i in indices:
+        layer = model.layers[i]
+        if not isinstance(layer, Dense):
+            if layers is not None:
+                raise ValueError(f"layer {i} ({layer.name}) is not a Dense layer")
+            continue
+        selected.append((i, layer))
+    return selected
+
+
+def replace_layers(model: "Model", layers: dict[int, Layer]) -> "Model":
+    """
+    Create a copy of `model` where the layer at each index of `layers` is replaced
+    by the (built) layer associated to it, with its parameters and its arrays.
+    The other layers keep the parameters of `model`
+
+    The loss, the optimizer and the metrics are shared with `model`
+    """
+    from neura.model.model import Model
+
+    config = model.get_config()
+    arrays = model.get_layer_arrays()
+
+    for i, layer in layers.items():
+        config["layers"][i] = {
+            "module": type(layer).__module__,
+            "class": type(layer).__name__,
+            "config": layer.get_config(),
+        }
+        arrays[i] = layer.get_arrays()
+
+    result = Model.from_config(config, arrays=arrays)
+    for i, new_layer in enumerate(result.layers):
+        source = layers.get(i, model.layers[i])
+        if new_layer.parameter_count:
+            new_layer.weights[...] = source.weights
+            if new_layer.use_bias:
+                new_layer.bias[...] = source.bias
+
+    result.loss, result.optimizer, result.metrics = model.loss, model.optimizer, model.metrics
+    return result
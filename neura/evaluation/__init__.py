@@ -1 +1,8 @@
 from .result import Evaluation
+from .history import History
+from .metrics import (
+    Metric,
+    Accuracy,
+    MeanAbsoluteError,
+    MeanSquaredError
+)
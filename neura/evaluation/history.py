@@ -0,0 +1,40 @@
+from typing import Iterator
+
+
+class History:
+    """
+    What happened in each epoch of `Model.train()`
+
+    `history[key]` is the list of the values of `key` in each epoch, the keys are:
+
+    - loss:               the mean loss on the training batches
+    - <metric>:           the mean of each metric on the training batches
+    - val_loss, val_<metric>: the same, on the validation data (if any)
+    - learning_rate:      the learning rate used in the epoch
+    - time:               the duration of the epoch (in seconds), validation included
+    - samples_per_sec:    the training throughput
+    """
+
+    def __init__(self) -> None:
+        self.epochs: list[int] = []
+        self.history: dict[str, list[float]] = {}
+
+    def record(self, epoch: int, logs: dict[str, float]) -> None:
+        self.epochs.append(epoch)
+        for key, value in logs.items():
+            self.history.setdefault(key, []).append(value)
+
+    def __getitem__(self, key: str) -> list[float]:
+        return self.history[key]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.history
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.history)
+
+    def __len__(self) -> int:
+        return len(self.epochs)
+
+    def __repr__(self) -> str:
+        return f"History(epochs={len(self)}, keys={list(self.history)})"
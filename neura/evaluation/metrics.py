@@ -0,0 +1,73 @@
+"""
+Measures of the quality of the predictions of a model,
+reported during training and by `Model.evaluate()`
+"""
+
+from abc import ABC as _ABC, abstractmethod as _abstractmethod
+from typing import Optional
+
+import numpy as np
+from neura.utils.types import InputValue
+from neura.utils.workspace import Workspace, scratch
+
+
+class Metric(_ABC):
+    """
+    Base class for all metrics
+
+    A metric is computed on a batch, and averaged (weighted by the size
+    of the batches) over all the batches of an epoch.
+    The temporary arrays go in `workspace`, if set (by the model using the metric)
+    """
+
+    def __init__(self, name: Optional[str] = None) -> None:
+        self.name = name or self.__class__.__name__.lower()
+        self.workspace: Optional[Workspace] = None
+
+    @_abstractmethod
+    def __call__(self, y_true: InputValue, y_pred: InputValue) -> float:
+        ...
+
+    def _errors(self, y_true: InputValue, y_pred: InputValue) -> np.ndarray:
+        # y_true - y_pred, in a buffer reused between batches if there is a workspace
+        shape = np.broadcast_shapes(np.shape(y_true), np.shape(y_pred))
+        out = scratch(getattr(self, "workspace", None), "metric_errors", shape, np.result_type(y_true, y_pred))
+        return np.subtract(y_true, y_pred, out=out)
+
+
+class Accuracy(Metric):
+    """
+    The fraction of samples predicted correctly.
+
+    With more than one output, the predicted class is the biggest output,
+    with a single output, the prediction is positive if it is >= `threshold`
+    """
+
+    def __init__(self, threshold: float = .5, name: Optional[str] = "accuracy") -> None:
+        super().__init__(name)
+        self.threshold = threshold
+
+    def __call__(self, y_true: InputValue, y_pred: InputValue) -> float:
+        y_true, y_pred = np.asarray(y_true), np.asarray(y_pred)
+
+        if y_pred.ndim > 1 and y_pred.shape[-1] > 1:
+            return float(np.mean(np.argmax(y_true, axis=-1) == np.argmax(y_pred, axis=-1)))
+        return float(np.mean((y_true >= self.threshold) == (y_pred >= self.threshold)))
+
+
+class MeanAbsoluteError(Metric):
+    def __init__(self, name: Optional[str] = "mae") -> None:
+        super().__init__(name)
+
+    def __call__(self, y_true: InputValue, y_pred: InputValue) -> float:
+        errors = self._errors(y_true, y_pred)
+        return float(np.mean(np.abs(errors, out=errors)))
+
+
+class MeanSquaredError(Metric):
+    def __init__(self, name: Optional[str] = "mse") -> None:
+        super().__init__(name)
+
+    def __call__(self, y_true: InputValue, y_pred: InputValue) -> float:
+        errors = self._errors(y_true, y_pred)
+        return float(np.mean(np.square(errors, out=errors)))
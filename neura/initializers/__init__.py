@@ -0,0 +1,15 @@
+"""
+Available weight initializers
+"""
+
+from .initializers import Initializer
+from .initializers import Constant
+from .initializers import GlorotNormal
+from .initializers import GlorotUniform
+from .initializers import HeNormal
+from .initializers import HeUniform
+from .initializers import Ones
+from .initializers import Orthogonal
+from .initializers import RandomNormal
+from .initializers import RandomUniform
+from .initializers import Zeros
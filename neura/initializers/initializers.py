@@ -0,0 +1,184 @@
+import numpy as np
+
+from abc import ABC as _ABC, abstractmethod as _abstractmethod
+from typing import Any
+
+from neura.utils.types import DType, NodeWeights
+
+
+class Initializer(_ABC):
+    """
+    Base class for all weight initializers
+
+    An initializer fills a whole parameter tensor in one call,
+    drawing random values from the provided generator
+    """
+
+    def __init__(self) -> None:
+        self.name = self.__class__.__name__
+
+    @_abstractmethod
+    def __call__(self, shape: tuple[int, ...], generator: np.random.Generator, dtype: DType) -> NodeWeights:
+        """
+        Create a new array with the given shape and dtype
+        """
+        ...
+
+    def get_config(self) -> dict[str, Any]:
+        """
+        Get the arguments needed to create an identical initializer
+        """
+        return {}
+
+
+def _fans(shape: tuple[int, ...]) -> tuple[int, int]:
+    # weight matrices have shape (input_size, units)
+    if len(shape) == 0:
+        # a scalar: a single input and a single output
+        return 1, 1
+    if len(shape) == 1:
+        return shape[0], shape[0]
+    return shape[0], shape[1]
+
+
+def _uniform(shape: tuple[int, ...], generator: np.random.Generator, dtype: DType, limit: float) -> NodeWeights:
+    # values in [-limit, limit), without temporary arrays
+    values = generator.random(shape, dtype=np.dtype(dtype).type)
+    values *= 2 * limit
+    values -= limit
+    return values
+
+
+def _normal(shape: tuple[int, ...], generator: np.random.Generator, dtype: DType, stddev: float) -> NodeWeights:
+    values = generator.standard_normal(shape, dtype=np.dtype(dtype).type)
+    values *= stddev
+    return values
+
+
+class Constant(Initializer):
+    """
+    ## w = value
+    """
+    def __init__(self, value: float = 0) -> None:
+        super().__init__()
+        self.value = value
+
+    def __call__(self, shape: tuple[int, ...], generator: np.random.Generator, dtype: DType) -> NodeWeights:
+        return np.full(shape, self.value, dtype=dtype)
+
+    def get_config(self) -> dict[str, Any]:
+        return {"value": self.value}
+
+class Zeros(Constant):
+    """
+    ## w = 0
+    """
+    def __init__(self) -> None:
+        super().__init__(0)
+
+    def get_config(self) -> dict[str, Any]:
+        return {}
+
+class Ones(Constant):
+    """
+    ## w = 1
+    """
+    def __init__(self) -> None:
+        super().__init__(1)
+
+    def get_config(self) -> dict[str, Any]:
+        return {}
+
+class RandomUniform(Initializer):
+    """
+    ## w ~ U(minval, maxval)
+    """
+    def __init__(self, minval: float = -1, maxval: float = 1) -> None:
+        super().__init__()
+        self.minval = minval
+        self.maxval = maxval
+
+    def __call__(self, shape: tuple[int, ...], generator: np.random.Generator, dtype: DType) -> NodeWeights:
+        values = generator.random(shape, dtype=np.dtype(dtype).type)
+        values *= self.maxval - self.minval
+        values += self.minval
+        return values
+
+    def get_config(self) -> dict[str, Any]:
+        return {"minval": self.minval, "maxval": self.maxval}
+
+class RandomNormal(Initializer):
+    """
+    ## w ~ N(mean, stddev^2)
+    """
+    def __init__(self, mean: float = 0, stddev: float = 1) -> None:
+        super().__init__()
+        self.mean = mean
+        self.stddev = stddev
+
+    def __call__(self, shape: tuple[int, ...], generator: np.random.Generator, dtype: DType) -> NodeWeights:
+        values = _normal(shape, generator, dtype, self.stddev)
+        values += self.mean
+        return values
+
+    def get_config(self) -> dict[str, Any]:
+        return {"mean": self.mean, "stddev": self.stddev}
+
+class GlorotUniform(Initializer):
+    """
+    ## w ~ U(-sqrt(6 / (fan_in + fan_out)), sqrt(6 / (fan_in + fan_out)))
+    """
+    def __call__(self, shape: tuple[int, ...], generator: np.random.Generator, dtype: DType) -> NodeWeights:
+        fan_in, fan_out = _fans(shape)
+        return _uniform(shape, generator, dtype, np.sqrt(6 / (fan_in + fan_out)))
+
+class GlorotNormal(Initializer):
+    """
+    ## w ~ N(0, 2 / (fan_in + fan_out))
+    """
+    def __call__(self, shape: tuple[int, ...], generator: np.random.Generator, dtype: DType) -> NodeWeights:
+        fan_in, fan_out = _fans(shape)
+        return _normal(shape, generator, dtype, np.sqrt(2 / (fan_in + fan_out)))
+
+class HeUniform(Initializer):
+    """
+    ## w ~ U(-sqrt(6 / fan_in), sqrt(6 / fan_in))
+    """
+    def __call__(self, shape: tuple[int, ...], generator: np.random.Generator, dtype: DType) -> NodeWeights:
+        fan_in, _ = _fans(shape)
+        return _uniform(shape, generator, dtype, np.sqrt(6 / fan_in))
+
+class HeNormal(Initializer):
+    """
+    ## w ~ N(0, 2 / fan_in)
+    """
+    def __call__(self, shape: tuple[int, ...], generator: np.random.Generator, dtype: DType) -> NodeWeights:
+        fan_in, _ = _fans(shape)
+        return _normal(shape, generator, dtype, np.sqrt(2 / fan_in))
+
+class Orthogonal(Initializer):
+    """
+    ## w = gain * Q, where Q is a random orthogonal matrix
+    """
+    def __init__(self, gain: float = 1) -> None:
+        super().__init__()
+        self.gain = gain
+
+    def __call__(self, shape: tuple[int, ...], generator: np.random.Generator, dtype: DType) -> NodeWeights:
+        if len(shape) < 2:
+            raise ValueError("orthogonal initialization requires at least 2 dimensions")
+
+        rows, cols = shape[0], int(np.prod(shape[1:]))
+        values = generator.standard_normal((max(rows, cols), min(rows, cols)))
+
+        # the sign correction makes Q uniformly distributed
+        q, r = np.linalg.qr(values)
+        q *= np.sign(np.diag(r))
+        if rows < cols:
+            q = q.T
+
+        q *= self.gain
+        return q.reshape(shape).astype(dtype, copy=False)
+
+    def get_config(self) -> dict[str, Any]:
+        return {"gain": self.gain}
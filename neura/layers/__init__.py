@@ -7,4 +7,7 @@ from .regularization.dropout import Dropout
 from .reshape.flatten import Flatten
 from .reshape.reshape import Reshape
 from .standard.dense import Dense
+from .standard.embedding import Embedding
 from .standard.input import Input
+from .standard.quantized_dense import QuantizedDense
+from .standard.sparse_dense import SparseDense
@@ -1,15 +1,19 @@
 from typing import Any, Optional, Union
 from abc import ABCMeta as _ABCMeta, abstractmethod as _abstractmethod
-import random as _random
 import numpy as np
 
 import neura.activation as _activation
+import neura.initializers as _initializers
 from neura.nodes import Node
 from neura.losses.loss import Loss as _Loss
-from neura.optimizers.base import Optimizer
-from neura.utils.types import Gradients, InputValue, OutputValue
+from neura.utils.types import Gradients, InputValue, NodeWeight, NodeWeights, OutputValue, floatx
+from neura.utils.workspace import Workspace
 
 Activation = Union[str, _activation.Activation]
+Initializer = Union[str, _initializers.Initializer]
+
+# (weights gradient, bias gradient, input gradient)
+LayerGradients = tuple[Optional[Gradients], Optional[Gradients], Optional[Gradients]]
 
 
 class Layer(metaclass=_ABCMeta):
@@ -23,6 +27,8 @@ class Layer(metaclass=_ABCMeta):
     - activation:     the function used to fire each perceptron of the layer
     - input_shape:    a tuple with the shape of the input for the neural network.
                       if None, then 1 is assumed
+    - kernel_initializer: the initializer used to fill the weight matrix
+    - bias_initializer:   the initializer used to fill the bias vector
     """
 
     def __init__(self,
@@ -30,6 +36,8 @@ class Layer(metaclass=_ABCMeta):
                  bias: Optional[bool] = None,
                  activation: Optional[Activation] = None,
                  input_shape: Optional[tuple[int, ...]] = None,
+                 kernel_initializer: Initializer = "uniform",
+                 bias_initializer: Initializer = "normal",
                  **kwargs: dict[str, Any]
                  ) -> None:
 
@@ -52,6 +60,10 @@ class Layer(metaclass=_ABCMeta):
         # making it difficult for the model to determine the output shape
         self.pass_trough_layer = False
 
+        # layers like Flatten or Dropout have nothing to learn:
+        # they get no weights, and bind nothing into the parameters of the model
+        self.has_parameters = True
+
         # some layers behave differently during training, than they would normaly.
         # for example the Dropout layer becomes transparent if we are not training the model 
         # this flag is automatically set by the model during training.
@@ -59,24 +71,65 @@ class Layer(metaclass=_ABCMeta):
 
         if units < 1:
             raise ValueError("Invalid number of nodes: units < 1")
+
+        self.units = units
         
         if isinstance(activation, _activation.Activation):
-            self.activation = activation
+            function = activation
         
         elif isinstance(activation, str):
-            self.activation = self._get_activation_func(activation)
-            if self.activation is None:
+            function = self._get_activation_func(activation)
+            if function is None:
                 raise ValueError(f"Invaid type for activation: '{activation}'")
         
         elif not activation:
-            self.activation = _activation.Linear()
+            function = _activation.Linear()
             
         else:
             raise ValueError(f"Invaid type activation: {type(activation)} is not (str, Activation, None)")
+
+        self.activation: _activation.Activation = function
         
         self.nodes: list[Node] = []
         self.initialize_nodes(units)
-        self.bias = _random.gauss(mu=0, sigma=1) if bias else 0
+
+        # the parameters of the layer are stored in a single (input_size, units)
+        # weight matrix, where column i holds the weights of the i-th node,
+        # and a bias vector with one value per node.
+        # the weight matrix is allocated by `build()` once the input size is known
+        self.input_size: int | None = None
+        # floating point type of the parameters and of the outputs,
+        # when the layer is added to a model it takes the model's one
+        self.dtype = floatx()
+        self.weights: NodeWeights = np.empty((0, units), dtype=NodeWeight)
+        self.use_bias = bool(bias)
+        self.bias: NodeWeights = np.zeros(units)
+
+        self.kernel_initializer = self._as_initializer(kernel_initializer)
+        self.bias_initializer = self._as_initializer(bias_initializer)
+
+        # gradients computed by the last backward pass, with the same shapes as the parameters
+        self.weights_gradient: Gradients = np.zeros_like(self.weights)
+        self.bias_gradient: Gradients = np.zeros_like(self.bias)
+
+        # the values stored by the last forward pass, needed by `compute_gradients()`
+        # (the input, the weighted sums before the activation and the outputs)
+        self.input: Any = None
+        self.z: Any = None
+        self.outputs: Any = None
+
+        # layers like Embedding only change a few rows of their weights at each step:
+        # their gradients are in `row_gradients` (rows, values), not in `weights_gradient`
+        self.sparse_gradients = False
+        self.row_gradients: tuple[np.ndarray, Gradients] = (np.zeros(0, dtype=np.intp), np.zeros((0, units)))
+
+        # if set (by `neura.compression.prune()`), the weights where the mask is False
+        # stay 0: the model applies the mask again after each optimizer step
+        self.weights_mask: Optional[np.ndarray] = None
+
+        # if set, the outputs and the gradients of each batch are written
+        # into the buffers of the workspace instead of new arrays
+        self._workspace: Optional[Workspace] = None
 
         if input_shape:
             if not isinstance(input_shape, tuple):
@@ -87,6 +140,16 @@ class Layer(metaclass=_ABCMeta):
 
         self.input_shape = input_shape
 
+    @property
+    def workspace(self) -> Optional[Workspace]:
+        return self._workspace
+
+    @workspace.setter
+    def workspace(self, workspace: Optional[Workspace]) -> None:
+        # the activation function keeps its temporary arrays in the same workspace
+        self._workspace = workspace
+        self.activation.workspace = workspace
+
     def initialize_nodes(self, units: int) -> None:
         self.nodes.clear()
 
@@ -98,6 +161,194 @@ class Layer(metaclass=_ABCMeta):
         for _ in range(units):
             self.nodes.append(Node(a_function))
 
+    def build(self,
+              input_size: int,
+              initialize: bool = True,
+              generator: Optional[np.random.Generator] = None
+              ) -> None:
+        """
+        Allocate the weight matrix of the layer for inputs of `input_size` values,
+        and fill the parameters using the initializers of the layer
+
+        if `initialize` is False the parameters are left uninitialized,
+        which is useful when they are going to be replaced anyway.
+        `generator` is the source of randomness for the initializers
+        """
+        if input_size < 1:
+            raise ValueError("Invalid input size: input_size < 1")
+
+        if generator is None:
+            generator = np.random.default_rng()
+
+        self.input_size = input_size
+        shape = (input_size, self.units)
+
+        if not self.has_parameters:
+            self.weights = np.empty((0, self.units), dtype=self.dtype)
+            self.bias = np.zeros(self.units, dtype=self.dtype)
+        elif not initialize:
+            self.weights = np.empty(shape, dtype=self.dtype)
+            self.bias = np.zeros(self.units, dtype=self.dtype)
+        else:
+            self.weights = self.kernel_initializer(shape, generator, self.dtype)
+            if self.use_bias:
+                self.bias = self.bias_initializer((self.units,), generator, self.dtype)
+            else:
+                self.bias = np.zeros(self.units, dtype=self.dtype)
+
+        self.weights_gradient = np.zeros_like(self.weights)
+        self.bias_gradient = np.zeros_like(self.bias)
+        self._bind_nodes()
+
+    @property
+    def parameter_count(self) -> int:
+        """
+        The number of values stored by `bind_parameters()`
+        """
+        if not self.has_parameters:
+            return 0
+        return self.weights.size + (self.bias.size if self.use_bias else 0)
+
+    def bind_parameters(self, parameters: NodeWeights, gradients: Optional[Gradients], copy: bool = True) -> None:
+        """
+        Move the weights and the bias of the layer (and their gradients) into
+        `parameters` and `gradients`, two 1-D arrays of `parameter_count` values.
+        Layers with sparse gradients only bind their parameters (`gradients` is None)
+
+        From now on the parameters of the layer are views into those arrays.
+        if `copy` is False, the current values are not copied, and the layer
+        takes the values already stored in `parameters` and `gradients`
+        """
+        if parameters.shape != (self.parameter_count,) or (gradients is not None and gradients.shape != parameters.shape):
+            raise ValueError(f"expected 1-D arrays of {self.parameter_count} values")
+
+        size = self.weights.size
+        weights_shape = self.weights.shape
+
+        if copy:
+            parameters[:size] = self.weights.ravel()
+        self.weights = parameters[:size].reshape(weights_shape)
+
+        if gradients is not None:
+            if copy:
+                gradients[:size] = self.weights_gradient.ravel()
+            self.weights_gradient = gradients[:size].reshape(weights_shape)
+
+        if self.use_bias:
+            if copy:
+                parameters[size:] = self.bias
+            self.bias = parameters[size:]
+
+            if gradients is not None:
+                if copy:
+                    gradients[size:] = self.bias_gradient
+                self.bias_gradient = gradients[size:]
+
+        self._bind_nodes()
+
+    def get_arrays(self) -> dict[str, np.ndarray]:
+        """
+        Get the arrays of the layer that are not parameters (for example the structure
+        of a sparse weight matrix), they are saved together with the parameters of the model
+        """
+        return {}
+
+    def set_arrays(self, arrays: dict[str, np.ndarray]) -> None:
+        """
+        Restore the arrays returned by `get_arrays()`, once the layer is built
+        """
+        if arrays:
+            raise ValueError(f"{self.name} does not use any array, received: {', '.join(arrays)}")
+
+    def compute_output_shape(self, input_shape: tuple[int, ...]) -> tuple[int, ...]:
+        """
+        Get the shape of the output of the layer, given the shape of its input
+        """
+        if self.output_shape:
+            return self.output_shape
+        # in this case the output shape depends on the number of nodes
+        return (len(self.nodes),)
+
+    def _bind_nodes(self) -> None:
+        # each node sees its own weights as a view into the weight matrix,
+        # so that updating a node updates the layer (and vice versa)
+        for i, node in enumerate(self.nodes):
+            node.weights = self.weights.T[i]
+
+    def get_config(self) -> dict[str, Any]:
+        """
+        Get the arguments needed to create a new (untrained) copy of the layer
+        """
+        activation: dict[str, Any] = {"name": self.activation.__class__.__name__}
+        if isinstance(self.activation, _activation.ParametricFunction):
+            activation["params"] = {k: float(v) for k, v in self.activation.params.items()}
+
+        return {
+            "units": self.units,
+            "bias": self.use_bias,
+            "activation": activation,
+            "input_shape": self.input_shape,
+            "kernel_initializer": self._initializer_config(self.kernel_initializer),
+            "bias_initializer": self._initializer_config(self.bias_initializer),
+        }
+
+    @staticmethod
+    def _initializer_config(initializer: _initializers.Initializer) -> dict[str, Any]:
+        return {"name": initializer.__class__.__name__, "params": initializer.get_config()}
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "Layer":
+        """
+        Create a new layer from the output of `get_config()`
+        """
+        # tuples become lists when the config is stored as json
+        config = {k: tuple(v) if isinstance(v, list) else v for k, v in config.items()}
+
+        activation = config.get("activation")
+        if isinstance(activation, dict):
+            function = getattr(_activation, activation["name"], None)
+            if not isinstance(function, type) or not issubclass(function, _activation.Activation):
+                raise ValueError(f"Invaid activation: '{activation['name']}'")
+            config["activation"] = function(**activation.get("params", {}))
+
+        for key in [key for key in config if key.endswith("_initializer")]:
+            initializer = config[key]
+            if isinstance(initializer, dict):
+                initializer_class = getattr(_initializers, initializer["name"], None)
+                if not isinstance(initializer_class, type) or not issubclass(initializer_class, _initializers.Initializer):
+                    raise ValueError(f"Invalid initializer: '{initializer['name']}'")
+                config[key] = initializer_class(**initializer.get("params", {}))
+
+        return cls(**config)
+
+    def _as_initializer(self, initializer: Initializer) -> _initializers.Initializer:
+        if isinstance(initializer, _initializers.Initializer):
+            return initializer
+
+        if isinstance(initializer, str):
+            func = self._get_initializer(initializer)
+            if func is None:
+                raise ValueError(f"Invalid initializer: '{initializer}'")
+            return func
+
+        raise ValueError(f"Invalid type for initializer: {type(initializer)} is not (str, Initializer)")
+
+    #! temporary
+    def _get_initializer(self, name: str) -> _initializers.Initializer | None:
+        func = {
+            "glorot_normal":    _initializers.GlorotNormal(),
+            "glorot_uniform":   _initializers.GlorotUniform(),
+            "he_normal":        _initializers.HeNormal(),
+            "he_uniform":       _initializers.HeUniform(),
+            "normal":           _initializers.RandomNormal(),
+            "ones":             _initializers.Ones(),
+            "orthogonal":       _initializers.Orthogonal(),
+            "uniform":          _initializers.RandomUniform(),
+            "zeros":            _initializers.Zeros(),
+        }
+
+        return func.get(name.lower(), None)
+
     #! temporary
     def _get_activation_func(self, name: str) -> _activation.Activation | None:
         func = {
@@ -115,7 +366,7 @@ class Layer(metaclass=_ABCMeta):
         return func.get(name.lower(), None)
     
     def __str__(self) -> str:
-        return self.__class__.__name__ + f"(nodes={len(self.nodes)}, bias={self.bias})"
+        return self.__class__.__name__ + f"(nodes={len(self.nodes)}, bias={self.use_bias})"
     
     def __eq__(self, __value: object) -> bool:
         if not isinstance(__value, Layer):
@@ -123,9 +374,8 @@ class Layer(metaclass=_ABCMeta):
         
         return all([
             len(self.nodes) == len(__value.nodes),
-            all([node == __value.nodes[index]
-                for index, node in enumerate(self.nodes)]),
-            self.bias == __value.bias
+            np.array_equal(self.weights, __value.weights),
+            np.array_equal(self.bias, __value.bias)
         ])
 
     @property
@@ -139,9 +389,18 @@ class Layer(metaclass=_ABCMeta):
     def forward(self, x: InputValue) -> OutputValue:
         """
         Evaluate the values to pass to the next layer/output
+
+        `x` is always a batch of samples, with shape (n, *input_shape)
         """
         ...
 
+    def release(self) -> None:
+        """
+        Forget the values stored by the last forward pass (used by activation checkpointing,
+        `forward()` runs again before they are needed by `compute_gradients()`)
+        """
+        self.input = self.z = self.outputs = None
+
     def add_loss(self, func: _Loss) -> None:        
         """
         Add a loss function to the current layer 
@@ -151,21 +410,51 @@ class Layer(metaclass=_ABCMeta):
         
         self.loss = func
 
-    def compute_gradients(self, output_gradients: Gradients) -> list[Gradients]:
-        gradients: list[Gradients] = []
-        for i, node in enumerate(self.nodes):
-            node_gradients = self._compute_node_gradients(
-                node, output_gradients[i]
-            )
-            gradients.append(node_gradients)
-        return gradients
+    def compute_gradients(self,
+                          output_gradients: Gradients,
+                          need_input_gradient: bool = True,
+                          pre_activation: bool = False) -> LayerGradients:
+        """
+        Backpropagate the gradients of the loss with respect to the outputs of the last
+        batch (with shape (n, units)) through the layer
+
+        If `pre_activation` is True, `output_gradients` are already the gradients with
+        respect to the weighted sums (before the activation function), for example when
+        the loss is fused with the activation of the last layer.
+
+        Returns the gradients of the loss with respect to the weight matrix, the bias vector
+        and the inputs of the layer. The input gradient is None if `need_input_gradient` is False.
+        The parameter gradients are also stored in `weights_gradient` and `bias_gradient`
+        """
+        workspace = self.workspace
 
-    def _compute_node_gradients(self, node: Node, output_gradient: np.float64) -> Gradients:
+        if pre_activation:
+            delta = output_gradients
+        else:
+            out = None if workspace is None else workspace.get("delta", self.z.shape, self.z.dtype)
+            delta = self._activation_gradient(output_gradients, out=out)
+
+        # every gradient is summed over all the samples in the batch
+        if self.trainable:
+            np.matmul(self.input.T, delta, out=self.weights_gradient)
+            if self.use_bias:
+                np.sum(delta, axis=0, out=self.bias_gradient)
+        else:
+            # a frozen layer must not be changed by the optimizer
+            self.weights_gradient.fill(0)
+            self.bias_gradient.fill(0)
+
+        input_gradient = None
+        if need_input_gradient:
+            out = None if workspace is None else workspace.get("input_gradient", self.input.shape, delta.dtype)
+            input_gradient = np.matmul(delta, self.weights.T, out=out)
+
+        return self.weights_gradient, self.bias_gradient, input_gradient
+
+    def _activation_gradient(self, output_gradients: Gradients, out: Optional[OutputValue] = None) -> OutputValue:
         if not self.activation:
             raise
 
-        activation_derivative = 0
-    
         # some more complex activation functions are not differentiable
         # (or at least not fully implemented),
         # this means that there is littel chance to know what a change
@@ -173,22 +462,16 @@ class Layer(metaclass=_ABCMeta):
         # the weights don't change as we dont know if the function L(x) 
         # is increasing or decreasing in x)
  
-        if self.activation.differentiable:
-            activation_derivative = self.activation.derivative(node.z)
-        
-        weight_gradient = output_gradient * activation_derivative
-        weight_gradient *= node.input
-        return weight_gradient
+        if not self.activation.differentiable:
+            if out is None:
+                return np.zeros_like(self.z)
+            out.fill(0)
+            return out
+
+        return self.activation.gradient(self.z, output_gradients, out=out)
 
     def _pad_to_match_shape(self, a: InputValue, shape: tuple[int, ...]):
         if a.shape == shape:
             return a
         pad_width = [(0, max(0, s - a_s)) for a_s, s in zip(a.shape, shape)]
         return np.pad(a, pad_width, mode='constant')
-    
-    def update_weights(self, optimizer: Optimizer, gradients: list[Gradients]) -> None:
-        for i, node in enumerate(self.nodes):
-            optimizer.apply_gradients(
-                weights=node.weights,
-                gradients=gradients[i]
-            )
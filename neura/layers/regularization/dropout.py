@@ -2,8 +2,9 @@ from typing import Any
 import numpy as np
 
 from neura.layers import Layer
+from neura.layers.base import LayerGradients
 from neura.layers.exceptional import NotFirstLayer
-from neura.utils.types import InputValue, OutputValue
+from neura.utils.types import Gradients, InputValue, OutputValue
 
 class Dropout(Layer, NotFirstLayer):
 
@@ -11,7 +12,7 @@ class Dropout(Layer, NotFirstLayer):
                  rate: float | np.float64,
                  seed: int | None = None,
                  input_shape: tuple[int, ...] | None = None,
-                 **kwargs: dict[str, Any]
+                 **kwargs: Any
                  ) -> None:
         super().__init__(
             units=1,
@@ -21,10 +22,21 @@ class Dropout(Layer, NotFirstLayer):
             **kwargs
             )
 
+        # with rate=1 every value would be dropped, and the others scaled by 1 / 0
+        if not 0 <= rate < 1:
+            raise ValueError("rate must be in [0, 1)")
+
         self.rate = np.float64(rate)
         self.seed = seed
         self.generator = np.random.Generator(np.random.PCG64(self.seed))
         self.trainable = False
+        self.has_parameters = False
+
+    def get_config(self) -> dict[str, Any]:
+        return {"rate": float(self.rate), "seed": self.seed, "input_shape": self.input_shape}
+
+    def compute_output_shape(self, input_shape: tuple[int, ...]) -> tuple[int, ...]:
+        return input_shape
 
     def forward(self, x: InputValue) -> OutputValue:
         if not isinstance(x, (np.ndarray)):
@@ -34,10 +46,41 @@ class Dropout(Layer, NotFirstLayer):
 
         # outside training this layer becomes transparent
         if not self.training:
+            self.mask = None
             self.outputs = x
             return x
 
-        node_probability = self.generator.normal(0, 1, x.size).reshape(x.shape)
-        self.outputs = np.where(node_probability < self.rate, x * 0, x / (1 - self.rate))
+        # each value is dropped with probability `rate`,
+        # the remaining ones are scaled to keep the same expected sum
+        dtype = x.dtype if x.dtype in (np.float32, np.float64) else np.float64
+        workspace = self.workspace
+
+        if workspace is None:
+            node_probability = self.generator.random(x.shape, dtype=dtype)
+        else:
+            node_probability = self.generator.random(x.shape, dtype=dtype, out=workspace.get("mask", x.shape, dtype))
+
+        self.mask = np.greater_equal(node_probability, self.rate, out=node_probability)
+        self.mask *= 1 / (1 - float(self.rate))
+        self.outputs = np.multiply(x, self.mask, out=None if workspace is None else workspace.get("outputs", x.shape, dtype))
         return self.outputs
 
+    def release(self) -> None:
+        super().release()
+        self.mask = None
+
+    def compute_gradients(self,
+                          output_gradients: Gradients,
+                          need_input_gradient: bool = True,
+                          pre_activation: bool = False) -> LayerGradients:
+        if not need_input_gradient:
+            return None, None, None
+
+        # only the values that were kept contribute to the loss
+        if self.mask is None:
+            input_gradient = output_gradients
+        else:
+            out = None if self.workspace is None else self.workspace.get("input_gradient", self.mask.shape, self.mask.dtype)
+            input_gradient = np.multiply(output_gradients, self.mask, out=out)
+        return None, None, input_gradient
+
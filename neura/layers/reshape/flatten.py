@@ -2,7 +2,9 @@ import numpy as np
 from typing import Any, Optional
 
 from neura.layers import Layer
-from neura.utils.types import InputValue, OutputValue
+from neura.layers.base import LayerGradients
+from neura.layers.standard.input import Input
+from neura.utils.types import Gradients, InputValue, OutputValue
 
 
 class Flatten(Layer):
@@ -15,14 +17,29 @@ class Flatten(Layer):
         )
         
         self.trainable = False
+        self.has_parameters = False
         self.all_input_at_once = True
         self.pass_trough_layer = True
 
+    def get_config(self) -> dict[str, Any]:
+        return {"input_shape": self.input_shape}
+
+    def compute_output_shape(self, input_shape: tuple[int, ...]) -> tuple[int, ...]:
+        return (Input(input_shape),)
+
     def forward(self, x: InputValue) -> OutputValue:
-        self.nodes = [self.nodes[0]]
-        self.nodes[0].weights = np.array([1 for _ in self.nodes[0].weights])
-        
         if not isinstance(x, np.ndarray):
             raise ValueError("expected numpy array, received:", type(x).__name__)
-        return x.flatten()
+
+        self.input = x
+        # keep the batch axis, returns a view whenever possible
+        return x.reshape(x.shape[0], -1)
+
+    def compute_gradients(self,
+                          output_gradients: Gradients,
+                          need_input_gradient: bool = True,
+                          pre_activation: bool = False) -> LayerGradients:
+        # nothing to learn, just give the gradients back their original shape
+        input_gradient = output_gradients.reshape(self.input.shape) if need_input_gradient else None
+        return None, None, input_gradient
 
@@ -1,8 +1,8 @@
 
 
 from typing import Any, Literal
-from neura.layers.base import Layer
-from neura.utils.types import InputValue, OutputValue
+from neura.layers.base import Layer, LayerGradients
+from neura.utils.types import Gradients, InputValue, OutputValue
 
 class Reshape(Layer):
     """
@@ -11,7 +11,7 @@ class Reshape(Layer):
 
     def __init__(self,
                  new_shape: tuple[int, ...],
-                 **kwargs: dict[str, Any]
+                 **kwargs: Any
                  ) -> None:
         super().__init__(
             units=1,
@@ -24,15 +24,27 @@ class Reshape(Layer):
         self.new_shape = new_shape
 
         self.trainable = False
+        self.has_parameters = False
         self.all_input_at_once = True
         # self.pass_trough_layer = True
         self.output_shape = new_shape
 
         self._validate_args()
 
+    def get_config(self) -> dict[str, Any]:
+        return {"new_shape": self.new_shape}
+
     def _validate_args(self) -> None:
         if not isinstance(self.new_shape, tuple) or not "".join([str(i) for i in self.new_shape]).isnumeric():
             raise ValueError("new shape must be a tuple of ints")
         
     def forward(self, x: InputValue) -> OutputValue:
-        return x.reshape(self.new_shape)
+        self.input = x
+        return x.reshape((x.shape[0], *self.new_shape))
+
+    def compute_gradients(self,
+                          output_gradients: Gradients,
+                          need_input_gradient: bool = True,
+                          pre_activation: bool = False) -> LayerGradients:
+        input_gradient = output_gradients.reshape(self.input.shape) if need_input_gradient else None
+        return None, None, input_gradient
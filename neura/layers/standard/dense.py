@@ -8,15 +8,29 @@ class Dense(Layer):
     def __eq__(self, __value: object) -> bool:
         if not isinstance(__value, self.__class__):
             return False
-        return len(self.nodes) == len(__value.nodes) and all([node == __value.nodes[index] for index, node in enumerate(self.nodes)]) and self.bias == __value.bias
+        return super().__eq__(__value)
 
     def forward(self, x: InputValue) -> OutputValue:    
         if not isinstance(x, (np.ndarray)):
             raise ValueError("incompatible type: expected np.ndarray, received:", type(x).__name__)
 
+        # avoid mixing floating point types (no copy if x already has the right one)
+        x = np.asarray(x, dtype=self.dtype)
         self.input = x
-        self.outputs = np.array([node.calc(x) for node in self.nodes])
-        if self.bias:
-            self.outputs += self.bias
-        return self.outputs
 
+        shape = (*x.shape[:-1], self.units)
+        workspace = self.workspace
+
+        # a single matrix product computes the weighted sum of every node
+        z = np.matmul(x, self.weights, out=None if workspace is None else workspace.get("z", shape, self.dtype))
+        if self.use_bias:
+            z += self.bias
+
+        # clip the weighted sums to avoid overflow
+        np.clip(z, -1e10, 1e10, out=z)
+
+        self.z = z
+        self.outputs = self.activation.apply_formula(
+            z, out=None if workspace is None else workspace.get("outputs", shape, self.dtype)
+        )
+        return self.outputs
@@ -0,0 +1,119 @@
+from typing import Any, Optional
+import numpy as np
+
+from neura.layers import Layer
+from neura.layers.base import Initializer, LayerGradients
+from neura.utils.types import Gradients, InputValue, OutputValue
+
+
+class Embedding(Layer):
+    """
+    Map integer ids (in [0, input_dim)) to dense vectors of `output_dim` values.
+
+    The layer holds an (input_dim, output_dim) table, the forward pass gathers the row
+    of each id, and the backward pass only produces the gradients of the rows that were
+    used by the batch (see `row_gradients`), so the optimizer does not touch the others.
+    It is the same as a Dense layer without bias on one-hot encoded ids, without ever
+    building the one-hot vectors.
+
+    parameters:
+
+    - input_dim:      the number of ids (the size of the vocabulary)
+    - output_dim:     the size of each vector
+    - input_shape:    the shape of the ids of each sample, for example (sequence_length,).
+                      the output shape is (*input_shape, output_dim)
+    - embeddings_initializer: the initializer used to fill the table
+    """
+
+    def __init__(self,
+                 input_dim: int,
+                 output_dim: int,
+                 input_shape: Optional[tuple[int, ...]] = None,
+                 embeddings_initializer: Initializer = "uniform",
+                 **kwargs: Any
+                 ) -> None:
+        super().__init__(
+            units=output_dim,
+            bias=False,
+            activation=None,
+            input_shape=input_shape,
+            kernel_initializer=embeddings_initializer,
+            **kwargs
+            )
+
+        if input_dim < 1:
+            raise ValueError("Invalid input_dim: input_dim < 1")
+
+        self.input_dim = input_dim
+        self.output_dim = output_dim
+        # (rows, gradients) in `row_gradients`: the gradients of the rows of the table used by the last batch
+        self.sparse_gradients = True
+
+    def get_config(self) -> dict[str, Any]:
+        return {
+            "input_dim": self.input_dim,
+            "output_dim": self.output_dim,
+            "input_shape": self.input_shape,
+            "embeddings_initializer": self._initializer_config(self.kernel_initializer),
+        }
+
+    def build(self,
+              input_size: int,
+              initialize: bool = True,
+              generator: Optional[np.random.Generator] = None
+              ) -> None:
+        # the table does not depend on the number of ids of each sample
+        super().build(self.input_dim, initialize=initialize, generator=generator)
+        self.input_size = input_size
+        # the gradients of the table are never dense
+        self.weights_gradient = np.zeros((0, self.output_dim), dtype=self.dtype)
+
+    def compute_output_shape(self, input_shape: tuple[int, ...]) -> tuple[int, ...]:
+        return (*input_shape, self.output_dim)
+
+    def forward(self, x: InputValue) -> OutputValue:
+        if not isinstance(x, (np.ndarray)):
+            raise ValueError("incompatible type: expected np.ndarray, received:", type(x).__name__)
+
+        ids = self._as_ids(x)
+        self.input = ids
+
+        out = None if self.workspace is None else self.workspace.get("outputs", (*ids.shape, self.output_dim), self.dtype)
+        self.outputs = np.take(self.weights, ids, axis=0, out=out)
+        return self.outputs
+
+    def _as_ids(self, x: InputValue) -> np.ndarray:
+        if x.dtype.kind in "iu":
+            ids = x
+        elif x.dtype.kind == "f" and np.array_equal(x, np.round(x)):
+            ids = x.astype(np.intp)
+        else:
+            raise ValueError(f"{self.name} expects integer ids, received values of type {x.dtype}")
+
+        if ids.size and (ids.min() < 0 or ids.max() >= self.input_dim):
+            raise ValueError(f"{self.name} received ids outside of [0, {self.input_dim})")
+        return ids
+
+    def compute_gradients(self,
+                          output_gradients: Gradients,
+                          need_input_gradient: bool = True,
+                          pre_activation: bool = False) -> LayerGradients:
+        """
+        Sum the gradients of the vectors of each id used by the last batch into `row_gradients`
+
+        The ids are not differentiable, so there is no input gradient
+        """
+        if not self.trainable:
+            self.row_gradients = (np.zeros(0, dtype=np.intp), np.zeros((0, self.output_dim), dtype=self.dtype))
+            return None, None, None
+
+        # the same id can appear many times in a batch, its gradients are added together
+        rows, inverse = np.unique(self.input.ravel(), return_inverse=True)
+        gradients = np.zeros((len(rows), self.output_dim), dtype=self.dtype)
+        np.add.at(gradients, inverse, np.reshape(output_gradients, (-1, self.output_dim)))
+
+        self.row_gradients = (rows, gradients)
+        return None, None, None
+
+    def __str__(self) -> str:
+        return self.__class__.__name__ + f"(input_dim={self.input_dim}, output_dim={self.output_dim})"
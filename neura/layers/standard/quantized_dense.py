@@ -0,0 +1,167 @@
+from typing import Any, Optional
+import numpy as np
+
+from neura.layers import Layer
+from neura.layers.base import Activation, LayerGradients
+from neura.layers.standard.dense import Dense
+from neura.utils.types import Gradients, InputValue, OutputValue
+
+
+class QuantizedDense(Layer):
+    """
+    A Dense layer for inference, with int8 weights (see `neura.compression.quantize()`)
+
+    Each output unit j has its own scale: its weights are `kernel[:, j] * kernel_scales[j]`.
+    The inputs are quantized to int8 as well, with the range measured on some calibration
+    data (values outside of it are clipped): x ~= (q - input_zero_point) * input_scale.
+    The matrix product is computed on the integers, accumulated in int32, and the weighted
+    sums are converted back to floating point before the bias and the activation.
+
+    Only the bias is a parameter of the model, the int8 `kernel` and the `kernel_scales`
+    are saved with it (see `get_arrays()`). `weights` is empty. The layer can not be trained
+    """
+
+    def __init__(self,
+                 units: int,
+                 bias: Optional[bool] = None,
+                 activation: Optional[Activation] = None,
+                 input_shape: Optional[tuple[int, ...]] = None,
+                 input_scale: float = 1.,
+                 input_zero_point: int = 0,
+                 **kwargs: Any
+                 ) -> None:
+        super().__init__(
+            units=units,
+            bias=bias,
+            activation=activation,
+            input_shape=input_shape,
+            **kwargs
+            )
+
+        if input_scale <= 0:
+            raise ValueError("input_scale must be > 0")
+
+        if not -128 <= input_zero_point <= 127:
+            raise ValueError("input_zero_point must be in [-128, 127]")
+
+        self.input_scale = float(input_scale)
+        self.input_zero_point = int(input_zero_point)
+        self.trainable = False
+
+        self.kernel = np.zeros((0, units), dtype=np.int8)
+        self.kernel_scales = np.ones(units, dtype=np.float32)
+
+    @classmethod
+    def from_dense(cls, layer: Dense, input_range: tuple[float, float]) -> "QuantizedDense":
+        """
+        Create a (built) QuantizedDense layer with the weights of `layer`,
+        for inputs usually in `input_range` (min, max)
+        """
+        # the range always contains 0, so that 0 is exactly representable
+        low, high = min(float(input_range[0]), 0.), max(float(input_range[1]), 0.)
+        input_scale = (high - low) / 255 if high > low else 1.
+        input_zero_point = int(np.clip(np.round(-128 - low / input_scale), -128, 127))
+
+        quantized = cls(layer.units, bias=layer.use_bias, activation=layer.activation, input_shape=layer.input_shape,
+                        input_scale=input_scale, input_zero_point=input_zero_point)
+        quantized.dtype = layer.dtype
+        quantized.build(layer.weights.shape[0], initialize=False)
+
+        # symmetric, one scale for each output unit
+        maximum = np.max(np.abs(layer.weights), axis=0)
+        scales = np.where(maximum > 0, maximum / 127, 1.).astype(np.float32)
+        kernel = np.clip(np.round(layer.weights / scales), -127, 127).astype(np.int8)
+
+        quantized.set_arrays({"kernel": kernel, "kernel_scales": scales})
+        quantized.bias[...] = layer.bias
+        return quantized
+
+    def get_config(self) -> dict[str, Any]:
+        config = super().get_config()
+        config["input_scale"] = self.input_scale
+        config["input_zero_point"] = self.input_zero_point
+        return config
+
+    def build(self,
+              input_size: int,
+              initialize: bool = True,
+              generator: Optional[np.random.Generator] = None
+              ) -> None:
+        if input_size < 1:
+            raise ValueError("Invalid input size: input_size < 1")
+
+        self.input_size = input_size
+        self.weights = np.zeros((0, self.units), dtype=self.dtype)
+        self.bias = np.zeros(self.units, dtype=self.dtype)
+        self.weights_gradient = np.zeros_like(self.weights)
+        self.bias_gradient = np.zeros_like(self.bias)
+
+        self.set_arrays({"kernel": np.zeros((input_size, self.units), dtype=np.int8),
+                         "kernel_scales": np.ones(self.units, dtype=np.float32)})
+        self._bind_nodes()
+
+    def get_arrays(self) -> dict[str, np.ndarray]:
+        return {"kernel": self.kernel, "kernel_scales": self.kernel_scales}
+
+    def set_arrays(self, arrays: dict[str, np.ndarray]) -> None:
+        kernel = np.asarray(arrays["kernel"])
+        kernel_scales = np.asarray(arrays["kernel_scales"], dtype=np.float32)
+
+        if kernel.dtype != np.int8 or kernel.shape != (self.input_size, self.units):
+            raise ValueError(f"expected an int8 kernel of shape ({self.input_size}, {self.units})")
+
+        if kernel_scales.shape != (self.units,):
+            raise ValueError(f"expected {self.units} kernel scales")
+
+        self.kernel = kernel
+        self.kernel_scales = kernel_scales
+
+        # (q - zero_point) @ kernel == q @ kernel - zero_point * sum(kernel)
+        self._zero_point_correction = self.input_zero_point * np.sum(kernel, axis=0, dtype=np.int32)
+        self._output_scales = (self.input_scale * kernel_scales.astype(np.float64)).astype(self.dtype)
+
+    def _bind_nodes(self) -> None:
+        # the nodes have no floating point weights
+        pass
+
+    def forward(self, x: InputValue) -> OutputValue:
+        if not isinstance(x, (np.ndarray)):
+            raise ValueError("incompatible type: expected np.ndarray, received:", type(x).__name__)
+
+        self.input = x
+
+        shape = (*x.shape[:-1], self.units)
+        workspace = self.workspace
+
+        # quantize the inputs
+        q = np.divide(x, self.input_scale, dtype=self.dtype)
+        np.round(q, out=q)
+        q += self.input_zero_point
+        np.clip(q, -128, 127, out=q)
+        q = q.astype(np.int8)
+
+        # integer matrix product, then back to floating point
+        accumulator = np.matmul(q, self.kernel, dtype=np.int32)
+        accumulator -= self._zero_point_correction
+        z = np.multiply(accumulator, self._output_scales,
+                        out=None if workspace is None else workspace.get("z", shape, self.dtype))
+        if self.use_bias:
+            z += self.bias
+
+        # clip the weighted sums to avoid overflow
+        np.clip(z, -1e10, 1e10, out=z)
+
+        self.z = z
+        self.outputs = self.activation.apply_formula(
+            z, out=None if workspace is None else workspace.get("outputs", shape, self.dtype)
+        )
+        return self.outputs
+
+    def compute_gradients(self,
+                          output_gradients: Gradients,
+                          need_input_gradient: bool = True,
+                          pre_activation: bool = False) -> LayerGradients:
+        raise RuntimeError(f"{self.name} can not be trained, train the original model and quantize it again")
+
+    def __str__(self) -> str:
+        return self.__class__.__name__ + f"(nodes={len(self.nodes)}, bias={self.use_bias}, int8)"
@@ -0,0 +1,203 @@
+from typing import Any, Optional
+import numpy as np
+
+from neura.layers import Layer
+from neura.layers.base import Activation, LayerGradients
+from neura.layers.standard.dense import Dense
+from neura.utils.types import Gradients, InputValue, OutputValue
+
+
+class SparseDense(Layer):
+    """
+    A Dense layer whose weight matrix is mostly zeros (for example after
+    `neura.compression.prune()`), stored in CSR format: only the `nonzeros`
+    weights are kept, so memory and operations scale with them instead of
+    with input_size * units.
+
+    The weights of output unit j are `weights[indptr[j]:indptr[j + 1]]`, and they
+    multiply the inputs `indices[indptr[j]:indptr[j + 1]]`. `weights` (the parameters of
+    the layer) holds the nonzero values, `indptr` and `indices` are saved with the model
+    (see `get_arrays()`).
+
+    Use `SparseDense.from_dense()` or `neura.compression.to_sparse()` to create one
+    """
+
+    def __init__(self,
+                 units: int,
+                 nonzeros: int,
+                 bias: Optional[bool] = None,
+                 activation: Optional[Activation] = None,
+                 input_shape: Optional[tuple[int, ...]] = None,
+                 **kwargs: Any
+                 ) -> None:
+        super().__init__(
+            units=units,
+            bias=bias,
+            activation=activation,
+            input_shape=input_shape,
+            **kwargs
+            )
+
+        if nonzeros < 0:
+            raise ValueError("Invalid number of weights: nonzeros < 0")
+
+        self.nonzeros = nonzeros
+        self._set_structure(np.zeros(units + 1, dtype=np.intp), np.zeros(nonzeros, dtype=np.intp))
+
+    @classmethod
+    def from_dense(cls, layer: Dense) -> "SparseDense":
+        """
+        Create a (built) SparseDense layer with the nonzero weights of `layer`
+        """
+        # the rows of the transposed weight matrix are the output units
+        units, inputs = np.nonzero(layer.weights.T)
+        sparse = cls(layer.units, len(units), bias=layer.use_bias, activation=layer.activation,
+                     input_shape=layer.input_shape)
+        sparse.dtype = layer.dtype
+        sparse.build(layer.weights.shape[0], initialize=False)
+
+        indptr = np.zeros(layer.units + 1, dtype=np.intp)
+        np.cumsum(np.bincount(units, minlength=layer.units), out=indptr[1:])
+        sparse.set_arrays({"indptr": indptr, "indices": inputs})
+
+        sparse.weights[...] = layer.weights.T[units, inputs]
+        sparse.bias[...] = layer.bias
+        return sparse
+
+    def get_config(self) -> dict[str, Any]:
+        config = super().get_config()
+        config["nonzeros"] = self.nonzeros
+        return config
+
+    def build(self,
+              input_size: int,
+              initialize: bool = True,
+              generator: Optional[np.random.Generator] = None
+              ) -> None:
+        if input_size < 1:
+            raise ValueError("Invalid input size: input_size < 1")
+
+        if generator is None:
+            generator = np.random.default_rng()
+
+        self.input_size = input_size
+        if initialize:
+            # random values for the current structure (only useful for testing)
+            self.weights = self.kernel_initializer((self.nonzeros,), generator, self.dtype)
+        else:
+            self.weights = np.zeros(self.nonzeros, dtype=self.dtype)
+
+        if initialize and self.use_bias:
+            self.bias = self.bias_initializer((self.units,), generator, self.dtype)
+        else:
+            self.bias = np.zeros(self.units, dtype=self.dtype)
+
+        self.weights_gradient = np.zeros_like(self.weights)
+        self.bias_gradient = np.zeros_like(self.bias)
+        self._check_indices()
+        self._bind_nodes()
+
+    def get_arrays(self) -> dict[str, np.ndarray]:
+        return {"indptr": self.indptr, "indices": self.indices}
+
+    def set_arrays(self, arrays: dict[str, np.ndarray]) -> None:
+        indptr = np.asarray(arrays["indptr"], dtype=np.intp)
+        indices = np.asarray(arrays["indices"], dtype=np.intp)
+
+        if indptr.shape != (self.units + 1,) or indices.shape != (self.nonzeros,):
+            raise ValueError(f"expected indptr of shape ({self.units + 1},) and indices of shape ({self.nonzeros},)")
+
+        if indptr[0] != 0 or indptr[-1] != self.nonzeros or np.any(np.diff(indptr) < 0):
+            raise ValueError("indptr must be non decreasing, from 0 to the number of nonzero weights")
+
+        self._set_structure(indptr, indices)
+        self._check_indices()
+        self._bind_nodes()
+
+    def _set_structure(self, indptr: np.ndarray, indices: np.ndarray) -> None:
+        self.indptr = indptr
+        self.indices = indices
+
+        # np.add.reduceat can not sum empty ranges, only the units with some weights are computed
+        counts = np.diff(indptr)
+        self._units = np.flatnonzero(counts)
+        self._starts = indptr[:-1][self._units]
+        # the unit of each weight
+        self._rows = np.repeat(np.arange(self.units), counts)
+
+        # the same weights, grouped by input (like a CSC matrix), for the input gradient
+        self._by_input = np.argsort(indices, kind="stable")
+        self._inputs, self._input_starts = np.unique(indices[self._by_input], return_index=True)
+
+    def _check_indices(self) -> None:
+        if self.input_size is not None and self.nonzeros and (self.indices.min() < 0 or self.indices.max() >= self.input_size):
+            raise ValueError(f"the indices of {self.name} must be in [0, {self.input_size})")
+
+    def _bind_nodes(self) -> None:
+        # each node sees its nonzero weights
+        for i, node in enumerate(self.nodes):
+            node.weights = self.weights[self.indptr[i]:self.indptr[i + 1]]
+
+    def forward(self, x: InputValue) -> OutputValue:
+        if not isinstance(x, (np.ndarray)):
+            raise ValueError("incompatible type: expected np.ndarray, received:", type(x).__name__)
+
+        x = np.asarray(x, dtype=self.dtype)
+        self.input = x
+
+        shape = (*x.shape[:-1], self.units)
+        workspace = self.workspace
+
+        z = np.zeros(shape, dtype=self.dtype) if workspace is None else workspace.get("z", shape, self.dtype)
+        if workspace is not None and len(self._units) < self.units:
+            z.fill(0)
+
+        # each weight times its input, then the products of each unit are summed
+        if self.nonzeros:
+            products = np.take(x, self.indices, axis=-1)
+            products *= self.weights
+            z[..., self._units] = np.add.reduceat(products, self._starts, axis=-1)
+
+        if self.use_bias:
+            z += self.bias
+
+        # clip the weighted sums to avoid overflow
+        np.clip(z, -1e10, 1e10, out=z)
+
+        self.z = z
+        self.outputs = self.activation.apply_formula(
+            z, out=None if workspace is None else workspace.get("outputs", shape, self.dtype)
+        )
+        return self.outputs
+
+    def compute_gradients(self,
+                          output_gradients: Gradients,
+                          need_input_gradient: bool = True,
+                          pre_activation: bool = False) -> LayerGradients:
+        delta = output_gradients if pre_activation else self._activation_gradient(output_gradients)
+        delta = np.reshape(delta, (-1, self.units))
+        x = np.reshape(self.input, (-1, self.input.shape[-1]))
+
+        # the delta of the unit of each weight
+        weight_deltas = np.take(delta, self._rows, axis=1)
+
+        if self.trainable:
+            np.sum(weight_deltas * np.take(x, self.indices, axis=1), axis=0, out=self.weights_gradient)
+            if self.use_bias:
+                np.sum(delta, axis=0, out=self.bias_gradient)
+        else:
+            self.weights_gradient.fill(0)
+            self.bias_gradient.fill(0)
+
+        input_gradient = None
+        if need_input_gradient:
+            weight_deltas *= self.weights
+            input_gradient = np.zeros_like(x)
+            if self.nonzeros:
+                input_gradient[:, self._inputs] = np.add.reduceat(weight_deltas[:, self._by_input], self._input_starts, axis=1)
+            input_gradient = input_gradient.reshape(self.input.shape)
+
+        return self.weights_gradient, self.bias_gradient, input_gradient
+
+    def __str__(self) -> str:
+        return self.__class__.__name__ + f"(nodes={len(self.nodes)}, nonzeros={self.nonzeros}, bias={self.use_bias})"
@@ -1,7 +1,11 @@
-from typing import Any
+from typing import Any, Literal, Optional
 import numpy as np
 from abc import ABC, abstractmethod
 from neura.utils.types import InputValue, OutputValue
+from neura.utils.workspace import Workspace, scratch
+
+
+Reduction = Literal["mean", "sum", "none"]
 
 
 class Loss(ABC):
@@ -9,13 +13,33 @@ class Loss(ABC):
     Base class for all loss functions
 
     All classes that inherit this class have to redefine the methods `compute()` and `derivative()`
+
+    Losses work on batches: the first axis of `y_true` and `y_pred` is the batch axis
+    (a 1-D array is a single sample). The loss of each sample is averaged over its values,
+    then the losses of the samples are combined according to `reduction`:
+
+    - "mean":   the (weighted) losses are averaged over the batch (the default)
+    - "sum":    the (weighted) losses are summed
+    - "none":   the loss of each sample is returned, with shape (n,)
+
+    `sample_weight` (with shape (n,)) scales the loss of each sample
+
+    The temporary arrays with the loss of each value go in `workspace`,
+    if set (by the model using the loss)
     """
 
-    def __init__(self) -> None:
-        pass
+    def __init__(self, reduction: Reduction = "mean") -> None:
+        if reduction not in ("mean", "sum", "none"):
+            raise ValueError(f"Invalid reduction: '{reduction}' (expected 'mean', 'sum' or 'none')")
+
+        self.reduction = reduction
+        self.workspace: Optional[Workspace] = None
 
     @abstractmethod
-    def compute(self, y_true: InputValue, y_pred: InputValue) -> np.float64:
+    def compute(self,
+                y_true: InputValue,
+                y_pred: InputValue,
+                sample_weight: Optional[InputValue] = None) -> np.float64 | OutputValue:
         """
         Compute the cost of the batch
 
@@ -25,17 +49,24 @@ class Loss(ABC):
             The true values.
         y_pred: np.ndarray
             The predicted values.
+        sample_weight: np.ndarray, optional
+            The weight of each sample.
 
         Returns
         -------
         out: np.float64
-            The computed cost of the batch (loss).
+            The computed cost of the batch (loss), or the cost of each sample if
+            `reduction` is "none".
         """
         raise NotImplementedError(
             "This method needs to be implement in a subclass")
 
     @abstractmethod
-    def derivative(self, y_true: InputValue, y_pred: InputValue) -> OutputValue:
+    def derivative(self,
+                   y_true: InputValue,
+                   y_pred: InputValue,
+                   sample_weight: Optional[InputValue] = None,
+                   out: Optional[OutputValue] = None) -> OutputValue:
         """
         Compute the derivative
 
@@ -45,34 +76,103 @@ class Loss(ABC):
             The true values.
         y_pred: np.ndarray
             The predicted values.
+        sample_weight: np.ndarray, optional
+            The weight of each sample.
+        out: np.ndarray, optional
+            A buffer with the shape of `y_pred` where the derivative is written.
 
         Returns
         -------
         out: np.ndarray
-            The derivative computed in y_pred.
+            The derivative computed in y_pred. With `reduction="none"` each sample
+            gets the derivative of its own loss.
         """
         raise NotImplementedError(
             "This method needs to be implement in a subclass")
 
+    def reduce(self, values: InputValue, sample_weight: Optional[InputValue] = None,
+               scale: float = 1.) -> np.float64 | OutputValue:
+        """
+        Combine the loss of each value of the batch into the loss of each sample
+        (their mean times `scale`), then into the loss of the batch according to `reduction`
+        """
+        values = np.asarray(values)
+        samples = _batch_size(values)
+        losses = np.mean(np.reshape(values, (samples, -1)), axis=1)
+        if scale != 1:
+            losses *= scale
+
+        if sample_weight is not None:
+            losses *= _sample_weight(sample_weight, samples)
+
+        if self.reduction == "none":
+            return losses
+        elif self.reduction == "sum":
+            return np.sum(losses)
+        return np.sum(losses) / samples
+
+    def scale_gradient(self, gradient: OutputValue, sample_weight: Optional[InputValue] = None,
+                       scale: float = 1.) -> OutputValue:
+        """
+        Turn (in place) the derivative of the loss of each value into the derivative
+        of the loss of the batch (see `reduce()`)
+        """
+        samples = _batch_size(gradient)
+        factor = scale * samples / max(np.size(gradient), 1)
+        if self.reduction == "mean":
+            factor /= samples
+
+        gradient *= factor
+        if sample_weight is not None:
+            weight = _sample_weight(sample_weight, samples)
+            gradient *= np.reshape(weight, (samples,) + (1,) * (np.ndim(gradient) - 1))
+        return gradient
 
     def __call__(self, *args: Any, **kwargs: Any):
         return self.compute(*args, **kwargs)
 
+    def _scratch(self, name: str, y_true: InputValue, y_pred: InputValue) -> OutputValue:
+        # a temporary array for the loss of each value, reused between batches if there is a workspace
+        shape = np.broadcast_shapes(np.shape(y_true), np.shape(y_pred))
+        return scratch(getattr(self, "workspace", None), "loss_" + name, shape, np.result_type(y_true, y_pred))
+
 class ParametricLoss(Loss):
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
 
 
+def _epsilon(dtype: np.dtype[Any]) -> float:
+    # the smallest value that can be safely used to avoid calculating log(0)
+    return max(1e-15, float(np.finfo(dtype).eps))
+
+
+def _batch_size(values: InputValue) -> int:
+    # the first axis is the batch axis, a single sample is a batch of 1
+    return np.shape(values)[0] if np.ndim(values) > 1 else 1
+
+
+def _sample_weight(sample_weight: InputValue, samples: int) -> OutputValue:
+    sample_weight = np.asarray(sample_weight)
+    if sample_weight.size != samples:
+        raise ValueError(f"expected one weight for each of the {samples} samples, got shape {sample_weight.shape}")
+    return np.reshape(sample_weight, (samples,))
+
+
 class MeanAbsoluteError(Loss):
     """
     Mean Absolute Error (MAE)
     """
 
-    def compute(self, y_true: InputValue, y_pred: InputValue) -> np.float64:
-        return np.mean(np.abs(y_true - y_pred))
+    def compute(self, y_true: InputValue, y_pred: InputValue,
+                sample_weight: Optional[InputValue] = None) -> np.float64 | OutputValue:
+        values = np.subtract(y_true, y_pred, out=self._scratch("values", y_true, y_pred))
+        return self.reduce(np.abs(values, out=values), sample_weight)
 
-    def derivative(self, y_true: InputValue, y_pred: InputValue) -> OutputValue:
-        return np.where(y_pred > y_true, 1, -1) / y_true.size
+    def derivative(self, y_true: InputValue, y_pred: InputValue,
+                   sample_weight: Optional[InputValue] = None, out: Optional[OutputValue] = None) -> OutputValue:
+        out = np.subtract(y_pred, y_true, out=out)
+        np.sign(out, out=out)
+        return self.scale_gradient(out, sample_weight)
 
 
 class MeanSquaredError(Loss):
@@ -80,11 +180,15 @@ class MeanSquaredError(Loss):
     Mean Squared Error (MSE)
     """
 
-    def compute(self, y_true: InputValue, y_pred: InputValue) -> np.float64:
-        return np.mean((y_true - y_pred) ** 2)
+    def compute(self, y_true: InputValue, y_pred: InputValue,
+                sample_weight: Optional[InputValue] = None) -> np.float64 | OutputValue:
+        values = np.subtract(y_true, y_pred, out=self._scratch("values", y_true, y_pred))
+        return self.reduce(np.square(values, out=values), sample_weight)
 
-    def derivative(self, y_true: InputValue, y_pred: InputValue) -> OutputValue:
-        return (2 * (y_pred - y_true)) / y_true.size
+    def derivative(self, y_true: InputValue, y_pred: InputValue,
+                   sample_weight: Optional[InputValue] = None, out: Optional[OutputValue] = None) -> OutputValue:
+        out = np.subtract(y_pred, y_true, out=out)
+        return self.scale_gradient(out, sample_weight, scale=2)
 
 
 class BinaryCrossEntropy(Loss):
@@ -92,29 +196,113 @@ class BinaryCrossEntropy(Loss):
     Binary Cross-Entropy Loss function (Log Loss)
     """
 
-    def compute(self, y_true: InputValue, y_pred: InputValue) -> np.float64:
+    def compute(self, y_true: InputValue, y_pred: InputValue,
+                sample_weight: Optional[InputValue] = None) -> np.float64 | OutputValue:
         # ? avoid calculating log(0)
-        y_pred = np.clip(y_pred, 1e-15, 1 - 1e-15)
-        return -np.mean(y_true * np.log(y_pred) + (1 - y_true) * np.log(1 - y_pred))
-
-    def derivative(self, y_true: InputValue, y_pred: InputValue) -> OutputValue:
-        y_pred = np.clip(y_pred, 1e-15, 1 - 1e-15)
-        return (y_pred - y_true) / (y_pred * (1 - y_pred) * y_true.size)
+        epsilon = _epsilon(y_pred.dtype)
+        clipped = np.clip(y_pred, epsilon, 1 - epsilon, out=self._scratch("clipped", y_true, y_pred))
+
+        # y * log(p) + (1 - y) * log(1 - p), computed in place
+        values = np.log(clipped, out=self._scratch("values", y_true, y_pred))
+        values *= y_true
+        log_complement = np.log(np.subtract(1, clipped, out=clipped), out=clipped)
+        values += log_complement
+        log_complement *= y_true
+        values -= log_complement
+        return self.reduce(np.negative(values, out=values), sample_weight)
+
+    def derivative(self, y_true: InputValue, y_pred: InputValue,
+                   sample_weight: Optional[InputValue] = None, out: Optional[OutputValue] = None) -> OutputValue:
+        epsilon = _epsilon(y_pred.dtype)
+        y_pred = np.clip(y_pred, epsilon, 1 - epsilon)
+        out = np.subtract(y_pred, y_true, out=out)
+        out /= y_pred * (1 - y_pred)
+        return self.scale_gradient(out, sample_weight)
+
+
+def _softmax(logits: InputValue, out: Optional[OutputValue] = None) -> OutputValue:
+    result = np.subtract(logits, np.max(logits, axis=-1, keepdims=True), out=out)
+    np.exp(result, out=result)
+    np.divide(result, np.sum(result, axis=-1, keepdims=True), out=result)
+    return result
 
 
 class CategoricalCrossEntropy(Loss):
     """
     Categorical Cross-Entropy Loss function
+
+    The loss of each sample is summed over the classes (the last axis), instead of being averaged.
+
+    if `from_logits` is True, `y_pred` are the logits (the values softmax would be applied to)
+    instead of probabilities: the loss is then computed with log-sum-exp, which is exact
+    even when some probabilities would be rounded to 0
     """
 
-    def compute(self, y_true: InputValue, y_pred: InputValue) -> np.float64:
+    def __init__(self, from_logits: bool = False, reduction: Reduction = "mean") -> None:
+        super().__init__(reduction)
+        self.from_logits = from_logits
+
+    def compute(self, y_true: InputValue, y_pred: InputValue,
+                sample_weight: Optional[InputValue] = None) -> np.float64 | OutputValue:
+        if self.from_logits:
+            return self.compute_from_logits(y_true, y_pred, sample_weight)
+
         # ? avoid calculating log(0)
-        y_pred = np.clip(y_pred, 1e-15, 1 - 1e-15)
-        return -np.mean(y_true * np.log(y_pred))
+        epsilon = _epsilon(y_pred.dtype)
+        values = np.clip(y_pred, epsilon, 1 - epsilon, out=self._scratch("values", y_true, y_pred))
+        np.log(values, out=values)
+        values *= y_true
+        return self.reduce(np.negative(values, out=values), sample_weight, scale=np.shape(y_pred)[-1])
+
+    def derivative(self, y_true: InputValue, y_pred: InputValue,
+                   sample_weight: Optional[InputValue] = None, out: Optional[OutputValue] = None) -> OutputValue:
+        if self.from_logits:
+            return self.logits_gradient(y_true, y_pred, sample_weight=sample_weight, out=out)
+
+        epsilon = _epsilon(y_pred.dtype)
+        y_pred = np.clip(y_pred, epsilon, 1 - epsilon)
+        out = np.divide(y_true, y_pred, out=out)
+        np.negative(out, out=out)
+        return self.scale_gradient(out, sample_weight, scale=np.shape(y_pred)[-1])
+
+    def compute_from_logits(self, y_true: InputValue, logits: InputValue,
+                            sample_weight: Optional[InputValue] = None) -> np.float64 | OutputValue:
+        """
+        The loss of the probabilities softmax(logits)
+        """
+        # log(sum(exp(z))), shifted by the max to avoid overflows
+        shift = np.max(logits, axis=-1, keepdims=True)
+        values = np.subtract(logits, shift, out=self._scratch("values", y_true, logits))
+        log_sum_exp = np.log(np.sum(np.exp(values, out=values), axis=-1)) + shift[..., 0]
+
+        # -sum(y * log(softmax(z))) == sum(y) * log_sum_exp(z) - sum(y * z)
+        losses = np.sum(y_true, axis=-1) * log_sum_exp - np.sum(np.multiply(y_true, logits, out=values), axis=-1)
+        return self.reduce(np.reshape(losses, (_batch_size(logits), -1)), sample_weight)
+
+    def logits_gradient(self,
+                        y_true: InputValue,
+                        logits: InputValue,
+                        probabilities: Optional[InputValue] = None,
+                        sample_weight: Optional[InputValue] = None,
+                        out: Optional[OutputValue] = None) -> OutputValue:
+        """
+        The gradient of the loss with respect to the logits: (softmax(logits) - y_true) / n
+        (for targets that sum to 1 and the "mean" reduction).
 
-    def derivative(self, y_true: InputValue, y_pred: InputValue) -> InputValue:
-        y_pred = np.clip(y_pred, 1e-15, 1 - 1e-15)
-        return -(y_true / y_pred) / y_true.shape[0]
+        `probabilities` can be passed if softmax(logits) has already been computed
+        """
+        gradient: OutputValue
+        if probabilities is None:
+            gradient = _softmax(logits, out=out)
+        elif out is None:
+            gradient = np.array(probabilities)
+        else:
+            gradient = out
+            np.copyto(gradient, probabilities)
+
+        np.multiply(gradient, np.sum(y_true, axis=-1, keepdims=True), out=gradient)
+        np.subtract(gradient, y_true, out=gradient)
+        return self.scale_gradient(gradient, sample_weight, scale=np.shape(logits)[-1])
 
 
 class HingeLoss(Loss):
@@ -122,11 +310,17 @@ class HingeLoss(Loss):
     Hinge Loss
     """
 
-    def compute(self, y_true: InputValue, y_pred: InputValue) -> np.float64:
-        return np.mean(np.maximum(0, 1 - y_true * y_pred))
+    def compute(self, y_true: InputValue, y_pred: InputValue,
+                sample_weight: Optional[InputValue] = None) -> np.float64 | OutputValue:
+        values = np.multiply(y_true, y_pred, out=self._scratch("values", y_true, y_pred))
+        np.subtract(1, values, out=values)
+        return self.reduce(np.maximum(values, 0, out=values), sample_weight)
 
-    def derivative(self, y_true: InputValue, y_pred: InputValue) -> OutputValue:
-        return np.where(y_true * y_pred < 1, -y_true, 0) / y_true.size
+    def derivative(self, y_true: InputValue, y_pred: InputValue,
+                   sample_weight: Optional[InputValue] = None, out: Optional[OutputValue] = None) -> OutputValue:
+        out = np.negative(y_true, out=out)
+        out[y_true * y_pred >= 1] = 0
+        return self.scale_gradient(out, sample_weight)
 
 
 class LogCoshLoss(Loss):
@@ -134,11 +328,22 @@ class LogCoshLoss(Loss):
     Log-Cosh Loss
     """
 
-    def compute(self, y_true: InputValue, y_pred: InputValue) -> np.float64:
-        return np.mean(np.log(np.cosh(y_pred - y_true)))
+    def compute(self, y_true: InputValue, y_pred: InputValue,
+                sample_weight: Optional[InputValue] = None) -> np.float64 | OutputValue:
+        # log(cosh(x)) == |x| + log(1 + exp(-2|x|)) - log(2), without overflowing cosh
+        error = np.subtract(y_pred, y_true, out=self._scratch("values", y_true, y_pred))
+        np.abs(error, out=error)
+        correction = np.multiply(error, -2, out=self._scratch("correction", y_true, y_pred))
+        np.log1p(np.exp(correction, out=correction), out=correction)
+        error += correction
+        error -= np.log(2)
+        return self.reduce(error, sample_weight)
 
-    def derivative(self, y_true: InputValue, y_pred: InputValue) -> OutputValue:
-        return np.tanh(y_pred - y_true) / y_true.size
+    def derivative(self, y_true: InputValue, y_pred: InputValue,
+                   sample_weight: Optional[InputValue] = None, out: Optional[OutputValue] = None) -> OutputValue:
+        out = np.subtract(y_pred, y_true, out=out)
+        np.tanh(out, out=out)
+        return self.scale_gradient(out, sample_weight)
 
 
 class HuberLoss(ParametricLoss):
@@ -146,7 +351,7 @@ class HuberLoss(ParametricLoss):
     Huber Loss
     """
 
-    def __init__(self, delta: float = 1.0):
+    def __init__(self, delta: float = 1.0, reduction: Reduction = "mean"):
         """
         Initializes the Huber loss with a given delta value.
 
@@ -154,18 +359,29 @@ class HuberLoss(ParametricLoss):
         ----------
         delta: float
             The threshold at which to switch from quadratic to linear loss.
+        reduction: str
+            How the losses of the samples are combined ("mean", "sum" or "none").
         """
+        super().__init__(reduction)
         self.delta = delta
 
-    def compute(self, y_true: InputValue, y_pred: InputValue) -> np.float64:
-        error = y_true - y_pred
-        is_small_error = np.abs(error) <= self.delta
-        squared_loss = 0.5 * np.square(error)
-        linear_loss = self.delta * (np.abs(error) - 0.5 * self.delta)
-
-        return np.mean(np.where(is_small_error, squared_loss, linear_loss))
-
-    def derivative(self, y_true: InputValue, y_pred: InputValue) -> OutputValue:
-        error = y_true - y_pred
-        is_small_error = np.abs(error) <= self.delta
-        return np.where(is_small_error, error, self.delta * np.sign(error)) / y_true.size
+    def compute(self, y_true: InputValue, y_pred: InputValue,
+                sample_weight: Optional[InputValue] = None) -> np.float64 | OutputValue:
+        # with c = min(|error|, delta): 0.5 * c^2 + delta * (|error| - c),
+        # which is quadratic for the small errors and linear for the others
+        error = np.subtract(y_true, y_pred, out=self._scratch("values", y_true, y_pred))
+        np.abs(error, out=error)
+        clipped = np.minimum(error, self.delta, out=self._scratch("clipped", y_true, y_pred))
+        error -= clipped
+        error *= self.delta
+        np.square(clipped, out=clipped)
+        clipped *= .5
+        error += clipped
+        return self.reduce(error, sample_weight)
+
+    def derivative(self, y_true: InputValue, y_pred: InputValue,
+                   sample_weight: Optional[InputValue] = None, out: Optional[OutputValue] = None) -> OutputValue:
+        # the derivative with respect to y_pred: the error clipped to [-delta, delta]
+        out = np.subtract(y_pred, y_true, out=out)
+        np.clip(out, -self.delta, self.delta, out=out)
+        return self.scale_gradient(out, sample_weight)
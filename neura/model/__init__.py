@@ -4,3 +4,4 @@ Available model types
 
 from .model import Model
 
+from .parallel import DataParallel
@@ -0,0 +1,130 @@
+"""
+Activation checkpointing: trade computation for memory during training
+
+Normally every layer keeps the values of its forward pass (its input, weighted sums,
+outputs) until the backward pass, so the memory grows with the number of layers and
+the batch size. With checkpointing, the layers are split into segments: only the input
+of each segment is kept, the layers forget their values as soon as the next layer ran,
+and each segment runs forward again (from its input) right before its backward pass.
+
+The random draws of the layers (like the masks of Dropout) are replayed, so the
+recomputed values are the same ones of the first forward pass
+"""
+
+import bisect
+from typing import TYPE_CHECKING, Any, Optional, Union
+
+import numpy as np
+
+from neura.utils.types import InputValue, OutputValue
+
+if TYPE_CHECKING:
+    from neura.layers import Layer
+    from neura.model.model import Model
+
+
+def _generator(layer: "Layer") -> Optional[np.random.Generator]:
+    generator = getattr(layer, "generator", None)
+    return generator if isinstance(generator, np.random.Generator) else None
+
+
+class Checkpointer:
+    """
+    Keeps the inputs of the segments of a model (see `Model.use_checkpointing()`)
+
+    parameters:
+
+    - layers:         the number of layers of the model
+    - checkpoints:    the indices of the layers that start a segment, or an int k
+                      to start one every k layers. by default about sqrt(layers)
+                      segments of the same size, which keeps about 2 * sqrt(layers)
+                      activations in memory for one extra forward pass
+    """
+
+    def __init__(self, layers: int, checkpoints: Optional[Union[int, list[int]]] = None) -> None:
+        if checkpoints is None:
+            checkpoints = max(1, int(round(np.sqrt(layers))))
+
+        if isinstance(checkpoints, int):
+            if checkpoints < 1:
+                raise ValueError("the number of layers of each segment must be >= 1")
+            checkpoints = list(range(0, layers, checkpoints))
+
+        if any(not 0 <= i < max(layers, 1) for i in checkpoints):
+            raise ValueError(f"the checkpoints must be indices of layers (between 0 and {layers - 1})")
+
+        self.layers = layers
+        # the first layer of each segment
+        self.starts = sorted(set(checkpoints) | {0})
+
+        self._inputs: dict[int, InputValue] = {}
+        self._random_states: dict[int, Any] = {}
+
+    def _segment(self, index: int) -> tuple[int, int]:
+        # the first layer of the segment of `index`, and the first layer of the next one
+        position = bisect.bisect_right(self.starts, index) - 1
+        end = self.starts[position + 1] if position + 1 < len(self.starts) else self.layers
+        return self.starts[position], end
+
+    def forward(self, model: "Model", values: InputValue) -> OutputValue:
+        """
+        Run a batch through the layers of `model`, keeping only the inputs of the segments
+        (and everything the last layer stored, which is needed to compute the loss)
+        """
+        self.clear()
+
+        for i, layer in enumerate(model.layers):
+            if i in self.starts:
+                self._inputs[i] = values
+
+            generator = _generator(layer)
+            if generator is not None:
+                self._random_states[i] = generator.bit_generator.state
+
+            values = model._run_layer(i, layer, values)
+
+            # the values of the previous layer can be computed again from the checkpoint
+            # (its outputs stay in memory until the current layer releases its input)
+            if i > 0:
+                model.layers[i - 1].release()
+
+        return values
+
+    def before_backward(self, model: "Model", index: int) -> None:
+        """
+        Called before the layer at `index` computes its gradients:
+        the first time a segment is reached, its layers run forward again
+        """
+        if not self._inputs:
+            return
+
+        start, end = self._segment(index)
+        # the last layer kept its values
+        top = min(end, len(model.layers) - 1) - 1
+        if index != top or start not in self._inputs:
+            return
+
+        values = self._inputs[start]
+        for i in range(start, top + 1):
+            layer = model.layers[i]
+            generator = _generator(layer)
+            if i in self._random_states and generator is not None:
+                generator.bit_generator.state = self._random_states[i]
+            values = layer.forward(values)
+
+    def after_backward(self, model: "Model", index: int) -> None:
+        """
+        Called after the layer at `index` computed its gradients:
+        once a segment is done, its values are released
+        """
+        if index not in self._inputs:
+            return
+
+        _, end = self._segment(index)
+        for i in range(index, min(end, len(model.layers) - 1)):
+            model.layers[i].release()
+        del self._inputs[index]
+
+    def clear(self) -> None:
+        self._inputs.clear()
+        self._random_states.clear()
@@ -1,33 +1,56 @@
+import copy as _copy
+import importlib as _importlib
+import time as _time
 import numpy as np
-import random as _random
-from typing import Any, List, Optional, Union
+from typing import Any, Callable, List, Optional, Union
 
 from neura import optimizers
 from neura import losses
 from neura import preprocessing 
 from neura.losses import Loss
-from neura.layers import exceptional, Layer, Input
-from neura.utils.types import InputValue, OutputValue
-from neura.evaluation import Evaluation
+from neura import activation as _activation
+from neura.layers import exceptional, Dense, Layer, Input
+from neura.utils.types import DType, Gradients, InputValue, NodeWeights, OutputValue, as_float_dtype, floatx
+from neura.utils.workspace import Workspace
+from neura.callbacks import Callback
+from neura.evaluation import Evaluation, History, Metric
+from neura.evaluation import metrics as _metrics
+from neura.profiling import Hook
+from neura.model import serialization as _serialization
+from neura.model import parallel as _parallel
+from neura.model import plan as _plan
+from neura.model.checkpoint import Checkpointer
 
 
 class Model:
-    def __init__(self, layers: Optional[list[Layer]] = None, name: Optional[str] = None) -> None:
+    def __init__(self,
+                 layers: Optional[list[Layer]] = None,
+                 name: Optional[str] = None,
+                 dtype: Optional[DType] = None,
+                 seed: Optional[int] = None
+                 ) -> None:
         """
         parameters:
         
         - layers:         a list of layers to initialize the model. you can add more layers
                           by calling `add_layer()`
         - name:           the name of the model
+        - dtype:          the floating point type (float32 or float64) used for the parameters
+                          and all the computations. if None, `neura.utils.floatx()` is used
+        - seed:           the seed used to initialize the parameters of the layers,
+                          models created with the same seed start with the same parameters
                     
         """
         
         if not isinstance(name, str) and not name is None:
             raise ValueError("name must be of type str or None")
+
+        self.dtype = floatx() if dtype is None else as_float_dtype(dtype)
+        self.generator = np.random.default_rng(seed)
         
         self.loss: Loss = losses.MeanSquaredError()
         self.optimizer: optimizers.Optimizer = optimizers.SGD()
-        self.metrics = []
+        self.metrics: list[Metric] = []
 
         self.layers: list[Layer] = []
         self.name = "Model" if name is None else str(name) or "Model"
@@ -35,6 +58,30 @@ class Model:
         self.output_shape: tuple[int, ...] | None = None
         self.input_shape: tuple[int, ...] | None = None
         self.input_size: int | None = None
+
+        # the parameters of all the layers live in a single contiguous buffer
+        # (and so do their gradients, except the ones of the layers with sparse gradients),
+        # each layer only holds views into them
+        self.parameters: NodeWeights = np.zeros(0, dtype=self.dtype)
+        self.gradients: Gradients = np.zeros(0, dtype=self.dtype)
+        # the part of the buffers updated by a single dense step, and the layers updated row by row
+        self._dense_parameters, self._dense_gradients = self.parameters, self.gradients
+        self._sparse_layers: list[Layer] = []
+
+        # notified when each layer runs (see `add_hook()`)
+        self.hooks: list[Hook] = []
+
+        # callbacks can set this to end the training after the current epoch
+        self.stop_training = False
+
+        # see `freeze()`
+        self.frozen = False
+        # see `use_workspace()`
+        self.workspace_enabled = False
+        # see `use_checkpointing()`
+        self.checkpoints: Optional[Union[int, list[int]]] = None
+        self._checkpointer: Optional[Checkpointer] = None
+        self._plan: Optional[_plan.InferencePlan] = None
         
         if layers:
             input_shape = layers[0].input_shape
@@ -60,34 +107,19 @@ class Model:
         """
         Adds a layer at the end of the model
         """
-        if len(self.layers) > 0:
-            previous_layer_node_count = len(self.layers[-1].nodes)
-            n = 1
-            
-            while n < len(self.layers) and self.layers[-n].pass_trough_layer:
-                n += 1
+        self._append_layer(layer)
+        self._allocate_parameters()
 
-            if n == len(self.layers):
-                # no upper layer was able to provide an actuall input_shape for this 
-                # layer, use the network's input_shape then 
-                previous_layer_node_count = self.input_size
-            else:
+    def _append_layer(self, layer: Layer, initialize: bool = True) -> None:
+        if len(self.layers) > 0 and self.output_shape:
+            # assert that the provided input_shape is compatible with the rest of the network
+            if layer.input_shape and layer.input_shape != self.output_shape:
                 prev_layer = self.layers[-1]
-                if prev_layer.output_shape and isinstance(prev_layer.output_shape, tuple):
-                    previous_layer_node_count = Input(prev_layer.output_shape)
-                else:
-                    previous_layer_node_count = len(self.layers[-1].nodes)
-                
-                # assert that the provided input_shape is compatible with the rest of the network
-                if layer.input_shape and layer.input_shape != prev_layer.output_shape:
-                    raise RuntimeError(f"the input shape of layer {len(self.layers) + 1} " \
-                                       f"({layer.name}) is incompatible with output shape "
-                                       f"{prev_layer.output_shape} ({prev_layer.name})")
-                
-                layer.input_shape = prev_layer.output_shape
+                raise RuntimeError(f"the input shape of layer {len(self.layers) + 1} " \
+                                   f"({layer.name}) is incompatible with output shape "
+                                   f"{self.output_shape} ({prev_layer.name})")
 
-            for n in layer.nodes:
-                n.weights = np.array([_random.uniform(-1, 1) for _ in range(previous_layer_node_count or 1)])
+            layer.input_shape = self.output_shape
         else:
             if isinstance(layer, exceptional.NotFirstLayer):
                 raise RuntimeError("%s (%s)" % (exceptional.NotFirstLayer.errmsg, layer.name))
@@ -99,27 +131,235 @@ class Model:
                 raise ValueError("input_shape can only contain int values")
 
             self.input_size = Input(layer.input_shape)
-            for n in layer.nodes:
-                n.weights = np.array([_random.uniform(-1, 1) for _ in range(self.input_size)])
+            self.input_shape = layer.input_shape
 
+        layer.dtype = self.dtype
+        layer.workspace = Workspace() if self.workspace_enabled else None
+        layer.build(Input(layer.input_shape), initialize=initialize, generator=self.generator)
         self.layers.append(layer)
         
         # modify the output shape
-        if layer.output_shape:
-            self.output_shape = layer.output_shape
-        else:
-            # in this case the output shape depends on the number of nodes
-            self.output_shape = (len(layer.nodes),)        
+        self.output_shape = layer.compute_output_shape(layer.input_shape)        
+
+        if self._checkpointer is not None:
+            self._checkpointer = Checkpointer(len(self.layers), self.checkpoints)
 
+    def _allocate_parameters(self, parameters: Optional[NodeWeights] = None, gradients: Optional[Gradients] = None) -> None:
+        """
+        Move the parameters of every layer into one buffer
 
-    def compile(self, loss: Union[Loss, str], optimizer: Optional[optimizers.Optimizer] = None, metrics: Optional[list[Any]] = None):
+        if `parameters` is provided, it is used as the buffer (without copying
+        the current values of the layers into it). the same goes for `gradients`
+        """
+        # the tables of the layers with sparse gradients (like Embedding) go last,
+        # so all the other parameters get a single dense update. their gradients are
+        # only the rows used by each batch (see `Layer.row_gradients`), so they have
+        # no room in the gradients buffer
+        dense_layers = [layer for layer in self.layers if not layer.sparse_gradients]
+        sparse_layers = [layer for layer in self.layers if layer.sparse_gradients]
+
+        dense_size = sum(layer.parameter_count for layer in dense_layers)
+        size = dense_size + sum(layer.parameter_count for layer in sparse_layers)
+        copy = parameters is None
+
+        if parameters is None:
+            parameters = np.zeros(size, dtype=self.dtype)
+        elif parameters.shape != (size,) or parameters.dtype != self.dtype:
+            raise ValueError(f"expected {size} parameters of type {self.dtype}, " \
+                             f"received: {parameters.size} of type {parameters.dtype}")
+        if gradients is None:
+            gradients = np.zeros(dense_size, dtype=parameters.dtype)
+        elif gradients.shape != (dense_size,) or gradients.dtype != parameters.dtype:
+            raise ValueError(f"the gradients buffer must hold {dense_size} values of the type of the parameters")
+
+        start = 0
+        for layer in dense_layers + sparse_layers:
+            end = start + layer.parameter_count
+            layer.bind_parameters(parameters[start:end], None if layer.sparse_gradients else gradients[start:end], copy=copy)
+            start = end
+
+        self.parameters = parameters
+        self.gradients = gradients
+
+        self._sparse_layers = sparse_layers
+        self._dense_gradients = gradients
+        self._dense_parameters = parameters[:dense_size] if sparse_layers else parameters
+
+        # the plan uses the old buffers, it is rebuilt when needed
+        self._plan = None
+
+    def add_hook(self, hook: Hook) -> None:
+        """
+        Notify `hook` before and after each layer runs (forward and backward),
+        and at the end of `train()` and `evaluate()`
+        """
+        if not isinstance(hook, Hook):
+            raise ValueError("hook must be an instance of neura.profiling.Hook")
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook: Hook) -> None:
+        self.hooks.remove(hook)
+
+    def get_weights(self) -> NodeWeights:
+        """
+        Get a copy of all the parameters of the model, as a 1-D array
+        """
+        return self.parameters.copy()
+
+    def set_weights(self, weights: NodeWeights) -> None:
+        """
+        Replace all the parameters of the model with the ones
+        returned by `get_weights()`
+        """
+        if np.shape(weights) != self.parameters.shape:
+            raise ValueError(f"expected {self.parameters.size} parameters, received: {np.size(weights)}")
+        np.copyto(self.parameters, weights)
+
+    def get_config(self) -> dict[str, Any]:
+        """
+        Get a description of the architecture of the model
+        (without its parameters)
+        """
+        return {
+            "name": self.name,
+            "dtype": self.dtype.name,
+            "layers": [{
+                "module": type(layer).__module__,
+                "class": type(layer).__name__,
+                "config": layer.get_config(),
+            } for layer in self.layers],
+        }
+
+    def get_layer_arrays(self) -> list[dict[str, np.ndarray]]:
+        """
+        Get the arrays of each layer that are not parameters (see `Layer.get_arrays()`),
+        with the masks of the pruned layers (see `Layer.weights_mask`) as "weights_mask"
+        """
+        layer_arrays = []
+        for layer in self.layers:
+            arrays = layer.get_arrays()
+            if layer.weights_mask is not None:
+                arrays = {**arrays, "weights_mask": layer.weights_mask}
+            layer_arrays.append(arrays)
+        return layer_arrays
+
+    @classmethod
+    def from_config(cls,
+                    config: dict[str, Any],
+                    parameters: Optional[NodeWeights] = None,
+                    arrays: Optional[list[dict[str, np.ndarray]]] = None) -> "Model":
+        """
+        Create a new (untrained) model from the output of `get_config()`
+
+        if `parameters` is provided, it becomes the parameters buffer of the model
+        (see `get_weights()`), otherwise the parameters are randomly initialized.
+        `arrays` are the outputs of `get_layer_arrays()`
+        """
+        initialize = parameters is None
+        model = cls(name=config["name"], dtype=config.get("dtype"))
+        for i, layer_config in enumerate(config["layers"]):
+            layer_class = getattr(_importlib.import_module(layer_config["module"]), layer_config["class"])
+            if not isinstance(layer_class, type) or not issubclass(layer_class, Layer):
+                raise ValueError(f"invalid layer class: '{layer_config['class']}'")
+
+            layer = layer_class.from_config(layer_config["config"])
+            model._append_layer(layer, initialize=initialize)
+            if arrays and arrays[i]:
+                layer_arrays = dict(arrays[i])
+                mask = layer_arrays.pop("weights_mask", None)
+                if layer_arrays:
+                    layer.set_arrays(layer_arrays)
+
+                if mask is not None:
+                    if np.shape(mask) != layer.weights.shape:
+                        raise ValueError(f"expected a weights mask of shape {layer.weights.shape} for {layer.name}")
+                    layer.weights_mask = np.asarray(mask, dtype=bool)
+
+        model._allocate_parameters(parameters)
+        return model
+
+    def save(self, path: str) -> None:
+        """
+        Save the architecture and the parameters of the model to a file
+        (the loss function and the optimizer are not saved)
+        """
+        _serialization.save(self, path)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "Model":
+        """
+        Load a model saved with `save()`
+
+        if `mmap` is True, the parameters are memory mapped from the file instead of
+        being read, so loading is almost instantaneous and processes loading the same file
+        share the same memory. Changes to the parameters are never written back to the file
+        """
+        return _serialization.load(cls, path, mmap=mmap)
+
+    def copy(self) -> "Model":
+        """
+        Create an independent copy of the model
+        """
+        model = _copy.deepcopy(self)
+        # deepcopy does not keep the layers as views into the parameters buffer
+        model._allocate_parameters()
+        return model
+
+
+    def compile(self, loss: Union[Loss, str], optimizer: Optional[Union[optimizers.Optimizer, str]] = None, metrics: Optional[list[Any]] = None):
         assert isinstance(loss, Loss), "`loss` must be a loss function"
+
+        if loss.reduction == "none":
+            raise ValueError("the loss of a model must be reduced to a single value (reduction='mean' or 'sum')")
+
+        if isinstance(optimizer, str):
+            name = optimizer
+            optimizer = self._get_optimizer(name)
+            if optimizer is None:
+                raise ValueError(f"Invalid optimizer: '{name}'")
+
+        elif optimizer is None:
+            optimizer = self.optimizer
+
         assert isinstance(optimizer, optimizers.Optimizer), "`optimizer` must be a valid Optimizer instance"
 
+        resolved_metrics = []
+        for metric in metrics or []:
+            if isinstance(metric, str):
+                name = metric
+                metric = self._get_metric(name)
+                if metric is None:
+                    raise ValueError(f"Invalid metric: '{name}'")
+
+            assert isinstance(metric, Metric), "`metrics` must contain valid Metric instances"
+            resolved_metrics.append(metric)
+
         self.optimizer = optimizer
         self.loss = loss
-        self.metrics = metrics
-
+        self.metrics = resolved_metrics
+
+    #! temporary
+    def _get_optimizer(self, name: str) -> optimizers.Optimizer | None:
+        optimizer = {
+            "adam":         optimizers.Adam,
+            "adamw":        optimizers.AdamW,
+            "momentum":     optimizers.Momentum,
+            "nesterov":     lambda: optimizers.Momentum(nesterov=True),
+            "rmsprop":      optimizers.RMSProp,
+            "sgd":          optimizers.SGD,
+        }.get(name.lower(), None)
+
+        return optimizer() if optimizer else None
+
+    #! temporary
+    def _get_metric(self, name: str) -> Metric | None:
+        metric = {
+            "accuracy":     _metrics.Accuracy,
+            "mae":          _metrics.MeanAbsoluteError,
+            "mse":          _metrics.MeanSquaredError,
+        }.get(name.lower(), None)
+
+        return metric() if metric else None
 
     def summary(self, verbose: bool = True) -> str:
         """
@@ -133,10 +373,10 @@ class Model:
 
         for i, layer in enumerate(self.layers):
             layer_info += f"{i}. {type(layer).__name__}"
-            p = 0
-            for node in layer.nodes:
-                p += len(node.weights)
-                params += len(node.weights)
+            # the weights and the biases, or the int8 kernel of a quantized layer
+            kernel = getattr(layer, "kernel", None)
+            p = layer.parameter_count + (kernel.size if kernel is not None else 0)
+            params += p
 
             layer_info += f"\t\tnodes: {len(layer.nodes)}"
             layer_info += f"\tparams: {p}\n"
@@ -153,78 +393,427 @@ class Model:
         return summary
 
     def predict(self, values: InputValue, verbose: Optional[bool] = True) -> OutputValue:
-        # TODO: add support for batch input 
+        """
+        Compute the output of the model
+
+        `values` can either be a single sample with shape `input_shape`
+        or a batch of samples with shape (n, *input_shape)
+
+        if the model is frozen (see `freeze()`), the inference plan is used
+        instead of the layers (and nothing is printed)
+        """
+        values = self._predict(values, verbose=verbose, use_plan=self.frozen and not self.hooks)
+
+        # the outputs are in the workspace of the last layer,
+        # and would be overwritten by the next call
+        return values.copy() if self.workspace_enabled else values
+
+    def forward(self, x: InputValue) -> OutputValue:
+        # training needs the values stored by each layer, the plan is never used
+        if self._checkpointer is None:
+            return self._predict(x, verbose=False, use_plan=False)
+
+        values = np.asarray(x)
+        is_batch = self._is_batch_input(values)
+        values = self._checkpointer.forward(self, values if is_batch else values[np.newaxis])
+        return values if is_batch else values[0]
+
+    def _run_layer(self, index: int, layer: Layer, values: InputValue) -> OutputValue:
+        if not self.hooks:
+            return layer.forward(values)
+
+        for hook in self.hooks:
+            hook.pre_forward(index, layer, values)
+        values = layer.forward(values)
+        for hook in self.hooks:
+            hook.post_forward(index, layer, values)
+        return values
+
+    def _predict(self, values: InputValue, verbose: Optional[bool], use_plan: bool) -> OutputValue:
+        values = np.asarray(values)
+
+        # layers always work on batches, a single sample is a batch of 1
+        is_batch = self._is_batch_input(values)
+        if not is_batch:
+            values = values[np.newaxis]
+
+        if use_plan:
+            if self._plan is None:
+                self._plan = _plan.InferencePlan(self)
+            values = self._plan(values)
+            return values if is_batch else values[0]
 
         # pass all the through all layers of the network
         for i, layer in enumerate(self.layers):
             if verbose:
                 print(f"predicting (layer: {i + 1} / {len(self.layers)})", end="\r")
-            values = layer.forward(values)
+            values = self._run_layer(i, layer, values)
 
         if verbose:
             print(f"predicting (layer: {len(self.layers)} / {len(self.layers)})")
         
-        return values
-    
-    def forward(self, x: InputValue) -> OutputValue:
-        return self.predict(x, verbose=False)
+        return values if is_batch else values[0]
+
+    def freeze(self) -> None:
+        """
+        Prepare the model for inference: `predict()` (and so `evaluate()`) will run a plan
+        where layers that do nothing at inference are removed, reshapes are views and each
+        Dense layer is fused with its activation (see `neura.model.plan`).
+
+        The model can still be trained, the plan always uses the current parameters
+        """
+        self._plan = _plan.InferencePlan(self)
+        self.frozen = True
+
+    def use_workspace(self, enabled: bool = True) -> None:
+        """
+        If enabled, each layer writes its outputs and gradients into buffers that are
+        allocated at the first batch of each size, and reused by the following ones.
+        After the first batches, training and inference do (almost) no large allocations.
+
+        `predict()` still returns a new array, while the arrays returned by `forward()`
+        are only valid until the next batch.
+
+        Can not be used together with checkpointing (see `use_checkpointing()`)
+        """
+        if enabled and self._checkpointer is not None:
+            raise ValueError("the workspace can not be used together with checkpointing")
+
+        self.workspace_enabled = enabled
+        for layer in self.layers:
+            layer.workspace = Workspace() if enabled else None
+        # the plan keeps its buffers in the workspaces of the layers
+        self._plan = None
+
+    def use_checkpointing(self, checkpoints: Optional[Union[int, list[int]]] = None, enabled: bool = True) -> None:
+        """
+        If enabled, the training keeps only the inputs of some layers (the checkpoints)
+        instead of the values of every layer, and runs forward again the layers between two
+        checkpoints right before computing their gradients (see `neura.model.checkpoint`).
+        The gradients do not change, the memory used by the activations drops,
+        and each batch costs about one more forward pass.
+
+        `checkpoints` are the indices of the layers whose input is kept, or an int k
+        to keep one every k layers (fewer checkpoints use less memory for the kept inputs,
+        but the segments between them are longer). by default about sqrt(layers) are used.
+
+        Can not be used together with a workspace (see `use_workspace()`),
+        whose buffers are never released
+        """
+        if enabled and self.workspace_enabled:
+            raise ValueError("checkpointing can not be used together with the workspace")
 
-    def compute_loss(self, y_true: InputValue, y_pred: InputValue):
-        return self.loss(y_true, y_pred)
+        self.checkpoints = checkpoints if enabled else None
+        self._checkpointer = Checkpointer(len(self.layers), checkpoints) if enabled else None
+
+    def unfreeze(self) -> None:
+        """
+        Go back to running every layer in `predict()`
+        """
+        self._plan = None
+        self.frozen = False
+
+    def compute_loss(self, y_true: InputValue, y_pred: InputValue, sample_weight: Optional[InputValue] = None):
+        y_true = np.asarray(y_true, dtype=self.dtype)
+        # the temporary arrays of the loss are kept with the outputs of the last layer
+        self.loss.workspace = self.layers[-1].workspace if self.layers else None
+
+        # the logits of the last batch are still available, no need to take the log of the probabilities
+        head = self._softmax_head()
+        if head is not None and y_pred is head.outputs and isinstance(self.loss, losses.CategoricalCrossEntropy):
+            return self.loss.compute_from_logits(y_true, head.z, sample_weight)
+
+        return self.loss(y_true, y_pred, sample_weight=sample_weight)
+
+    def _softmax_head(self) -> Optional[Dense]:
+        """
+        The last layer, if it is a Dense layer with a softmax activation and the loss is the
+        categorical cross entropy. Softmax and the loss are then computed together
+        """
+        last = self.layers[-1] if self.layers else None
+        if isinstance(self.loss, losses.CategoricalCrossEntropy) and not self.loss.from_logits \
+                and isinstance(last, Dense) and isinstance(last.activation, _activation.Softmax):
+            return last
+        return None
+
+    def backward(self, y_true: InputValue, y_pred: InputValue, sample_weight: Optional[InputValue] = None) -> None:
+        self.compute_gradients(y_true, y_pred, sample_weight)
+        self.apply_gradients()
+
+    def compute_gradients(self, y_true: InputValue, y_pred: InputValue,
+                          sample_weight: Optional[InputValue] = None) -> Gradients:
+        """
+        Compute the gradients of the loss with respect to all the parameters
+        of the model (in `self.gradients`), without updating them.
 
-    def backward(self, y_true: InputValue, y_pred: InputValue) -> None:
-        output_gradient = self.loss.derivative(y_true, y_pred)
+        `sample_weight` (one weight for each sample of the batch) scales the loss of each sample
+        """
+        # avoid mixing floating point types (no copy if y_true already has the right one)
+        y_true = np.asarray(y_true, dtype=self.dtype)
+        last = self.layers[-1]
+
+        head = self._softmax_head()
+        if head is not None and isinstance(self.loss, losses.CategoricalCrossEntropy):
+            # softmax + cross entropy: the gradient with respect to the inputs of the softmax
+            # is (softmax - y) / n, the last layer skips the derivative of its activation
+            y_true = np.reshape(y_true, head.z.shape)
+            out = None if head.workspace is None else head.workspace.get("delta", head.z.shape, head.z.dtype)
+            output_gradient = self.loss.logits_gradient(y_true, head.z, probabilities=head.outputs,
+                                                        sample_weight=sample_weight, out=out)
+        else:
+            # layers work on batches, a single sample is a batch of 1
+            y_pred = np.reshape(y_pred, (-1, *(self.output_shape or ())))
+            y_true = np.reshape(y_true, y_pred.shape)
+
+            out = None if last.workspace is None else last.workspace.get("loss_gradient", y_pred.shape, y_pred.dtype)
+            output_gradient = self.loss.derivative(y_true, y_pred, sample_weight=sample_weight, out=out)
         
         # Backpropagate through the layers
-        for layer in reversed(self.layers):
-            if layer.trainable:
-                gradients = layer.compute_gradients(output_gradient)
-                layer.update_weights(self.optimizer, gradients)
-                
-                # this will be needed by the previous layer
-                output_gradient = np.sum(gradients, axis=0)
+        checkpointer = self._checkpointer
+        for i in range(len(self.layers) - 1, -1, -1):
+            layer = self.layers[i]
+
+            # the values released by a checkpointed forward pass are computed again
+            if checkpointer is not None:
+                checkpointer.before_backward(self, i)
+
+            for hook in self.hooks:
+                hook.pre_backward(i, layer, output_gradient)
+
+            # the first layer does not need to know how its input should change.
+            # the parameter gradients are written directly into self.gradients
+            if head is not None and layer is head:
+                _, _, input_gradient = layer.compute_gradients(
+                    output_gradient, need_input_gradient=i > 0, pre_activation=True
+                )
+            else:
+                _, _, input_gradient = layer.compute_gradients(
+                    output_gradient, need_input_gradient=i > 0
+                )
+
+            for hook in self.hooks:
+                hook.post_backward(i, layer, input_gradient)
+
+            # this will be needed by the previous layer
+            if input_gradient is not None:
+                output_gradient = input_gradient
+
+            if checkpointer is not None:
+                checkpointer.after_backward(self, i)
+
+        return self.gradients
+
+    def apply_gradients(self) -> None:
+        """
+        Update the parameters with the gradients in `self.gradients`
+        """
+        # a single update for all the dense parameters of the model,
+        # then the rows used by the last batch of each sparse layer
+        row_gradients = [layer.row_gradients for layer in self._sparse_layers]
+
+        # the optimizer steps the whole buffer, its state (or the weight decay)
+        # would still move the parameters of the frozen layers: they are put back after the step
+        frozen = [(layer, layer.weights.copy(), layer.bias.copy())
+                  for layer in self.layers if not layer.trainable and layer.parameter_count]
+
+        self.optimizer.clip_gradients(self._dense_gradients, *(gradients for _, gradients in row_gradients))
+        self.optimizer.apply_gradients(self._dense_parameters, self._dense_gradients)
+
+        for layer, (rows, gradients) in zip(self._sparse_layers, row_gradients):
+            if len(rows):
+                self.optimizer.apply_sparse_gradients(layer.weights, rows, gradients)
+
+        # pruned weights stay 0
+        for layer in self.layers:
+            if layer.weights_mask is not None:
+                layer.weights *= layer.weights_mask
+
+        for layer, weights, bias in frozen:
+            np.copyto(layer.weights, weights)
+            np.copyto(layer.bias, bias)
 
     def train(self,
-        x: InputValue,
-        y: InputValue,
+        x: Union[InputValue, preprocessing.DataLoader],
+        y: Optional[InputValue] = None,
         batch_size: int = 16,
         epochs: int = 5,
         shuffle: bool = False,
-        verbose: bool = True) -> None:
+        verbose: bool = True,
+        workers: int = 1,
+        validation_data: Optional[Union[tuple[InputValue, InputValue], preprocessing.DataLoader]] = None,
+        validation_split: float = 0.,
+        callbacks: Optional[list[Callback]] = None) -> History:
+        """
+        Train the model on `x` and `y`, and return the `History` of the training.
+
+        `x` can also be a `neura.preprocessing.DataLoader`, in which case `y`, `batch_size`
+        and `shuffle` are not used (the loader decides how the batches are made)
+
+        if `workers` is bigger than 1, each batch is split between that many processes
+        (see `neura.model.DataParallel`)
 
-        if len(x) != len(y):
-            raise ValueError("X and y are not the same size (len(x) != len(y))")
+        After each epoch the model is evaluated on `validation_data` (a tuple (x, y) or a
+        DataLoader), or on the last `validation_split` fraction of x and y (taken before shuffling).
+        `callbacks` are notified at the beginning and at the end of each epoch
+        """
 
-        elif not isinstance(epochs, int) and epochs < 1:
+        if not isinstance(epochs, int) or epochs < 1:
             raise ValueError("epochs must be an int >=1")
 
-        elif not isinstance(batch_size, int) and batch_size < 1:
-            raise ValueError("batch_size must be an int >=1")
-        
-        def set_training_flag(value: bool):            
-            def set_flag(l: Layer): l.training = value
-            return set_flag
+        if not isinstance(workers, int) or workers < 1:
+            raise ValueError("workers must be an int >=1")
+
+        if isinstance(x, preprocessing.DataLoader):
+            if workers > 1:
+                raise ValueError("a DataLoader can not be used with multiple workers")
+            if validation_split:
+                raise ValueError("validation_split can not be used with a DataLoader, use validation_data")
+            loader = x
+
+        elif y is None:
+            raise ValueError("y must be provided when x is not a DataLoader")
+
+        else:
+            # memory mapped files stay memory mapped (the workers of DataParallel reopen them)
+            x, y = np.asanyarray(x), np.asanyarray(y, dtype=self.dtype)
+
+            if len(x) != len(y):
+                raise ValueError("X and y are not the same size (len(x) != len(y))")
+
+            elif not isinstance(batch_size, int) or batch_size < 1:
+                raise ValueError("batch_size must be an int >=1")
+
+            elif not self._is_batch_input(x):
+                raise ValueError("unable to train on input of shape {}. " \
+                                 "expected shape: {}".format(np.shape(x), self._batch_shape_str()))
+
+            if workers > 1:
+                with _parallel.DataParallel(self, workers) as trainer:
+                    return trainer.train(x, y, batch_size=batch_size, epochs=epochs, shuffle=shuffle, verbose=verbose,
+                                         validation_data=validation_data, validation_split=validation_split,
+                                         callbacks=callbacks)
+
+            x, y, validation_data = self._split_validation(x, y, validation_data, validation_split)
+
+            # shuffling permutes the indices of the samples, and gathers one batch
+            # at a time in a reused buffer (the arrays are never copied as a whole)
+            loader = preprocessing.DataLoader(x, y, batch_size=batch_size, prefetch=0, shuffle=shuffle,
+                                              seed=self.generator, reuse_buffers=True)
+
+        def run_epoch() -> tuple[dict[str, float], int]:
+            totals: dict[str, float] = {}
+            samples = 0
+
+            # one forward pass, one gradient and one optimizer step per batch,
+            # the last batch contains the remaining samples (if any)
+            for x_batch, y_batch in loader:
+                y_batch = np.asarray(y_batch, dtype=self.dtype)
+
+                y_pred = self.forward(x_batch)
+                for key, value in self._batch_logs(y_batch, y_pred).items():
+                    totals[key] = totals.get(key, 0.) + value * len(x_batch)
+                samples += len(x_batch)
+                self.backward(y_batch, y_pred)
+
+            return totals, samples
+
+        return self._fit(run_epoch, epochs, validation_data, batch_size, callbacks, verbose)
+
+    def _split_validation(self, x: InputValue, y: InputValue, validation_data: Any,
+                          validation_split: float) -> tuple[InputValue, InputValue, Any]:
+        if not validation_split:
+            return x, y, validation_data
+
+        if validation_data is not None:
+            raise ValueError("validation_data and validation_split can not be used together")
+
+        if not 0 < validation_split < 1:
+            raise ValueError("validation_split must be between 0 and 1")
 
-        map(set_training_flag(True), self.layers)
+        x, y, x_val, y_val = preprocessing.validation_split(x, y, val_split=validation_split)
+        if not len(x) or not len(x_val):
+            raise ValueError("not enough samples to split in training and validation data")
+
+        return x, y, (x_val, y_val)
+
+    def _fit(self,
+             run_epoch: Callable[[], tuple[dict[str, float], int]],
+             epochs: int,
+             validation_data: Any,
+             batch_size: int,
+             callbacks: Optional[list[Callback]],
+             verbose: bool) -> History:
+        """
+        The epochs loop of the training, `run_epoch()` trains the model
+        for one epoch and returns the totals of the logs of each batch
+        (weighted by the batch size) and the number of samples
+        """
+        validation = None
+        if validation_data is not None:
+            validation = self._as_loader(validation_data, batch_size)
+
+        history = History()
+        callbacks = list(callbacks or [])
+        for callback in callbacks:
+            callback.set_model(self)
+
+        self.stop_training = False
+        logs: dict[str, float] = {}
+
+        for callback in callbacks:
+            callback.on_train_begin()
 
         for epoch in range(epochs):
-            if shuffle and self._is_batch_input(x):
-                x, y = preprocessing.shuffle(x, y)
+            for callback in callbacks:
+                callback.on_epoch_begin(epoch)
+
+            learning_rate = self.optimizer.learning_rate
+            start = _time.perf_counter()
 
-            # x_batches = [x[i:i + batch_size] for i in range(0, len(x), batch_size)]
-            # y_batches = [y[i:i + batch_size] for i in range(0, len(y), batch_size)]
+            self._set_training(True)
+            try:
+                totals, samples = run_epoch()
+            finally:
+                self._set_training(False)
 
-            epoch_loss = 0
+            train_time = _time.perf_counter() - start
+            logs = {key: value / max(samples, 1) for key, value in totals.items()}
 
-            for i, data in enumerate(x):
-                y_pred = self.forward(data)
-                epoch_loss += self.compute_loss(y[i], y_pred)
-                self.backward(y[i], y_pred)
+            if validation is not None:
+                logs.update({f"val_{key}": value for key, value in self._evaluate_loader(validation).items()})
+
+            logs["learning_rate"] = learning_rate
+            logs["time"] = _time.perf_counter() - start
+            logs["samples_per_sec"] = samples / train_time if train_time else 0.
+            history.record(epoch, logs)
 
             if verbose:
-                print(f"Epoch {epoch + 1}/{epochs}, Loss: {epoch_loss / len(x)}")
-        
-        map(set_training_flag(False), self.layers)
+                print(f"Epoch {epoch + 1}/{epochs}, Loss: {logs.get('loss', 0.)}" + "".join(
+                    f", {key}: {value:.6g}" for key, value in logs.items()
+                    if key != "loss" and key not in ("learning_rate", "time", "samples_per_sec")
+                ))
+
+            for callback in callbacks:
+                callback.on_epoch_end(epoch, logs)
+
+            if self.stop_training:
+                break
+
+        for callback in callbacks:
+            callback.on_train_end(logs)
+
+        for hook in self.hooks:
+            hook.on_train_end(self)
+
+        return history
+
+    def _set_training(self, value: bool) -> None:
+        for layer in self.layers:
+            layer.training = value
+
+    def _batch_shape_str(self) -> str:
+        input_shape = self.layers[0].input_shape or ()
+        return '(n, ' + ', '.join(str(i) for i in input_shape) + ')'
 
     def _is_batch_input(self, x: InputValue) -> bool:
         if not self.layers:
@@ -234,18 +823,21 @@ class Model:
         if not input_shape:
             raise RuntimeError("no input_shape has been provided")
 
-        if len(input_shape) + 1 != len(x.shape):
+        if len(input_shape) + 1 != np.ndim(x):
             return False
 
         return True
 
 
-    def evaluate(self, x: InputValue, y: InputValue) -> List[Any]:
+    def evaluate(self, x: Union[InputValue, preprocessing.DataLoader], y: Optional[InputValue] = None) -> List[Any]:
         """
         Evaluate the models performance
+
+        Returns the loss, followed by the value of each metric passed to `compile()`
         
         Parameters
-            :param x (np.ndarray): a batch of sample data for the model evaluation 
+            :param x (np.ndarray): a batch of sample data for the model evaluation,
+                                   or a `neura.preprocessing.DataLoader` (y is not used)
             :param y (np.ndarray): the corresponding expected results 
         """
         
@@ -255,21 +847,78 @@ class Model:
         
         if not self.layers:
             raise RuntimeError("the model has no layers yet")
-        
-        if not self._is_batch_input(x):
-            input_shape = self.layers[0].input_shape
-            if not input_shape:
-                raise ValueError("no input_shape has been provided") # just do it, ... please 
+
+        if isinstance(x, preprocessing.DataLoader):
+            logs = self._evaluate_loader(x)
+
+        else:
+            if y is None:
+                raise ValueError("y must be provided when x is not a DataLoader")
+
+            x = np.asarray(x)
             
-            raise ValueError("unable to process batch input_shape {}. " \
-                             "expected shape: {}".format(x.shape, '(n, ' + ', '.join(str(i) for i in input_shape) + ')'))
+            if not self._is_batch_input(x):
+                input_shape = self.layers[0].input_shape
+                if not input_shape:
+                    raise ValueError("no input_shape has been provided") # just do it, ... please 
+                
+                raise ValueError("unable to process batch input_shape {}. " \
+                                 "expected shape: {}".format(x.shape, self._batch_shape_str()))
 
-        
-        loss = 0
-        for i, sample in enumerate(x):
-            # TODO: reduce overhead and increase efficiency by processing all the data at once
-            loss += self.compute_loss(y[i], self.predict(sample, verbose=False))
+            if len(x) != len(y):
+                raise ValueError("X and y are not the same size (len(x) != len(y))")
+
+            # the whole batch goes through each layer at once,
+            # the loss is then reduced over all the samples
+            y_pred = self.predict(x, verbose=False)
+            logs = self._batch_logs(y, y_pred)
+
+        loss = np.float64(logs.pop("loss"))
+        metrics = {name: np.float64(value) for name, value in logs.items()}
+        e = Evaluation(loss, metrics=metrics)
+
+        for hook in self.hooks:
+            hook.on_evaluate_end(self)
+
+        return [e.loss, *metrics.values()]
 
-        e = Evaluation(np.divide(loss, x.shape[0]), metrics=None)
+    def _batch_logs(self, y_true: InputValue, y_pred: InputValue) -> dict[str, float]:
+        """
+        The loss and the metrics of a batch
+        """
+        y_true = np.asarray(y_true, dtype=self.dtype)
+        logs = {"loss": float(self.compute_loss(y_true, y_pred))}
+        for metric in self.metrics:
+            metric.workspace = self.loss.workspace
+            logs[metric.name] = metric(y_true, y_pred)
+        return logs
+
+    def _evaluate_loader(self, loader: preprocessing.DataLoader) -> dict[str, float]:
+        # the loss and the metrics of each batch are weighted by its size
+        totals: dict[str, float] = {}
+        samples = 0
+
+        for x_batch, y_batch in loader:
+            y_pred = self.predict(x_batch, verbose=False)
+            for key, value in self._batch_logs(y_batch, y_pred).items():
+                totals[key] = totals.get(key, 0.) + value * len(x_batch)
+            samples += len(x_batch)
+
+        if not samples:
+            raise ValueError("the data loader is empty")
+
+        return {key: value / samples for key, value in totals.items()}
+
+    def _as_loader(self, data: Any, batch_size: int) -> preprocessing.DataLoader:
+        if isinstance(data, preprocessing.DataLoader):
+            return data
+
+        if not isinstance(data, (tuple, list)) or len(data) != 2:
+            raise ValueError("validation_data must be a tuple (x, y) or a DataLoader")
+
+        x, y = np.asarray(data[0]), np.asarray(data[1], dtype=self.dtype)
+        if not self._is_batch_input(x):
+            raise ValueError("unable to validate on input of shape {}. " \
+                             "expected shape: {}".format(x.shape, self._batch_shape_str()))
 
-        return [e.loss]
+        return preprocessing.DataLoader(x, y, batch_size=batch_size, prefetch=0)
@@ -0,0 +1,399 @@
+"""
+Data parallel training on multiple processes
+
+The parameters of the model live in shared memory, together with one row of gradients
+for each worker. At each step every worker computes the gradients of its share of
+the batch in its own row, then the main process combines the rows and applies a single
+optimizer step to the shared parameters, which the workers see immediately.
+
+Only the indices of the samples are sent to the workers, the data is shared as well
+(memory mapped arrays are reopened by the workers instead of being copied)
+"""
+
+import mmap
+import multiprocessing as _mp
+import os
+import traceback
+from multiprocessing import shared_memory as _shared_memory
+from typing import TYPE_CHECKING, Any, Optional, Union, cast
+
+import numpy as np
+
+from neura.utils.types import InputValue
+
+if TYPE_CHECKING:
+    from multiprocessing.context import ForkContext, ForkServerContext, SpawnContext
+    from neura.evaluation import History
+    from neura.model.model import Model
+
+
+# how a worker can find an array: ("shm", name, dtype, shape) or ("memmap", filename, dtype, shape, offset)
+ArrayHandle = tuple[Any, ...]
+
+
+def _attach(name: str) -> _shared_memory.SharedMemory:
+    # the segments are owned (and unlinked) by the main process,
+    # the workers must not register them with the resource tracker
+    try:
+        return _shared_memory.SharedMemory(name=name, track=False)  # type: ignore[call-arg]
+    except TypeError:
+        pass
+
+    # before python 3.13 attaching always registers the segment
+    from multiprocessing import resource_tracker
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args, **kwargs: None
+    try:
+        return _shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+class _SharedArrays:
+    """
+    The shared memory segments created by the main process
+    """
+
+    def __init__(self) -> None:
+        self.segments: list[_shared_memory.SharedMemory] = []
+
+    def create(self, shape: tuple[int, ...], dtype: np.dtype) -> tuple[np.ndarray, ArrayHandle]:
+        size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+        shm = _shared_memory.SharedMemory(create=True, size=size)
+        self.segments.append(shm)
+        return np.ndarray(shape, dtype=dtype, buffer=shm.buf), ("shm", shm.name, np.dtype(dtype).str, shape)
+
+    def share(self, array: np.ndarray) -> ArrayHandle:
+        # files mapped in memory are opened again by the workers
+        # (only whole files, the offset of a slice is not known)
+        if isinstance(array, np.memmap) and isinstance(array.base, mmap.mmap) and array.filename:
+            return ("memmap", array.filename, array.dtype.str, array.shape, array.offset)
+
+        shared, handle = self.create(array.shape, array.dtype)
+        np.copyto(shared, array)
+        return handle
+
+    def release(self) -> None:
+        for shm in self.segments:
+            try:
+                shm.close()
+            except BufferError:
+                # still used by some array, the memory is freed with it
+                pass
+            shm.unlink()
+        self.segments.clear()
+
+
+def _open(handle: ArrayHandle, segments: list[_shared_memory.SharedMemory]) -> np.ndarray:
+    if handle[0] == "memmap":
+        _, filename, dtype, shape, offset = handle
+        return np.memmap(filename, dtype=np.dtype(dtype), mode="r", shape=tuple(shape), offset=offset)
+
+    _, name, dtype, shape = handle
+    shm = _attach(name)
+    segments.append(shm)
+    return np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+def _worker(rank: int, model_class: type, config: dict[str, Any], arrays: list[dict[str, np.ndarray]],
+            parameters: ArrayHandle, gradients: ArrayHandle, connection: Any) -> None:
+    segments: list[_shared_memory.SharedMemory] = []
+    data: list[_shared_memory.SharedMemory] = []
+    model = x = y = None
+
+    try:
+        model = model_class.from_config(config, parameters=_open(parameters, segments), arrays=arrays)
+        model._allocate_parameters(model.parameters, gradients=_open(gradients, segments)[rank])
+        model._set_training(True)
+
+        # seeded layers (like Dropout) must not behave the same way in all the workers
+        for layer in model.layers:
+            if getattr(layer, "seed", None) is not None and hasattr(layer, "generator"):
+                layer.generator = np.random.default_rng([layer.seed, rank])
+
+        connection.send(("ready", None))
+
+        while True:
+            command, payload = connection.recv()
+
+            if command == "stop":
+                break
+
+            elif command == "data":
+                x_handle, y_handle, model.loss, model.metrics = payload
+                x, y = _open(x_handle, data), _open(y_handle, data)
+                connection.send(("ready", None))
+
+            elif command == "release":
+                x = y = None
+                for shm in data:
+                    try:
+                        shm.close()
+                    except BufferError:
+                        pass
+                data.clear()
+                connection.send(("ready", None))
+
+            elif command == "step":
+                indices = payload
+                assert x is not None and y is not None, "no data received"
+                if not len(indices):
+                    model.gradients.fill(0)
+                    connection.send(("done", {}))
+                    continue
+
+                x_batch = np.take(x, indices, axis=0)
+                y_batch = np.take(y, indices, axis=0)
+                y_pred = model.forward(x_batch)
+                logs = model._batch_logs(y_batch, y_pred)
+                model.compute_gradients(y_batch, y_pred)
+                connection.send(("done", logs))
+
+    except BaseException:
+        connection.send(("error", traceback.format_exc()))
+
+    finally:
+        model = x = y = None
+        for shm in data + segments:
+            try:
+                shm.close()
+            except BufferError:
+                pass
+
+
+class DataParallel:
+    """
+    Train a model on multiple processes.
+
+    Each batch is split between `workers` processes, which compute the gradients of
+    their share. The gradients are then averaged (weighted by the size of each share),
+    or summed if the loss uses reduction="sum", and a single optimizer step is applied,
+    so training is equivalent to `Model.train()`
+
+    ```
+    with DataParallel(model, workers=8) as trainer:
+        trainer.train(x, y, batch_size=256, epochs=10)
+    ```
+
+    While the trainer is open, the parameters of the model are in shared memory,
+    they are moved back to the process memory by `close()`
+
+    parameters:
+
+    - model:          a compiled model
+    - workers:        the number of processes (by default, one per cpu)
+    - start_method:   the multiprocessing start method ("fork", "spawn", "forkserver"),
+                      by default the one of the platform
+    """
+
+    def __init__(self, model: "Model", workers: Optional[int] = None, start_method: Optional[str] = None) -> None:
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        if not isinstance(workers, int) or workers < 1:
+            raise ValueError("workers must be an int >=1")
+
+        if not model.layers:
+            raise RuntimeError("the model has no layers yet")
+
+        if any(layer.sparse_gradients for layer in model.layers):
+            raise ValueError("layers with sparse gradients (like Embedding) can not be trained on multiple workers")
+
+        self.model = model
+        self.workers = workers
+        # get_context() is typed as returning the abstract BaseContext for any name
+        self.context = cast(Union["ForkContext", "SpawnContext", "ForkServerContext"], _mp.get_context(start_method))
+
+        self._shared = _SharedArrays()
+        self._processes: list[Any] = []
+        self._connections: list[Any] = []
+        self._gradients: Optional[np.ndarray] = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._processes)
+
+    def start(self) -> None:
+        """
+        Move the parameters to shared memory and start the workers
+        """
+        if self.running:
+            return
+
+        model = self.model
+        parameters, parameters_handle = self._shared.create(model.parameters.shape, model.dtype)
+        gradients, gradients_handle = self._shared.create((self.workers, model.gradients.size), model.dtype)
+        self._gradients = gradients
+
+        # the optimizer keeps its state (like Adam's moments) for the new buffer
+        np.copyto(parameters, model.parameters)
+        model.optimizer.move_state(model.parameters, parameters)
+        model._allocate_parameters(parameters)
+
+        config, arrays = model.get_config(), model.get_layer_arrays()
+        for rank in range(self.workers):
+            connection, worker_connection = self.context.Pipe()
+            process = self.context.Process(
+                target=_worker,
+                args=(rank, type(model), config, arrays, parameters_handle, gradients_handle, worker_connection),
+                name=f"DataParallel-{rank}",
+                daemon=True,
+            )
+            process.start()
+            worker_connection.close()
+            self._processes.append(process)
+            self._connections.append(connection)
+
+        try:
+            self._gather()
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        """
+        Stop the workers and move the parameters back to the process memory
+        """
+        if not self._processes:
+            self._shared.release()
+            return
+
+        for connection, process in zip(self._connections, self._processes):
+            if process.is_alive():
+                try:
+                    connection.send(("stop", None))
+                except (BrokenPipeError, OSError):
+                    pass
+
+        for connection, process in zip(self._connections, self._processes):
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+            connection.close()
+
+        self._processes.clear()
+        self._connections.clear()
+
+        model = self.model
+        shared_parameters = model.parameters
+        parameters = shared_parameters.copy()
+        model.optimizer.move_state(shared_parameters, parameters)
+        model._allocate_parameters(parameters)
+
+        del shared_parameters
+        self._gradients = None
+        self._shared.release()
+
+    def __enter__(self) -> "DataParallel":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _send(self, command: str, payloads: list[Any]) -> None:
+        for connection, payload in zip(self._connections, payloads):
+            connection.send((command, payload))
+
+    def _gather(self) -> list[Any]:
+        results = []
+        for rank, connection in enumerate(self._connections):
+            try:
+                status, result = connection.recv()
+            except EOFError:
+                raise RuntimeError(f"worker {rank} stopped unexpectedly") from None
+
+            if status == "error":
+                raise RuntimeError(f"worker {rank} failed:\n{result}")
+            results.append(result)
+        return results
+
+    def train(self,
+              x: InputValue,
+              y: InputValue,
+              batch_size: int = 16,
+              epochs: int = 5,
+              shuffle: bool = False,
+              verbose: bool = True,
+              validation_data: Any = None,
+              validation_split: float = 0.,
+              callbacks: Optional[list[Any]] = None) -> "History":
+        """
+        Same as `Model.train()`, with each batch split between the workers
+        (the validation runs in the main process)
+        """
+        model = self.model
+        x = np.asanyarray(x)
+        y = np.asanyarray(y, dtype=model.dtype)
+
+        if len(x) != len(y):
+            raise ValueError("X and y are not the same size (len(x) != len(y))")
+
+        elif not isinstance(epochs, int) or epochs < 1:
+            raise ValueError("epochs must be an int >=1")
+
+        elif not isinstance(batch_size, int) or batch_size < 1:
+            raise ValueError("batch_size must be an int >=1")
+
+        elif not model._is_batch_input(x):
+            raise ValueError("unable to train on input of shape {}. " \
+                             "expected shape: {}".format(np.shape(x), model._batch_shape_str()))
+
+        x, y, validation_data = model._split_validation(x, y, validation_data, validation_split)
+        self.start()
+
+        data = _SharedArrays()
+        try:
+            handles = (data.share(x), data.share(y), model.loss, model.metrics)
+            self._send("data", [handles] * self.workers)
+            self._gather()
+
+            try:
+                return model._fit(lambda: self._epoch(len(x), batch_size, shuffle),
+                                  epochs, validation_data, batch_size, callbacks, verbose)
+            finally:
+                self._send("release", [None] * self.workers)
+                self._gather()
+
+        except BaseException:
+            # the workers may be in any state, start from scratch
+            self.close()
+            raise
+
+        finally:
+            data.release()
+
+    def _epoch(self, size: int, batch_size: int, shuffle: bool) -> tuple[dict[str, float], int]:
+        model = self.model
+        gradients = self._gradients
+        assert gradients is not None, "the workers are not running"
+        # the gradients of the workers, weighted by the size of their share
+        # (the losses reduced with a sum are simply added together)
+        shares = np.zeros(self.workers, dtype=model.dtype)
+        summed = model.loss.reduction == "sum"
+        totals: dict[str, float] = {}
+
+        order = model.generator.permutation(size) if shuffle else np.arange(size)
+
+        for start in range(0, size, batch_size):
+            # sorted indices read memory mapped files (almost) sequentially
+            indices = order[start:start + batch_size]
+            if shuffle:
+                indices = np.sort(indices)
+
+            split = np.array_split(indices, self.workers)
+            self._send("step", split)
+            logs = self._gather()
+
+            for rank, part in enumerate(split):
+                shares[rank] = 1. if summed else len(part) / len(indices)
+                for key, value in logs[rank].items():
+                    # the loss of the batch is the sum of the losses of the shares
+                    weight = len(indices) if summed and key == "loss" else len(part)
+                    totals[key] = totals.get(key, 0.) + value * weight
+
+            # weighted sum (all-reduce) of the gradients, then one step for everyone
+            np.matmul(shares, gradients, out=model.gradients)
+            model.apply_gradients()
+
+        return totals, size
@@ -0,0 +1,121 @@
+"""
+Inference plans: the layers of a model reduced to the array operations
+that are really needed to compute its predictions
+
+- layers that do nothing at inference (like Dropout) are dropped
+- consecutive Flatten/Reshape layers become a single reshape (a view, no copy)
+- Dense layers and their activation become a single step, computed in place
+  (in the workspace of the layer, if the model uses one)
+- the shapes are validated once, when the plan is built
+"""
+
+from typing import TYPE_CHECKING, Callable
+
+import numpy as np
+
+from neura.activation import Linear
+from neura.layers import Dense, Dropout, Flatten, Layer, Reshape
+from neura.utils.types import InputValue, OutputValue
+
+if TYPE_CHECKING:
+    from neura.model.model import Model
+
+
+Step = Callable[[InputValue], OutputValue]
+
+
+def _reshape_step(shape: tuple[int, ...]) -> Step:
+    def reshape(x: InputValue) -> OutputValue:
+        return x.reshape((x.shape[0], *shape))
+    return reshape
+
+
+def _dense_step(layer: Dense) -> Step:
+    weights = layer.weights
+    bias = layer.bias if layer.use_bias else None
+    activation = None if isinstance(layer.activation, Linear) else layer.activation
+    workspace = layer.workspace
+    units, dtype = layer.units, layer.dtype
+
+    def dense(x: InputValue) -> OutputValue:
+        out = None if workspace is None else workspace.get("plan", (*x.shape[:-1], units), dtype)
+        z = np.matmul(x, weights, out=out)
+        if bias is not None:
+            z += bias
+        np.clip(z, -1e10, 1e10, out=z)
+        # the weighted sums are not needed anymore, the activation overwrites them
+        return z if activation is None else activation.apply_formula(z, out=z)
+    return dense
+
+
+class InferencePlan:
+    """
+    The sequence of steps computing the output of a model (see `Model.freeze()`)
+
+    The steps use the parameters of the layers directly, so changes to the
+    parameters are seen by the plan, as long as they stay in the same buffer
+    """
+
+    def __init__(self, model: "Model") -> None:
+        if not model.layers:
+            raise RuntimeError("the model has no layers yet")
+
+        self.dtype = model.dtype
+        self.input_shape = tuple(model.layers[0].input_shape or ())
+        self.steps: list[Step] = []
+
+        shape = self.input_shape
+        reshape_to = None
+
+        for i, layer in enumerate(model.layers):
+            output_shape = tuple(layer.compute_output_shape(shape))
+
+            if isinstance(layer, Dropout):
+                continue
+
+            if isinstance(layer, (Flatten, Reshape)):
+                if np.prod(output_shape) != np.prod(shape):
+                    raise ValueError(f"layer {i + 1} ({layer.name}) can not reshape {shape} into {output_shape}")
+                reshape_to = output_shape
+                shape = output_shape
+                continue
+
+            # the reshapes are applied right before the next layer that uses the data
+            if reshape_to is not None:
+                self.steps.append(_reshape_step(reshape_to))
+                reshape_to = None
+
+            self.steps.append(self._layer_step(i, layer, shape))
+            shape = output_shape
+
+        if reshape_to is not None:
+            self.steps.append(_reshape_step(reshape_to))
+
+        self.output_shape = shape
+
+    @staticmethod
+    def _layer_step(index: int, layer: Layer, shape: tuple[int, ...]) -> Step:
+        # subclasses of Dense may change its forward pass, only fuse the real one
+        if type(layer) is Dense:
+            if not shape or shape[-1] != layer.weights.shape[0]:
+                raise ValueError(f"layer {index + 1} ({layer.name}) expects {layer.weights.shape[0]} " \
+                                 f"inputs, received shape {shape}")
+            return _dense_step(layer)
+
+        return layer.forward
+
+    def __call__(self, x: InputValue) -> OutputValue:
+        """
+        Compute the outputs of a batch
+        """
+        x = np.asarray(x)
+        # integer inputs (like the ids of an Embedding) are kept as they are
+        if x.dtype.kind not in "iu":
+            x = x.astype(self.dtype, copy=False)
+        if x.shape[1:] != self.input_shape:
+            raise ValueError("unable to process batch of shape {}. " \
+                             "expected shape: (n, {})".format(x.shape, ", ".join(str(i) for i in self.input_shape)))
+
+        for step in self.steps:
+            x = step(x)
+        return x
@@ -0,0 +1,119 @@
+"""
+Save and load models to/from a single file
+
+The file starts with a small json header, describing the architecture of the model and
+where its arrays are stored in the file. The arrays follow as raw data, each one aligned
+to `ALIGNMENT` bytes, so that they can be memory mapped without copying them
+
+    | MAGIC | header size (uint64) | header (json) | padding | parameters | ...
+
+The arrays of the layers that are not parameters (see `Model.get_layer_arrays()`),
+including the masks of pruned layers, follow the parameters, named "layers/<index>/<name>"
+"""
+
+import json
+import struct
+from typing import TYPE_CHECKING, Any, BinaryIO
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from neura.model.model import Model
+
+
+MAGIC = b"\x93NEURA\x00\x01"
+ALIGNMENT = 64
+FORMAT_VERSION = 1
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def save(model: "Model", path: str) -> None:
+    """
+    Write the architecture and the parameters of `model` to `path`
+    """
+    arrays: dict[str, np.ndarray[Any, Any]] = {"parameters": np.ascontiguousarray(model.parameters)}
+    for i, layer_arrays in enumerate(model.get_layer_arrays()):
+        for name, array in layer_arrays.items():
+            arrays[f"layers/{i}/{name}"] = np.ascontiguousarray(array)
+
+    header: dict[str, Any] = {
+        "version": FORMAT_VERSION,
+        "model": model.get_config(),
+        "arrays": {},
+    }
+
+    # the position of the arrays depends on the size of the header, and vice versa.
+    # offsets are relative to the end of the header, which is aligned
+    offset = 0
+    for name, array in arrays.items():
+        header["arrays"][name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = _align(offset + array.nbytes)
+
+    encoded = json.dumps(header).encode("utf-8")
+    data_start = _align(len(MAGIC) + 8 + len(encoded))
+
+    with open(path, "wb") as fp:
+        fp.write(MAGIC)
+        fp.write(struct.pack("<Q", data_start))
+        fp.write(encoded)
+
+        for name, array in arrays.items():
+            _pad(fp, data_start + header["arrays"][name]["offset"])
+            fp.write(array.tobytes())
+
+
+def _pad(fp: BinaryIO, position: int) -> None:
+    fp.write(b"\x00" * (position - fp.tell()))
+
+
+def read_header(path: str) -> tuple[dict[str, Any], int]:
+    """
+    Read the header of a model file
+
+    Returns the header and the position where the data begins
+    """
+    with open(path, "rb") as fp:
+        if fp.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"'{path}' is not a model file")
+
+        data_start, = struct.unpack("<Q", fp.read(8))
+        header = json.loads(fp.read(data_start - len(MAGIC) - 8).rstrip(b"\x00"))
+
+    if header.get("version") != FORMAT_VERSION:
+        raise ValueError(f"unsupported model file version: {header.get('version')}")
+
+    return header, data_start
+
+
+def load(cls: "type[Model]", path: str, mmap: bool = True) -> "Model":
+    """
+    Create a model from the file at `path`
+    """
+    header, data_start = read_header(path)
+
+    parameters = _read_array(path, header["arrays"]["parameters"], data_start, mmap)
+
+    arrays: list[dict[str, np.ndarray[Any, Any]]] = [{} for _ in header["model"]["layers"]]
+    for name, info in header["arrays"].items():
+        if name.startswith("layers/"):
+            _, index, array_name = name.split("/", 2)
+            arrays[int(index)][array_name] = _read_array(path, info, data_start, mmap)
+
+    # the layers become views into the loaded parameters, without copying them
+    return cls.from_config(header["model"], parameters=parameters, arrays=arrays)
+
+
+def _read_array(path: str, info: dict[str, Any], data_start: int, mmap: bool) -> np.ndarray[Any, Any]:
+    dtype = np.dtype(info["dtype"])
+    shape = tuple(info["shape"])
+    offset = data_start + info["offset"]
+
+    if mmap and dtype.itemsize * int(np.prod(shape)) > 0:
+        # copy on write: pages are shared until they are modified,
+        # and changes are never written back to the file
+        return np.memmap(path, dtype=dtype, mode="c", offset=offset, shape=shape)
+
+    return np.fromfile(path, dtype=dtype, count=int(np.prod(shape)), offset=offset).reshape(shape)
@@ -15,7 +15,8 @@ class BaseNode(_ABC):
         return f"{type(self).__name__}(activation='{self.activation.name}', weights={self.weights})"
 
     def activate(self, res: np.float64) -> np.float64:
-        return self.activation.apply_formula(res)
+        # the activation functions work on arrays, a single value is a 0-d array
+        return np.float64(self.activation.apply_formula(np.asarray(res)))
 
     @_abstractmethod
     def calc(self, x: InputValue) -> NodeOutput:
@@ -37,12 +38,12 @@ class Node(BaseNode):
             raise ValueError(f"Input size {len(x)} does not match number of weights {len(self.weights)}")
 
         self.input = np.array(x)
-        weighted_sum = np.sum(self.input * self.weights, dtype=np.float64)
+        weighted_sum = np.sum(self.input * self.weights, dtype=self.weights.dtype)
         
         # Clip weighted_sum to avoid overflow
         weighted_sum = np.clip(weighted_sum, -1e10, 1e10)
         
         self.z = weighted_sum
         out = self.activate(weighted_sum)
-        return np.float64(out)
+        return self.weights.dtype.type(out)
     
\ No newline at end of file
@@ -3,3 +3,6 @@
 
 from .base import Optimizer
 from .sgd import SGD
+from .momentum import Momentum
+from .rmsprop import RMSProp
+from .adam import Adam, AdamW
@@ -0,0 +1,110 @@
+from typing import Any
+import numpy as np
+
+from neura.optimizers import Optimizer
+from neura.utils.types import Gradients, NodeWeights 
+
+class Adam(Optimizer):
+    """
+    Adam
+    ====
+
+    Adaptive Moment Estimation, uses moving averages of the gradients and of
+    their squares (with bias correction) to scale the update of each weight.
+    """
+
+    def __init__(self,
+                 learning_rate: float = 0.001,
+                 beta_1: float = 0.9,
+                 beta_2: float = 0.999,
+                 epsilon: float = 1e-7,
+                 name: str = "Adam",
+                 **kwargs: Any
+                 ) -> None:
+        super().__init__(learning_rate=learning_rate, name=name, **kwargs)
+        self.beta_1 = beta_1
+        self.beta_2 = beta_2
+        self.epsilon = epsilon
+
+    def apply_gradients(self, weights: NodeWeights, gradients: Gradients) -> NodeWeights:
+        state = self.get_state(weights, buffers=3)
+        m, v, scratch = state.buffers
+        state.step += 1
+
+        # m = beta_1 * m + (1 - beta_1) * g
+        np.multiply(gradients, 1 - self.beta_1, out=scratch)
+        m *= self.beta_1
+        m += scratch
+
+        # v = beta_2 * v + (1 - beta_2) * g^2
+        np.square(gradients, out=scratch)
+        scratch *= 1 - self.beta_2
+        v *= self.beta_2
+        v += scratch
+
+        # w -= learning_rate * m_hat / (sqrt(v_hat) + epsilon)
+        m_correction = 1 - self.beta_1 ** state.step
+        v_correction = 1 - self.beta_2 ** state.step
+
+        np.sqrt(v, out=scratch)
+        scratch *= 1 / v_correction ** .5
+        scratch += self.epsilon
+        np.divide(m, scratch, out=scratch)
+        scratch *= self.learning_rate / m_correction
+        weights -= scratch
+        return weights
+
+    def apply_sparse_gradients(self, weights: NodeWeights, indices: np.ndarray, gradients: Gradients) -> NodeWeights:
+        # "lazy" Adam: the moments of the rows that are not used are not decayed,
+        # the bias correction uses the number of updates of the whole table
+        # only the moments, the scratch buffer of the dense update is not needed
+        state = self.get_state(weights, buffers=2)
+        m, v = state.buffers[:2]
+        state.step += 1
+
+        m_rows = m[indices]
+        m_rows *= self.beta_1
+        m_rows += (1 - self.beta_1) * gradients
+        m[indices] = m_rows
+
+        v_rows = v[indices]
+        v_rows *= self.beta_2
+        v_rows += (1 - self.beta_2) * np.square(gradients)
+        v[indices] = v_rows
+
+        m_correction = 1 - self.beta_1 ** state.step
+        v_correction = 1 - self.beta_2 ** state.step
+        update = m_rows / (np.sqrt(v_rows) / v_correction ** .5 + self.epsilon)
+        weights[indices] -= self.learning_rate / m_correction * update
+        return weights
+
+
+class AdamW(Adam):
+    """
+    AdamW
+    =====
+
+    Adam with decoupled weight decay: the weights shrink by `learning_rate * weight_decay`
+    at every step, independently from the gradients.
+    """
+
+    def __init__(self,
+                 learning_rate: float = 0.001,
+                 weight_decay: float = 0.004,
+                 beta_1: float = 0.9,
+                 beta_2: float = 0.999,
+                 epsilon: float = 1e-7,
+                 name: str = "AdamW",
+                 **kwargs: Any
+                 ) -> None:
+        super().__init__(learning_rate=learning_rate, beta_1=beta_1, beta_2=beta_2,
+                         epsilon=epsilon, name=name, **kwargs)
+        self.weight_decay = weight_decay
+
+    def apply_gradients(self, weights: NodeWeights, gradients: Gradients) -> NodeWeights:
+        weights *= 1 - self.learning_rate * self.weight_decay
+        return super().apply_gradients(weights, gradients)
+
+    def apply_sparse_gradients(self, weights: NodeWeights, indices: np.ndarray, gradients: Gradients) -> NodeWeights:
+        weights[indices] *= 1 - self.learning_rate * self.weight_decay
+        return super().apply_sparse_gradients(weights, indices, gradients)
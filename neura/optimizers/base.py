@@ -1,17 +1,36 @@
 from abc import ABC as _ABC, abstractmethod as _abstractmethod
 from typing import Optional
+import numpy as np
 
 from neura.utils.types import NodeWeights, Gradients
 
 
+class OptimizerState:
+    """
+    The buffers an optimizer keeps for a single parameter tensor
+    """
+
+    def __init__(self, weights: NodeWeights, buffers: int) -> None:
+        # keep a reference to the weights, so that their id can not be reused
+        self.weights = weights
+        self.buffers = [np.zeros_like(weights) for _ in range(buffers)]
+        self.step = 0
+
+
 class Optimizer(_ABC):
-    def __init__( self, learning_rate: float, name: Optional[str] = None ):
+    def __init__( self, learning_rate: float, name: Optional[str] = None, clipnorm: Optional[float] = None ):
 
         if name is None:
             name = self.__class__.__name__
         self.name = name
         self.learning_rate = learning_rate
 
+        # if set, gradients with a bigger L2 norm are scaled down to this norm
+        self.clipnorm = clipnorm
+
+        # state of each parameter tensor, by id
+        self._state: dict[int, OptimizerState] = {}
+
 
     @_abstractmethod
     def apply_gradients(self, weights: NodeWeights, gradients: Gradients) -> NodeWeights:
@@ -32,5 +51,65 @@ class Optimizer(_ABC):
         """
         raise NotImplementedError("This method should be implemented in a subclass")
 
+    def apply_sparse_gradients(self, weights: NodeWeights, indices: np.ndarray, gradients: Gradients) -> NodeWeights:
+        """
+        Update only the rows `indices` of `weights` (each row at most once),
+        `gradients` holds the gradients of those rows.
+
+        The default implementation scatters the gradients into a dense array and calls
+        `apply_gradients()`, optimizers override it to only touch the given rows
+        (and their state)
+        """
+        dense = np.zeros_like(weights)
+        dense[indices] = gradients
+        return self.apply_gradients(weights, dense)
+
+    def clip_gradients(self, gradients: Gradients, *sparse_gradients: Gradients) -> Gradients:
+        """
+        Scale the gradients in place, so that their L2 norm is not bigger than `clipnorm`
+
+        The gradients of the rows updated by `apply_sparse_gradients()` can be passed
+        as well, the norm is computed over all of them together
+        """
+        if self.clipnorm is None:
+            return gradients
+
+        norm = np.sqrt(sum(np.vdot(g, g) for g in (gradients, *sparse_gradients)))
+        if norm > self.clipnorm:
+            for g in (gradients, *sparse_gradients):
+                g *= self.clipnorm / norm
+        return gradients
+
+    def get_state(self, weights: NodeWeights, buffers: int) -> OptimizerState:
+        """
+        Get the state associated with `weights`.
+
+        The first time some weights are seen, `buffers` arrays with their same shape
+        are allocated (filled with zeros), the following calls return the same arrays.
+        The state can hold more buffers than requested (the first ones are the same),
+        if the weights were also updated in a way that needed more of them
+        """
+        state = self._state.get(id(weights))
+        if state is None or state.weights is not weights:
+            state = OptimizerState(weights, buffers)
+            self._state[id(weights)] = state
+        elif len(state.buffers) < buffers:
+            state.buffers += [np.zeros_like(weights) for _ in range(buffers - len(state.buffers))]
+        return state
 
+    def move_state(self, weights: NodeWeights, new_weights: NodeWeights) -> None:
+        """
+        Keep the state of `weights` for `new_weights`
+        (used when the parameters are moved to a different buffer)
+        """
+        state = self._state.pop(id(weights), None)
+        if state is not None and state.weights is weights:
+            state.weights = new_weights
+            self._state[id(new_weights)] = state
+
+    def reset(self) -> None:
+        """
+        Forget the state accumulated for all the weights
+        """
+        self._state.clear()
 
@@ -0,0 +1,56 @@
+from typing import Any
+import numpy as np
+
+from neura.optimizers import Optimizer
+from neura.utils.types import Gradients, NodeWeights 
+
+class Momentum(Optimizer):
+    """
+    Momentum
+    ========
+
+    Gradient Descent that keeps moving in the direction of the previous updates,
+    optionally with Nesterov's lookahead.
+    """
+
+    def __init__(self,
+                 learning_rate: float = 0.01,
+                 momentum: float = 0.9,
+                 nesterov: bool = False,
+                 name: str = "Momentum",
+                 **kwargs: Any
+                 ) -> None:
+        super().__init__(learning_rate=learning_rate, name=name, **kwargs)
+        self.momentum = momentum
+        self.nesterov = nesterov
+
+    def apply_gradients(self, weights: NodeWeights, gradients: Gradients) -> NodeWeights:
+        velocity, scratch = self.get_state(weights, buffers=2).buffers
+
+        # v = momentum * v - learning_rate * g
+        np.multiply(gradients, self.learning_rate, out=scratch)
+        velocity *= self.momentum
+        velocity -= scratch
+
+        if self.nesterov:
+            # w += momentum * v - learning_rate * g
+            weights -= scratch
+            np.multiply(velocity, self.momentum, out=scratch)
+            weights += scratch
+        else:
+            weights += velocity
+        return weights
+
+    def apply_sparse_gradients(self, weights: NodeWeights, indices: np.ndarray, gradients: Gradients) -> NodeWeights:
+        # the velocity of the rows that are not used stays the same until they are
+        velocity = self.get_state(weights, buffers=1).buffers[0]
+        rows = velocity[indices]
+        rows *= self.momentum
+        rows -= self.learning_rate * gradients
+        velocity[indices] = rows
+
+        if self.nesterov:
+            weights[indices] += self.momentum * rows - self.learning_rate * gradients
+        else:
+            weights[indices] += rows
+        return weights
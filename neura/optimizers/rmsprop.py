@@ -0,0 +1,51 @@
+from typing import Any
+import numpy as np
+
+from neura.optimizers import Optimizer
+from neura.utils.types import Gradients, NodeWeights 
+
+class RMSProp(Optimizer):
+    """
+    RMSProp
+    =======
+
+    Scale the learning rate of each weight by a moving average of its squared gradients.
+    """
+
+    def __init__(self,
+                 learning_rate: float = 0.001,
+                 rho: float = 0.9,
+                 epsilon: float = 1e-7,
+                 name: str = "RMSProp",
+                 **kwargs: Any
+                 ) -> None:
+        super().__init__(learning_rate=learning_rate, name=name, **kwargs)
+        self.rho = rho
+        self.epsilon = epsilon
+
+    def apply_gradients(self, weights: NodeWeights, gradients: Gradients) -> NodeWeights:
+        mean_square, scratch = self.get_state(weights, buffers=2).buffers
+
+        # s = rho * s + (1 - rho) * g^2
+        np.square(gradients, out=scratch)
+        scratch *= 1 - self.rho
+        mean_square *= self.rho
+        mean_square += scratch
+
+        # w -= learning_rate * g / (sqrt(s) + epsilon)
+        np.sqrt(mean_square, out=scratch)
+        scratch += self.epsilon
+        np.divide(gradients, scratch, out=scratch)
+        scratch *= self.learning_rate
+        weights -= scratch
+        return weights
+
+    def apply_sparse_gradients(self, weights: NodeWeights, indices: np.ndarray, gradients: Gradients) -> NodeWeights:
+        mean_square = self.get_state(weights, buffers=1).buffers[0]
+        rows = mean_square[indices]
+        rows *= self.rho
+        rows += (1 - self.rho) * np.square(gradients)
+        mean_square[indices] = rows
+
+        weights[indices] -= self.learning_rate * gradients / (np.sqrt(rows) + self.epsilon)
+        return weights
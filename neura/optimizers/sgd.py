@@ -1,4 +1,5 @@
 from typing import Any
+import numpy as np
 
 from neura.optimizers import Optimizer
 from neura.utils.types import Gradients, NodeWeights 
@@ -20,5 +21,12 @@ class SGD(Optimizer):
 
     def apply_gradients(self, weights: NodeWeights, gradients: Gradients) -> NodeWeights:
         # Update the weights in place and return a reference
-        weights -= self.learning_rate * gradients
+        # (the step is computed in a buffer kept between the calls)
+        scratch = self.get_state(weights, buffers=1).buffers[0]
+        np.multiply(gradients, self.learning_rate, out=scratch)
+        np.subtract(weights, scratch, out=weights)
+        return weights
+
+    def apply_sparse_gradients(self, weights: NodeWeights, indices: np.ndarray, gradients: Gradients) -> NodeWeights:
+        weights[indices] -= self.learning_rate * gradients
         return weights
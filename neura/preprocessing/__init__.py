@@ -3,3 +3,11 @@ from .data_processing import (
     shuffle,
     validation_split
 )
+
+from .data_loader import (
+    ArrayDataset,
+    ChunkedDataset,
+    DataLoader,
+    Dataset,
+    GeneratorDataset
+)
@@ -0,0 +1,322 @@
+"""
+Load batches of data from arrays, memory mapped files or generators,
+while the model is busy with the previous batches
+"""
+
+import os
+import queue
+import threading
+from abc import ABC as _ABC, abstractmethod as _abstractmethod
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence, Union, cast
+
+import numpy as np
+from neura.utils.types import InputValue
+
+Batch = tuple[InputValue, InputValue]
+PathLike = Union[str, "os.PathLike[str]"]
+
+
+class Dataset(_ABC):
+    """
+    Base class for all the sources of data of a DataLoader
+    """
+
+    @_abstractmethod
+    def batches(self, batch_size: int) -> Iterator[Batch]:
+        """
+        Iterate over the (x, y) batches of the dataset, in order
+        """
+        ...
+
+    def take(self, indices: np.ndarray, out: Optional[Batch] = None) -> Batch:
+        """
+        Get the samples at `indices` (sorted), written in `out` if provided.
+
+        Only the datasets with random access support this method (and shuffling)
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} does not support random access")
+
+
+def _load(data: Union[InputValue, PathLike]) -> InputValue:
+    # .npy files are memory mapped, only the batches that are used are read
+    if isinstance(data, (str, os.PathLike)):
+        return np.load(data, mmap_mode="r")
+    return np.asarray(data)
+
+
+def _read(array: InputValue) -> InputValue:
+    # slicing a memory mapped array does not read anything,
+    # copy it so that the data is read now (on the loading thread)
+    if isinstance(array, np.memmap):
+        return np.array(array)
+    return array
+
+
+class ArrayDataset(Dataset):
+    """
+    A dataset made of two arrays (or .npy files) with the same length
+    """
+
+    def __init__(self, x: Union[InputValue, PathLike], y: Union[InputValue, PathLike]) -> None:
+        self.x = _load(x)
+        self.y = _load(y)
+
+        if len(self.x) != len(self.y):
+            raise ValueError("X and y are not the same size (len(x) != len(y))")
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    def batches(self, batch_size: int) -> Iterator[Batch]:
+        for start in range(0, len(self), batch_size):
+            yield _read(self.x[start:start + batch_size]), _read(self.y[start:start + batch_size])
+
+    def take(self, indices: np.ndarray, out: Optional[Batch] = None) -> Batch:
+        x_out, y_out = out if out is not None else (None, None)
+        return np.take(self.x, indices, axis=0, out=x_out), np.take(self.y, indices, axis=0, out=y_out)
+
+
+class ChunkedDataset(Dataset):
+    """
+    A dataset split into multiple .npy files (chunks), read one after the other.
+
+    Batches can span multiple chunks
+    """
+
+    def __init__(self, x_files: Sequence[PathLike], y_files: Sequence[PathLike]) -> None:
+        if len(x_files) != len(y_files):
+            raise ValueError("the number of x and y files must be the same")
+
+        self.x_files = list(x_files)
+        self.y_files = list(y_files)
+
+        # the chunks are opened (memory mapped) the first time they are needed
+        self._chunks: Optional[list[ArrayDataset]] = None
+        self._offsets = np.zeros(1, dtype=np.intp)
+
+    def _open(self) -> list[ArrayDataset]:
+        if self._chunks is None:
+            self._chunks = [ArrayDataset(x_file, y_file) for x_file, y_file in zip(self.x_files, self.y_files)]
+            # the index of the first sample of each chunk (and the total number of samples)
+            self._offsets = np.cumsum([0] + [len(chunk) for chunk in self._chunks], dtype=np.intp)
+        return self._chunks
+
+    def chunks(self) -> Iterator[ArrayDataset]:
+        yield from self._open()
+
+    def __len__(self) -> int:
+        self._open()
+        return int(self._offsets[-1])
+
+    def batches(self, batch_size: int) -> Iterator[Batch]:
+        x_parts: list[InputValue] = []
+        y_parts: list[InputValue] = []
+        size = 0
+
+        for chunk in self.chunks():
+            start = 0
+            while start < len(chunk):
+                stop = min(len(chunk), start + batch_size - size)
+                x_parts.append(chunk.x[start:stop])
+                y_parts.append(chunk.y[start:stop])
+                size += stop - start
+                start = stop
+
+                if size == batch_size:
+                    yield self._join(x_parts), self._join(y_parts)
+                    x_parts, y_parts, size = [], [], 0
+
+        if size:
+            yield self._join(x_parts), self._join(y_parts)
+
+    def take(self, indices: np.ndarray, out: Optional[Batch] = None) -> Batch:
+        chunks = self._open()
+        offsets = self._offsets
+
+        if out is None:
+            out = (np.empty((len(indices), *chunks[0].x.shape[1:]), dtype=chunks[0].x.dtype),
+                   np.empty((len(indices), *chunks[0].y.shape[1:]), dtype=chunks[0].y.dtype))
+
+        # the indices are sorted, so the samples of each chunk are next to each other
+        bounds = np.searchsorted(indices, offsets)
+        for chunk, offset, start, stop in zip(chunks, offsets, bounds, bounds[1:]):
+            if start < stop:
+                local = indices[start:stop] - offset
+                np.take(chunk.x, local, axis=0, out=out[0][start:stop])
+                np.take(chunk.y, local, axis=0, out=out[1][start:stop])
+
+        return out
+
+    @staticmethod
+    def _join(parts: list[InputValue]) -> InputValue:
+        return _read(parts[0]) if len(parts) == 1 else np.concatenate(parts)
+
+
+class GeneratorDataset(Dataset):
+    """
+    A dataset produced by a generator.
+
+    `factory` is called at the beginning of each epoch, and must return
+    an iterable of (x, y) batches (the batch size is decided by the generator)
+    """
+
+    def __init__(self, factory: Callable[[], Iterable[Batch]]) -> None:
+        self.factory = factory
+
+    def batches(self, batch_size: int) -> Iterator[Batch]:
+        for x, y in self.factory():
+            yield np.asarray(x), np.asarray(y)
+
+
+def as_dataset(x: Any, y: Any = None) -> Dataset:
+    """
+    Get the dataset that reads from `x` and `y`, which can be:
+
+    - two arrays (or memory mapped arrays)
+    - two paths to .npy files
+    - two lists of paths to .npy files (chunks)
+    - a function returning an iterable of (x, y) batches (y is not used)
+    - a Dataset (y is not used)
+    """
+    if isinstance(x, Dataset):
+        return x
+
+    if callable(x):
+        return GeneratorDataset(cast(Callable[[], Iterable[Batch]], x))
+
+    if y is None:
+        raise ValueError("y must be provided for this type of dataset")
+
+    if isinstance(x, (list, tuple)):
+        if x and all(isinstance(i, (str, os.PathLike)) for i in x):
+            return ChunkedDataset(x, y)
+        x = np.asarray(x)
+
+    return ArrayDataset(x, y)
+
+
+class DataLoader:
+    """
+    Iterate over the (x, y) batches of a dataset.
+
+    The next batches are loaded on a background thread while the
+    current one is being used, the loader can be passed directly to
+    `Model.train()` and `Model.evaluate()`
+
+    parameters:
+
+    - x, y:           the source of the data (see `as_dataset()`)
+    - batch_size:     the number of samples in each batch
+    - prefetch:       how many batches can be loaded in advance.
+                      if 0, batches are loaded when requested
+    - shuffle:        if True, the samples are taken in a different random order each epoch.
+                      only the indices are shuffled, the data is never copied as a whole
+    - seed:           the seed (or numpy Generator) used to shuffle the samples
+    - reuse_buffers:  if True, shuffled batches are written into a few preallocated
+                      buffers instead of new arrays. a batch is then only valid until
+                      the next one is requested
+    """
+
+    _END = object()
+
+    def __init__(self,
+                 x: Any,
+                 y: Any = None,
+                 batch_size: int = 32,
+                 prefetch: int = 2,
+                 shuffle: bool = False,
+                 seed: Optional[Union[int, np.random.Generator]] = None,
+                 reuse_buffers: bool = False
+                 ) -> None:
+
+        if not isinstance(batch_size, int) or batch_size < 1:
+            raise ValueError("batch_size must be an int >=1")
+
+        if not isinstance(prefetch, int) or prefetch < 0:
+            raise ValueError("prefetch must be an int >=0")
+
+        self.dataset = as_dataset(x, y)
+        self.batch_size = batch_size
+        self.prefetch = prefetch
+        self.shuffle = shuffle
+        self.reuse_buffers = reuse_buffers
+        self.generator = np.random.default_rng(seed)
+
+        if shuffle and type(self.dataset).take is Dataset.take:
+            raise ValueError(f"{self.dataset.__class__.__name__} can not be shuffled")
+
+    def __len__(self) -> int:
+        """
+        The number of batches in an epoch (if the size of the dataset is known)
+        """
+        if not hasattr(self.dataset, "__len__"):
+            raise TypeError("the size of the dataset is unknown")
+        return -(-len(self.dataset) // self.batch_size)  # type: ignore
+
+    def __iter__(self) -> Iterator[Batch]:
+        if self.prefetch == 0:
+            return self._batches()
+        return self._prefetch()
+
+    def _batches(self) -> Iterator[Batch]:
+        if not self.shuffle:
+            yield from self.dataset.batches(self.batch_size)
+            return
+
+        size = len(self.dataset)  # type: ignore
+        order = self.generator.permutation(size)
+
+        # enough buffers for the batches in the queue, the one being
+        # used and the one being loaded
+        buffers: list[Optional[Batch]] = [None] * (self.prefetch + 2)
+
+        for i, start in enumerate(range(0, size, self.batch_size)):
+            # sorted indices read memory mapped files (almost) sequentially
+            indices = np.sort(order[start:start + self.batch_size])
+            buffer = buffers[i % len(buffers)]
+
+            if buffer is None:
+                batch = self.dataset.take(indices)
+                if self.reuse_buffers and len(indices) == self.batch_size:
+                    buffers[i % len(buffers)] = batch
+                yield batch
+            else:
+                yield self.dataset.take(indices, out=(buffer[0][:len(indices)], buffer[1][:len(indices)]))
+
+    def _prefetch(self) -> Iterator[Batch]:
+        batches: queue.Queue[Any] = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+
+        def put(item: Any) -> bool:
+            # wait for space in the queue, unless the consumer is gone
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def load() -> None:
+            try:
+                for batch in self._batches():
+                    if not put(batch):
+                        return
+                put(self._END)
+            except BaseException as e:
+                put(e)
+
+        thread = threading.Thread(target=load, name="DataLoader", daemon=True)
+        thread.start()
+
+        try:
+            while True:
+                item = batches.get()
+                if item is self._END:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            thread.join()
@@ -14,6 +14,9 @@ def shuffle(*arrays: InputValue) -> tuple[OutputValue, ...]:
     
     Note: all the arrays must have the same lenght
 
+    Note: this copies every array, use `DataLoader(shuffle=True)` to
+    iterate over shuffled batches of big arrays
+
     Parameters
     ----------
     arrays : np.ndarray
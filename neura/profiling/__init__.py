@@ -0,0 +1,6 @@
+"""
+Observe and measure what the layers of a model are doing
+"""
+
+from .hooks import Hook
+from .profiler import Profiler
@@ -0,0 +1,47 @@
+from typing import TYPE_CHECKING, Optional
+
+from neura.utils.types import Gradients, InputValue, OutputValue
+
+if TYPE_CHECKING:
+    from neura.layers import Layer
+    from neura.model import Model
+
+
+class Hook:
+    """
+    Base class for the objects that are notified when the layers of a model run.
+
+    Hooks are added with `Model.add_hook()`, every method does nothing by default.
+    When a model has no hooks, the layers are called directly
+    """
+
+    def pre_forward(self, index: int, layer: "Layer", x: InputValue) -> None:
+        """
+        Called before `layer.forward(x)`
+        """
+
+    def post_forward(self, index: int, layer: "Layer", outputs: OutputValue) -> None:
+        """
+        Called after `layer.forward()`, with its outputs
+        """
+
+    def pre_backward(self, index: int, layer: "Layer", output_gradients: Gradients) -> None:
+        """
+        Called before the layer computes its gradients
+        """
+
+    def post_backward(self, index: int, layer: "Layer", input_gradients: Optional[Gradients]) -> None:
+        """
+        Called after the layer computed its gradients, with the gradients
+        of its input (None for the first layer)
+        """
+
+    def on_train_end(self, model: "Model") -> None:
+        """
+        Called at the end of `Model.train()`
+        """
+
+    def on_evaluate_end(self, model: "Model") -> None:
+        """
+        Called at the end of `Model.evaluate()`
+        """
@@ -0,0 +1,149 @@
+import time
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+from neura.profiling.hooks import Hook
+from neura.utils.types import Gradients, InputValue, OutputValue
+
+if TYPE_CHECKING:
+    from neura.layers import Layer
+    from neura.model import Model
+
+
+class LayerProfile:
+    """
+    What a layer did while being profiled
+    """
+
+    def __init__(self, index: int, layer: "Layer") -> None:
+        self.index = index
+        self.name = layer.name
+        self.type = type(layer).__name__
+        self.forward_calls = 0
+        self.backward_calls = 0
+        self.forward_time = 0.
+        self.backward_time = 0.
+        self.flops = 0
+        self.bytes = 0
+
+    @property
+    def total_time(self) -> float:
+        return self.forward_time + self.backward_time
+
+
+def estimate_flops(layer: "Layer", samples: int, elements: int, backward: bool = False) -> int:
+    """
+    Rough number of floating point operations done by a layer on `samples` samples,
+    producing `elements` values: one multiplication and one addition for each weight
+    and sample (twice as much in the backward pass) plus one operation per value.
+    Layers with sparse gradients (like Embedding) and layers without parameters
+    (like Dropout) only count the values they produce
+    """
+    if layer.sparse_gradients:
+        # only the rows of the ids are read (and added to, in the backward pass)
+        return (2 if backward else 1) * elements
+
+    if not layer.has_parameters:
+        # no matrix product
+        return elements
+
+    # quantized layers keep their weights outside of the parameters
+    kernel = getattr(layer, "kernel", None)
+    weights = kernel.size if kernel is not None else layer.weights.size
+    return (4 if backward else 2) * samples * weights + elements
+
+
+class Profiler(Hook):
+    """
+    Measure the time spent, the calls, the (estimated) floating point operations
+    and the bytes of the arrays produced by each layer of a model.
+    Outputs that are views of the inputs (like the ones of Flatten) cost nothing
+
+    ```
+    profiler = Profiler()
+    model.add_hook(profiler)
+    model.train(x, y)   # prints the report at the end
+    ```
+
+    parameters:
+
+    - verbose:        print the report at the end of `train()` and `evaluate()`
+    """
+
+    def __init__(self, verbose: bool = True) -> None:
+        self.verbose = verbose
+        self.layers: dict[int, LayerProfile] = {}
+        self._start = 0.
+        self._values: Optional[np.ndarray] = None
+
+    def reset(self) -> None:
+        self.layers.clear()
+
+    def _profile(self, index: int, layer: "Layer") -> LayerProfile:
+        profile = self.layers.get(index)
+        if profile is None:
+            profile = self.layers[index] = LayerProfile(index, layer)
+        return profile
+
+    def pre_forward(self, index: int, layer: "Layer", x: InputValue) -> None:
+        self._values = x
+        self._start = time.perf_counter()
+
+    def post_forward(self, index: int, layer: "Layer", outputs: OutputValue) -> None:
+        elapsed = time.perf_counter() - self._start
+        outputs = np.asarray(outputs)
+
+        profile = self._profile(index, layer)
+        profile.forward_calls += 1
+        profile.forward_time += elapsed
+        if not self._is_view(outputs):
+            profile.flops += estimate_flops(layer, len(outputs), outputs.size)
+            profile.bytes += outputs.nbytes
+        self._values = None
+
+    def pre_backward(self, index: int, layer: "Layer", output_gradients: Gradients) -> None:
+        self._values = output_gradients
+        self._start = time.perf_counter()
+
+    def post_backward(self, index: int, layer: "Layer", input_gradients: Optional[Gradients]) -> None:
+        elapsed = time.perf_counter() - self._start
+        input_shape = np.shape(layer.input)
+
+        profile = self._profile(index, layer)
+        profile.backward_calls += 1
+        profile.backward_time += elapsed
+        # layers without parameters only compute (or reshape) the gradients of their input
+        computed = input_gradients is not None and not self._is_view(input_gradients)
+        if computed or layer.has_parameters:
+            profile.flops += estimate_flops(layer, input_shape[0], int(np.prod(input_shape)), backward=True)
+        if input_gradients is not None and computed:
+            profile.bytes += np.asarray(input_gradients).nbytes
+        self._values = None
+
+    def _is_view(self, values: np.ndarray) -> bool:
+        # the layer returned (a reshaped view of) the values it received
+        return self._values is not None and np.shares_memory(values, self._values)
+
+    def on_train_end(self, model: "Model") -> None:
+        if self.verbose:
+            print(self.report())
+
+    def on_evaluate_end(self, model: "Model") -> None:
+        if self.verbose:
+            print(self.report())
+
+    def report(self) -> str:
+        """
+        A table with the measures of each layer, the slowest first
+        """
+        profiles = sorted(self.layers.values(), key=lambda p: p.total_time, reverse=True)
+        total = sum(p.total_time for p in profiles) or 1.
+
+        lines = [f"{'#':>3}  {'layer':<12} {'calls':>7} {'forward ms':>11} {'backward ms':>12} "
+                 f"{'time %':>7} {'MFLOP':>10} {'MB':>9}"]
+        for p in profiles:
+            lines.append(f"{p.index:>3}  {p.type:<12} {p.forward_calls:>7} {p.forward_time * 1e3:>11.3f} "
+                         f"{p.backward_time * 1e3:>12.3f} {p.total_time / total:>7.1%} "
+                         f"{p.flops / 1e6:>10.2f} {p.bytes / 2 ** 20:>9.2f}")
+        return "\n".join(lines)
@@ -0,0 +1,8 @@
+"""
+Serve the predictions of a model to many concurrent callers
+"""
+
+from .server import (
+    BatchingServer,
+    ServerStats
+)
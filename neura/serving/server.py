@@ -0,0 +1,233 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
+import numpy as np
+from neura.utils.types import InputValue, OutputValue
+
+
+class ServerStats:
+    """
+    Latency and throughput counters of a `BatchingServer`
+
+    - requests:       the number of samples predicted
+    - batches:        the number of forward passes
+    - errors:         the number of requests that failed
+    - mean_latency:   the mean time (in seconds) between a request and its result
+    - max_latency:    the longest time (in seconds) between a request and its result
+    - throughput:     the requests completed per second, since the counters were reset
+    """
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.requests = 0
+        self.batches = 0
+        self.errors = 0
+        self.total_latency = 0.
+        self.max_latency = 0.
+        self.compute_time = 0.
+        self.started = time.perf_counter()
+
+    def record(self, latencies: list[float], compute_time: float, failed: bool = False) -> None:
+        self.batches += 1
+        self.compute_time += compute_time
+
+        if failed:
+            self.errors += len(latencies)
+            return
+
+        self.requests += len(latencies)
+        self.total_latency += sum(latencies)
+        self.max_latency = max(self.max_latency, *latencies)
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.requests / self.batches if self.batches else 0.
+
+    @property
+    def mean_latency(self) -> float:
+        return self.total_latency / self.requests if self.requests else 0.
+
+    @property
+    def throughput(self) -> float:
+        return self.requests / (time.perf_counter() - self.started)
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "errors": self.errors,
+            "mean_batch_size": self.mean_batch_size,
+            "mean_latency": self.mean_latency,
+            "max_latency": self.max_latency,
+            "compute_time": self.compute_time,
+            "throughput": self.throughput,
+        }
+
+
+class _Request:
+    def __init__(self, x: InputValue, future: "asyncio.Future[OutputValue]") -> None:
+        self.x = x
+        self.future = future
+        self.received = time.perf_counter()
+
+
+class BatchingServer:
+    """
+    Combine single-sample predictions into batches.
+
+    Each call to `predict()` waits in a queue, a worker takes up to `max_batch_size`
+    requests (waiting at most `max_wait` seconds for the batch to fill up), runs
+    one batched forward pass on a background thread and gives each caller its result.
+
+    ```
+    async with BatchingServer(model, max_batch_size=64) as server:
+        y = await server.predict(x)
+    ```
+
+    parameters:
+
+    - model:          the model used for the predictions
+    - max_batch_size: the maximum number of samples in a forward pass
+    - max_wait:       how long (in seconds) the first request of a batch can
+                      wait for other requests to arrive
+    """
+
+    def __init__(self, model: Any, max_batch_size: int = 32, max_wait: float = .005) -> None:
+        if not isinstance(max_batch_size, int) or max_batch_size < 1:
+            raise ValueError("max_batch_size must be an int >=1")
+
+        if max_wait < 0:
+            raise ValueError("max_wait must be >=0")
+
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.stats = ServerStats()
+
+        self._queue: Optional[asyncio.Queue[Optional[_Request]]] = None
+        self._worker: Optional[asyncio.Task[None]] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None
+
+    def start(self) -> None:
+        """
+        Start the worker on the running event loop
+        """
+        if self.running:
+            return
+
+        self._queue = asyncio.Queue()
+        # one thread, forward passes never run concurrently on the same model
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="BatchingServer")
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stop the worker, after the requests already received have been answered
+        """
+        if not self.running:
+            return
+
+        assert self._queue is not None and self._worker is not None and self._executor is not None
+        await self._queue.put(None)
+        await self._worker
+        self._executor.shutdown()
+        self._queue = self._worker = self._executor = None
+
+    async def __aenter__(self) -> "BatchingServer":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.stop()
+
+    async def predict(self, x: InputValue) -> OutputValue:
+        """
+        Compute the output of the model for a single sample
+        """
+        x = np.asarray(x, dtype=self.model.dtype)
+
+        input_shape = tuple(self.model.layers[0].input_shape or ())
+        if x.shape != input_shape:
+            raise ValueError("unable to process input of shape {}. " \
+                             "expected shape: {}".format(x.shape, input_shape))
+
+        self.start()
+        assert self._queue is not None
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_Request(x, future))
+        return await future
+
+    async def _next_batch(self) -> tuple[list[_Request], bool]:
+        """
+        Wait for the next batch of requests,
+        and tell if the server has been stopped
+        """
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+
+        first = await self._queue.get()
+        if first is None:
+            return [], True
+
+        batch = [first]
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            # take what is already waiting, then wait for the rest until the deadline
+            try:
+                request = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    request = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+
+            if request is None:
+                return batch, True
+            batch.append(request)
+
+        return batch, False
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopped = False
+
+        while not stopped:
+            batch, stopped = await self._next_batch()
+            if not batch:
+                continue
+
+            x = np.stack([request.x for request in batch])
+            start = time.perf_counter()
+
+            try:
+                y = await loop.run_in_executor(self._executor, self._forward, x)
+            except Exception as e:
+                self.stats.record([0.] * len(batch), time.perf_counter() - start, failed=True)
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+                continue
+
+            end = time.perf_counter()
+            self.stats.record([end - request.received for request in batch], end - start)
+
+            for i, request in enumerate(batch):
+                # the callers get their own copy, not a view on the whole batch
+                if not request.future.done():
+                    request.future.set_result(y[i].copy())
+
+    def _forward(self, x: InputValue) -> OutputValue:
+        return self.model.predict(x, verbose=False)
@@ -1,9 +1,15 @@
 
 __all__ = (
     "InputValue",
+    "floatx",
+    "set_floatx",
+    "Workspace",
 )
 
 from .types import InputValue
+from .types import floatx
+from .types import set_floatx
+from .workspace import Workspace
 
 
 
@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Union
 import numpy as np
 
 Float64 = np.float64
@@ -13,3 +13,36 @@ NodeOutput = Float64
 
 Gradient = DtFloat64
 Gradients = np.ndarray[Any, Gradient]
+
+DType = Union[str, type, np.dtype[Any]]
+
+# floating point types that can be used for parameters and computations
+SUPPORTED_FLOATS = (np.dtype(np.float32), np.dtype(np.float64))
+
+_floatx: np.dtype[Any] = np.dtype(np.float64)
+
+
+def as_float_dtype(dtype: DType) -> np.dtype[Any]:
+    """
+    Convert `dtype` to one of the supported floating point types
+    """
+    dtype = np.dtype(dtype)
+    if dtype not in SUPPORTED_FLOATS:
+        raise ValueError(f"unsupported dtype: '{dtype}', expected one of: float32, float64")
+    return dtype
+
+
+def floatx() -> np.dtype[Any]:
+    """
+    Get the default floating point type, used by models and layers
+    that do not specify their own
+    """
+    return _floatx
+
+
+def set_floatx(dtype: DType) -> None:
+    """
+    Set the default floating point type (float32 or float64)
+    """
+    global _floatx
+    _floatx = as_float_dtype(dtype)
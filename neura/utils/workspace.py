@@ -0,0 +1,44 @@
+from typing import Any, Optional
+
+import numpy as np
+
+
+class Workspace:
+    """
+    Arrays reused by the forward and backward passes of a layer.
+
+    A buffer is identified by a name and its shape, so that batches of
+    different sizes (like the last batch of an epoch) do not replace
+    each other's buffers
+    """
+
+    def __init__(self) -> None:
+        self.buffers: dict[tuple[Any, ...], np.ndarray] = {}
+
+    def get(self, name: str, shape: tuple[int, ...], dtype: Any) -> np.ndarray:
+        """
+        Get the buffer `name` with the given shape and type,
+        it is allocated (uninitialized) the first time it is requested
+        """
+        key = (name, shape, dtype)
+        buffer = self.buffers.get(key)
+        if buffer is None:
+            buffer = self.buffers[key] = np.empty(shape, dtype=dtype)
+        return buffer
+
+    def clear(self) -> None:
+        self.buffers.clear()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(buffer.nbytes for buffer in self.buffers.values())
+
+
+def scratch(workspace: Optional[Workspace], name: str, shape: tuple[int, ...], dtype: Any) -> np.ndarray:
+    """
+    A temporary array: the buffer `name` of `workspace`, reused between calls,
+    or a new array if there is no workspace
+    """
+    if workspace is None:
+        return np.empty(shape, dtype=dtype)
+    return workspace.get(name, shape, dtype)
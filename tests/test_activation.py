@@ -0,0 +1,68 @@
+import math
+import unittest
+import warnings
+import numpy as np
+
+class TestActivation(unittest.TestCase):
+    def test_matches_scalar_formulas(self):
+        import neura
+
+        x = np.linspace(-5, 5, 41)
+        sigmoid = np.array([1 / (1 + math.exp(-i)) for i in x])
+        expected = {
+            neura.activation.Linear(): (x, np.ones_like(x)),
+            neura.activation.Sigmoid(): (sigmoid, sigmoid * (1 - sigmoid)),
+            neura.activation.Exponential(): (np.exp(x), np.exp(x)),
+            neura.activation.ReLu(): (np.array([max(0, i) for i in x]), np.array([0 if i <= 0 else 1 for i in x])),
+            neura.activation.LeakyReLu(): (np.array([max(i, .1 * i) for i in x]), np.array([1 if i >= 0 else .1 for i in x])),
+            neura.activation.Tanh(): (np.tanh(x), 1 - np.tanh(x) ** 2),
+            neura.activation.Swish(): (x * sigmoid, sigmoid + x * sigmoid * (1 - sigmoid)),
+            neura.activation.PReLU(.25): (np.where(x < 0, .25 * x, x), np.where(x < 0, .25, 1)),
+        }
+
+        for function, (values, derivatives) in expected.items():
+            self.assertTrue(np.allclose(function.apply_formula(x), values), f"wrong {function.name} output")
+            self.assertTrue(np.allclose(function.derivative(x), derivatives), f"wrong {function.name} derivative")
+
+    def test_out_buffer(self):
+        import neura
+
+        x = np.random.randn(4, 3)
+        out = np.empty_like(x)
+        result = neura.activation.Tanh().apply_formula(x, out=out)
+
+        self.assertIs(result, out, "the result was not written in the provided buffer")
+        self.assertTrue(np.allclose(out, np.tanh(x)))
+
+    def test_numerical_stability(self):
+        import neura
+
+        x = np.array([[-1000., 0., 1000.]])
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            sigmoid = neura.activation.Sigmoid().apply_formula(x)
+            softmax = neura.activation.Softmax().apply_formula(x)
+
+        self.assertTrue(np.allclose(sigmoid, [[0, .5, 1]]))
+        self.assertTrue(np.allclose(softmax, [[0, 0, 1]]))
+        self.assertTrue(np.allclose(neura.activation.Softmax().apply_formula(np.random.randn(5, 4)).sum(axis=1), 1))
+    def test_softmax_gradient(self):
+        import neura
+
+        softmax = neura.activation.Softmax()
+        x = np.random.randn(3, 4)
+        output_gradients = np.random.randn(3, 4)
+
+        # vector-Jacobian product, for each sample
+        expected = np.zeros_like(x)
+        for i, s in enumerate(softmax.apply_formula(x)):
+            jacobian = np.diag(s) - np.outer(s, s)
+            expected[i] = output_gradients[i] @ jacobian
+
+        self.assertTrue(np.allclose(softmax.gradient(x, output_gradients), expected))
+        with self.assertRaises(NotImplementedError):
+            softmax.derivative(x)
+
+
+if __name__ == '__main__':
+    unittest.main()
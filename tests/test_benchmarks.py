@@ -0,0 +1,27 @@
+import unittest
+
+class TestBenchmarks(unittest.TestCase):
+    def test_run_scenario(self):
+        from benchmarks import runner, scenarios
+
+        scenario = next(s for s in scenarios.all_scenarios() if s.name == "deep-narrow")
+        result = runner.run_scenario(scenario, repeat=1, samples=32)
+
+        for metric in ("build_time", "forward_samples_per_sec", "train_samples_per_sec",
+                       "epoch_time", "evaluate_samples_per_sec", "peak_memory_bytes"):
+            self.assertGreater(result[metric], 0, metric)
+
+    def test_compare(self):
+        from benchmarks import runner
+
+        baseline = {"meta": {"import_time": .1},
+                    "results": {"a": {"train_samples_per_sec": 1000, "epoch_time": 1.}}}
+        current = {"meta": {"import_time": .1},
+                   "results": {"a": {"train_samples_per_sec": 800, "epoch_time": .5}, "b": {"epoch_time": 1.}}}
+
+        rows = {(row["scenario"], row["metric"]): row for row in runner.compare(baseline, current, threshold=.1)}
+
+        self.assertTrue(rows["a", "train_samples_per_sec"]["regression"], "lower throughput is a regression")
+        self.assertFalse(rows["a", "epoch_time"]["regression"], "lower wall time is an improvement")
+        self.assertFalse(rows["import", "import_time"]["regression"])
+        self.assertNotIn(("b", "epoch_time"), rows, "new scenarios have nothing to compare with")
@@ -0,0 +1,100 @@
+import unittest
+import numpy as np
+
+class TestCallbacks(unittest.TestCase):
+    def _create_model(self, learning_rate=0.05):
+        import neura
+
+        model = neura.model.Model([
+            neura.layers.Dense(8, activation="tanh", input_shape=(4,)),
+            neura.layers.Dense(2, activation="sigmoid"),
+        ], seed=0)
+        model.compile(loss=neura.losses.MeanSquaredError(), optimizer=neura.optimizers.SGD(learning_rate),
+                      metrics=["accuracy", "mae"])
+        return model
+
+    def setUp(self) -> None:
+        generator = np.random.default_rng(0)
+        self.x = generator.random((60, 4))
+        labels = (self.x[:, 0] > self.x[:, 1]).astype(int)
+        self.y = np.eye(2)[labels]
+
+    def test_history(self):
+        model = self._create_model()
+        history = model.train(self.x, self.y, batch_size=8, epochs=4, verbose=False, validation_split=.25)
+
+        self.assertEqual(len(history), 4)
+        self.assertEqual(history.epochs, [0, 1, 2, 3])
+        for key in ("loss", "accuracy", "mae", "val_loss", "val_accuracy", "val_mae",
+                    "learning_rate", "time", "samples_per_sec"):
+            self.assertIn(key, history)
+            self.assertEqual(len(history[key]), 4)
+
+        self.assertLess(history["loss"][-1], history["loss"][0])
+        # the validation is done on the last 15 samples, in inference mode
+        loss, accuracy, mae = model.evaluate(self.x[45:], self.y[45:])
+        self.assertAlmostEqual(history["val_loss"][-1], loss)
+        self.assertAlmostEqual(history["val_accuracy"][-1], accuracy)
+        self.assertAlmostEqual(history["val_mae"][-1], mae)
+
+        with self.assertRaises(ValueError):
+            model.train(self.x, self.y, epochs=1, verbose=False, validation_split=.2, validation_data=(self.x, self.y))
+
+    def test_early_stopping(self):
+        import neura
+
+        class Worse(neura.callbacks.Callback):
+            # the validation loss gets worse after the second epoch
+            def on_epoch_end(self, epoch, logs=None):
+                assert logs is not None
+                logs["val_loss"] = [3., 1., 2., 2.5, 0.5, 0.1][epoch]
+
+        model = self._create_model()
+        weights = []
+
+        class Recorder(neura.callbacks.Callback):
+            def on_epoch_end(self, epoch, logs=None):
+                assert self.model is not None
+                weights.append(self.model.get_weights())
+
+        stopping = neura.callbacks.EarlyStopping(patience=1, restore_best_weights=True)
+        history = model.train(self.x, self.y, epochs=6, verbose=False, validation_data=(self.x, self.y),
+                              callbacks=[Worse(), Recorder(), stopping])
+
+        self.assertEqual(len(history), 3)
+        self.assertEqual(stopping.stopped_epoch, 2)
+        self.assertEqual(stopping.best_epoch, 1)
+        self.assertTrue(np.array_equal(model.get_weights(), weights[1]), "the best weights were not restored")
+
+        with self.assertRaises(ValueError):
+            model.train(self.x, self.y, epochs=1, verbose=False, callbacks=[neura.callbacks.EarlyStopping()])
+
+    def test_reduce_lr_on_plateau(self):
+        import neura
+
+        model = self._create_model(learning_rate=0.)
+        reduce = neura.callbacks.ReduceLROnPlateau(monitor="loss", factor=.5, patience=2, min_delta=1., min_lr=1e-4)
+        model.optimizer.learning_rate = 1e-3
+
+        # the loss can not improve by min_delta, the learning rate is halved every 2 epochs
+        history = model.train(self.x, self.y, epochs=7, verbose=False, callbacks=[reduce])
+        self.assertEqual(history["learning_rate"], [1e-3, 1e-3, 1e-3, 5e-4, 5e-4, 2.5e-4, 2.5e-4])
+        self.assertEqual(model.optimizer.learning_rate, 1.25e-4)
+
+    def test_evaluate_metrics(self):
+        import neura
+        from neura.preprocessing import DataLoader
+
+        model = self._create_model()
+        y_pred = model.predict(self.x, verbose=False)
+        accuracy = np.mean(np.argmax(y_pred, axis=1) == np.argmax(self.y, axis=1))
+
+        results = model.evaluate(self.x, self.y)
+        self.assertEqual(len(results), 3)
+        self.assertAlmostEqual(results[1], accuracy)
+
+        loader = DataLoader(self.x, self.y, batch_size=7)
+        self.assertTrue(np.allclose(model.evaluate(loader), results))
+
+        with self.assertRaises(ValueError):
+            model.compile(loss=neura.losses.MeanSquaredError(), metrics=["unknown"])
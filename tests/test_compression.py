@@ -0,0 +1,151 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+
+class TestPruning(unittest.TestCase):
+    def setUp(self) -> None:
+        import neura
+
+        self.model = neura.model.Model([
+            neura.layers.Flatten(input_shape=(4, 5)),
+            neura.layers.Dense(16, activation="relu", bias=True),
+            neura.layers.Dropout(.1, seed=0),
+            neura.layers.Dense(3, activation="softmax", bias=True),
+        ], seed=0)
+        self.model.compile(loss=neura.losses.CategoricalCrossEntropy(), optimizer="adam")
+
+        self.x = np.random.rand(32, 4, 5)
+        self.y = np.eye(3)[np.random.randint(0, 3, 32)]
+
+    def test_prune(self):
+        import neura
+
+        dense = self.model.layers[1]
+        kept = np.abs(dense.weights) >= np.sort(np.abs(dense.weights), axis=None)[int(.75 * dense.weights.size)]
+
+        neura.compression.prune(self.model, .75)
+        self.assertAlmostEqual(neura.compression.get_sparsity(self.model), .75, places=2)
+        self.assertTrue(np.array_equal(dense.weights != 0, kept), "the biggest weights were not kept")
+
+        # fine-tuning does not bring the pruned weights back
+        self.model.train(self.x, self.y, batch_size=8, epochs=2, verbose=False)
+        self.assertTrue(np.all(dense.weights[~kept] == 0))
+        self.assertTrue(np.all(dense.weights[kept] != 0))
+
+        # the mask is saved with the model, a loaded model keeps the pruned weights at 0
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "model.neura")
+            self.model.save(path)
+            loaded = neura.model.Model.load(path, mmap=False)
+        loaded.compile(loss=neura.losses.CategoricalCrossEntropy(), optimizer="adam")
+        assert loaded.layers[1].weights_mask is not None
+        self.assertTrue(np.array_equal(loaded.layers[1].weights_mask, kept))
+        loaded.train(self.x, self.y, batch_size=8, epochs=1, verbose=False)
+        self.assertTrue(np.all(loaded.layers[1].weights[~kept] == 0))
+
+        neura.compression.strip_pruning(self.model)
+        self.model.train(self.x, self.y, batch_size=8, epochs=1, verbose=False)
+        self.assertLess(neura.compression.get_sparsity(self.model), .75)
+
+        with self.assertRaises(ValueError):
+            neura.compression.prune(self.model, 1.)
+
+        with self.assertRaises(ValueError):
+            neura.compression.prune(self.model, .5, layers=[0])
+
+    def test_to_sparse(self):
+        import neura
+
+        neura.compression.prune(self.model, .9)
+        sparse = neura.compression.to_sparse(self.model)
+
+        self.assertIsInstance(sparse.layers[1], neura.layers.SparseDense)
+        self.assertEqual(sparse.layers[1].weights.size, np.count_nonzero(self.model.layers[1].weights))
+        self.assertIn(f"Total number of parameters: {sparse.parameters.size}", sparse.summary(verbose=False))
+        self.assertLess(sparse.parameters.size, self.model.parameters.size / 4)
+        self.assertTrue(np.allclose(sparse.predict(self.x, verbose=False), self.model.predict(self.x, verbose=False)))
+
+        sparse.freeze()
+        self.assertTrue(np.allclose(sparse.predict(self.x, verbose=False), self.model.predict(self.x, verbose=False)))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "model.neura")
+            sparse.save(path)
+            for mmap in (True, False):
+                loaded = neura.model.Model.load(path, mmap=mmap)
+                loaded_layer, sparse_layer = loaded.layers[1], sparse.layers[1]
+                assert isinstance(loaded_layer, neura.layers.SparseDense) and isinstance(sparse_layer, neura.layers.SparseDense)
+                self.assertTrue(np.array_equal(loaded_layer.indices, sparse_layer.indices))
+                self.assertTrue(np.allclose(loaded.predict(self.x, verbose=False), sparse.predict(self.x, verbose=False)))
+                del loaded, loaded_layer
+
+    def test_sparse_gradients(self):
+        import neura
+
+        neura.compression.prune(self.model, .8)
+        sparse = neura.compression.to_sparse(self.model)
+        self.model.optimizer = sparse.optimizer = neura.optimizers.SGD(learning_rate=0)
+
+        # the same gradients as the pruned Dense layers, only for the nonzero weights
+        x = self.x[:6]
+        self.model.compute_gradients(self.y[:6], self.model.forward(x))
+        sparse.compute_gradients(self.y[:6], sparse.forward(x))
+
+        for dense_layer, sparse_layer in ((self.model.layers[1], sparse.layers[1]), (self.model.layers[3], sparse.layers[3])):
+            units, inputs = np.nonzero(dense_layer.weights.T)
+            self.assertTrue(np.allclose(sparse_layer.weights_gradient, dense_layer.weights_gradient.T[units, inputs]))
+            self.assertTrue(np.allclose(sparse_layer.bias_gradient, dense_layer.bias_gradient))
+
+class TestQuantization(unittest.TestCase):
+    def setUp(self) -> None:
+        import neura
+
+        self.model = neura.model.Model([
+            neura.layers.Flatten(input_shape=(4, 5)),
+            neura.layers.Dense(32, activation="relu", bias=True, kernel_initializer="glorot_uniform"),
+            neura.layers.Dense(3, activation="softmax", bias=True, kernel_initializer="glorot_uniform"),
+        ], seed=0)
+        self.model.compile(loss=neura.losses.CategoricalCrossEntropy())
+        self.x = np.random.rand(64, 4, 5)
+
+    def test_quantize(self):
+        import neura
+
+        quantized = neura.compression.quantize(self.model, self.x)
+        layer = quantized.layers[1]
+
+        assert isinstance(layer, neura.layers.QuantizedDense)
+        self.assertEqual(layer.kernel.dtype, np.int8)
+        self.assertEqual(layer.kernel_scales.shape, (32,))
+        self.assertIn("Total number of parameters: 771", quantized.summary(verbose=False))
+        self.assertTrue(np.allclose(quantized.predict(self.x, verbose=False), self.model.predict(self.x, verbose=False), atol=.02))
+
+        # the integer product is exact: the only errors come from rounding the inputs and the weights
+        dense = self.model.layers[1]
+        x = self.x.reshape(64, -1)
+        q = np.clip(np.round(x / layer.input_scale) + layer.input_zero_point, -128, 127)
+        expected = ((q - layer.input_zero_point) * layer.input_scale) @ (layer.kernel * layer.kernel_scales.astype(np.float64))
+        self.assertTrue(np.allclose(layer.forward(x), np.maximum(expected + dense.bias, 0)))
+
+        with self.assertRaises(RuntimeError):
+            quantized.train(self.x, np.eye(3)[np.zeros(64, dtype=int)], verbose=False)
+
+    def test_save_load(self):
+        import neura
+
+        quantized = neura.compression.quantize(self.model, self.x)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "model.neura")
+            quantized.save(path)
+
+            loaded = neura.model.Model.load(path, mmap=False)
+            layer = loaded.layers[1]
+            assert isinstance(layer, neura.layers.QuantizedDense)
+            self.assertEqual(layer.kernel.dtype, np.int8)
+            self.assertEqual(layer.kernel.nbytes * 8, self.model.layers[1].weights.nbytes)
+            self.assertTrue(np.array_equal(loaded.predict(self.x, verbose=False), quantized.predict(self.x, verbose=False)))
+
+if __name__ == '__main__':
+    unittest.main()
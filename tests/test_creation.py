@@ -47,6 +47,38 @@ class Test_Creation(unittest.TestCase):
         self.assertEqual(len(model.layers), 3, "number of layers incorrect")
 
 
+    def test_seeded_creation(self):
+        import neura
+        import numpy as np
+
+        def create(seed):
+            return neura.model.Model([
+                neura.layers.Dense(16, input_shape=(8,), bias=True),
+                neura.layers.Dense(4, kernel_initializer="glorot_normal"),
+            ], seed=seed)
+
+        self.assertTrue(np.array_equal(create(1).get_weights(), create(1).get_weights()), "same seed, different weights")
+        self.assertFalse(np.array_equal(create(1).get_weights(), create(2).get_weights()), "different seed, same weights")
+
+    def test_initializers(self):
+        import neura
+        import numpy as np
+
+        generator = np.random.default_rng(0)
+        shape = (400, 300)
+
+        weights = neura.initializers.GlorotUniform()(shape, generator, np.float32)
+        self.assertEqual(weights.dtype, np.float32)
+        self.assertLessEqual(np.abs(weights).max(), np.sqrt(6 / 700))
+
+        weights = neura.initializers.HeNormal()(shape, generator, np.float64)
+        self.assertAlmostEqual(weights.std(), np.sqrt(2 / 400), places=3)
+
+        weights = neura.initializers.Orthogonal()(shape, generator, np.float64)
+        self.assertTrue(np.allclose(weights.T @ weights, np.eye(300)))
+
+        with self.assertRaises(ValueError):
+            neura.layers.Dense(4, kernel_initializer="unknown")
 
 
 if __name__ == '__main__':
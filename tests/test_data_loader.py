@@ -0,0 +1,166 @@
+import os
+import tempfile
+import threading
+import unittest
+import numpy as np
+
+class TestDataLoader(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+        self.x = np.arange(50, dtype=np.float64).reshape(25, 2)
+        self.y = np.arange(25, dtype=np.float64).reshape(25, 1)
+
+    def _collect(self, loader):
+        batches = list(loader)
+        return np.concatenate([x for x, _ in batches]), np.concatenate([y for _, y in batches]), [len(x) for x, _ in batches]
+
+    def test_array_batches(self):
+        from neura.preprocessing import DataLoader
+
+        for prefetch in (0, 1, 3):
+            loader = DataLoader(self.x, self.y, batch_size=10, prefetch=prefetch)
+            x, y, sizes = self._collect(loader)
+
+            self.assertEqual(sizes, [10, 10, 5])
+            self.assertEqual(len(loader), 3)
+            self.assertTrue(np.array_equal(x, self.x))
+            self.assertTrue(np.array_equal(y, self.y))
+
+    def test_memory_mapped_files(self):
+        from neura.preprocessing import ArrayDataset, DataLoader
+
+        x_path = os.path.join(self.directory, "x.npy")
+        y_path = os.path.join(self.directory, "y.npy")
+        np.save(x_path, self.x)
+        np.save(y_path, self.y)
+
+        loader = DataLoader(x_path, y_path, batch_size=8)
+        assert isinstance(loader.dataset, ArrayDataset)
+        self.assertIsInstance(loader.dataset.x, np.memmap)
+
+        x, y, sizes = self._collect(loader)
+        self.assertEqual(sizes, [8, 8, 8, 1])
+        self.assertTrue(np.array_equal(x, self.x))
+        self.assertTrue(np.array_equal(y, self.y))
+
+    def test_chunked_files(self):
+        from neura.preprocessing import ChunkedDataset, DataLoader
+
+        x_files, y_files = [], []
+        for i, (start, stop) in enumerate([(0, 7), (7, 9), (9, 25)]):
+            x_files.append(os.path.join(self.directory, f"x{i}.npy"))
+            y_files.append(os.path.join(self.directory, f"y{i}.npy"))
+            np.save(x_files[-1], self.x[start:stop])
+            np.save(y_files[-1], self.y[start:stop])
+
+        loader = DataLoader(x_files, y_files, batch_size=10)
+        x, y, sizes = self._collect(loader)
+
+        self.assertEqual(sizes, [10, 10, 5])
+        self.assertTrue(np.array_equal(x, self.x))
+        self.assertTrue(np.array_equal(y, self.y))
+
+        # random access through the chunks, opened only once
+        loader = DataLoader(x_files, y_files, batch_size=4, shuffle=True, seed=0)
+        dataset = loader.dataset
+        assert isinstance(dataset, ChunkedDataset)
+        chunks = list(dataset.chunks())
+        for _ in range(2):
+            x, y, sizes = self._collect(loader)
+            self.assertTrue(np.array_equal(np.sort(x, axis=0), self.x))
+            self.assertTrue(np.array_equal(x[:, 0] // 2, y[:, 0]))
+
+        self.assertEqual(len(dataset), 25)
+        self.assertTrue(all(a is b for a, b in zip(chunks, dataset.chunks())))
+
+    def test_generator(self):
+        from neura.preprocessing import DataLoader
+
+        def batches():
+            for start in range(0, 25, 6):
+                yield self.x[start:start + 6], self.y[start:start + 6]
+
+        loader = DataLoader(batches)
+        for _ in range(2):
+            x, y, sizes = self._collect(loader)
+            self.assertEqual(sizes, [6, 6, 6, 6, 1])
+            self.assertTrue(np.array_equal(x, self.x))
+
+    def test_errors_and_early_stop(self):
+        from neura.preprocessing import DataLoader
+
+        def failing():
+            yield self.x[:2], self.y[:2]
+            raise OSError("unreadable")
+
+        with self.assertRaises(OSError):
+            list(DataLoader(failing))
+
+        threads = threading.active_count()
+        for _ in DataLoader(self.x, self.y, batch_size=1, prefetch=1):
+            break
+        self.assertEqual(threading.active_count(), threads, "the loading thread is still running")
+
+        with self.assertRaises(ValueError):
+            DataLoader(self.x, self.y[:3])
+
+    def test_model_with_loader(self):
+        import neura
+        from neura.preprocessing import DataLoader
+
+        model = neura.model.Model([
+            neura.layers.Dense(4, input_shape=(2,), activation="tanh"),
+            neura.layers.Dense(1, activation="linear"),
+        ], seed=0)
+        model.compile(loss=neura.losses.MeanSquaredError(), optimizer=neura.optimizers.SGD(.05))
+
+        y = self.y / 25
+        loader = DataLoader(self.x / 50, y, batch_size=5)
+
+        self.assertAlmostEqual(model.evaluate(loader)[0], model.evaluate(self.x / 50, y)[0])
+        before = model.evaluate(loader)[0]
+        model.train(loader, epochs=3, verbose=False)
+        self.assertLess(model.evaluate(loader)[0], before)
+
+    def test_shuffle(self):
+        from neura.preprocessing import DataLoader
+
+        x_files, y_files = [], []
+        for i, (start, stop) in enumerate([(0, 10), (10, 25)]):
+            x_files.append(os.path.join(self.directory, f"x{i}.npy"))
+            y_files.append(os.path.join(self.directory, f"y{i}.npy"))
+            np.save(x_files[-1], self.x[start:stop])
+            np.save(y_files[-1], self.y[start:stop])
+
+        for x_source, y_source in ((self.x, self.y), (x_files, y_files)):
+            loader = DataLoader(x_source, y_source, batch_size=4, shuffle=True, seed=1)
+            x1, y1, sizes = self._collect(loader)
+            x2, _, _ = self._collect(loader)
+
+            self.assertEqual(sizes, [4] * 6 + [1])
+            self.assertTrue(np.array_equal(x1[:, 0] / 2, y1[:, 0]), "samples and labels are not aligned")
+            self.assertTrue(np.array_equal(np.sort(y1[:, 0]), self.y[:, 0]), "every sample must appear once")
+            self.assertFalse(np.array_equal(x1, x2), "the order must change every epoch")
+
+            same_seed = DataLoader(x_source, y_source, batch_size=4, shuffle=True, seed=1)
+            self.assertTrue(np.array_equal(self._collect(same_seed)[0], x1))
+
+        with self.assertRaises(ValueError):
+            DataLoader(lambda: iter(()), shuffle=True)
+
+    def test_reuse_buffers(self):
+        from neura.preprocessing import DataLoader
+
+        loader = DataLoader(self.x, self.y, batch_size=4, prefetch=0, shuffle=True, reuse_buffers=True)
+        seen = []
+        buffers = set()
+        for x, y in loader:
+            self.assertTrue(np.array_equal(x[:, 0] / 2, y[:, 0]))
+            seen.extend(y[:, 0])
+            buffers.add(x.__array_interface__["data"][0])
+
+        self.assertEqual(sorted(seen), list(self.y[:, 0]))
+        self.assertLessEqual(len(buffers), 2)
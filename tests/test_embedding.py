@@ -0,0 +1,109 @@
+import os
+import tempfile
+import unittest
+from typing import Any
+import numpy as np
+
+class TestEmbedding(unittest.TestCase):
+    def _ids(self, *shape: int) -> Any:
+        # integer ids, while the inputs of a model are typed as float arrays
+        return np.random.randint(0, 50, shape)
+
+    def _create_model(self, optimizer):
+        import neura
+
+        model = neura.model.Model([
+            neura.layers.Embedding(50, 4, input_shape=(3,)),
+            neura.layers.Flatten(),
+            neura.layers.Dense(2, activation="tanh", bias=True),
+        ], seed=0)
+        model.compile(loss=neura.losses.MeanSquaredError(), optimizer=optimizer)
+        return model
+
+    def test_same_as_one_hot_dense(self):
+        import neura
+
+        model = self._create_model(neura.optimizers.SGD(learning_rate=.1))
+        embedding, dense = model.layers[0], model.layers[2]
+
+        # the same network on one-hot vectors: a Dense layer without bias for each position
+        ids = self._ids(8, 3)
+        y = np.random.rand(8, 2)
+        one_hot = np.eye(50)[ids]
+        table, weights, bias = embedding.weights.copy(), dense.weights.copy(), dense.bias.copy()
+
+        self.assertTrue(np.allclose(model.forward(ids), np.tanh((one_hot @ table).reshape(8, -1) @ weights + bias)))
+
+        model.backward(y, model.forward(ids))
+
+        # gradient of the loss with respect to the table, computed through the one-hot vectors
+        delta = 2 * (np.tanh((one_hot @ table).reshape(8, -1) @ weights + bias) - y) / y.size
+        delta *= 1 - np.tanh((one_hot @ table).reshape(8, -1) @ weights + bias) ** 2
+        table_gradient = np.einsum("npv,npd->vd", one_hot, (delta @ weights.T).reshape(8, 3, 4))
+
+        self.assertTrue(np.allclose(embedding.weights, table - .1 * table_gradient))
+
+    def test_only_used_rows_change(self):
+        import neura
+
+        for optimizer in ("sgd", "momentum", "rmsprop", "adam", "adamw"):
+            model = self._create_model(optimizer)
+            table = model.layers[0].weights.copy()
+
+            ids = np.array([[1, 2, 3], [3, 4, 1]])
+            model.train(ids, np.random.rand(2, 2), batch_size=2, epochs=3, verbose=False)
+
+            changed = np.flatnonzero(np.any(model.layers[0].weights != table, axis=1))
+            self.assertEqual(changed.tolist(), [1, 2, 3, 4], f"{optimizer} changed rows that were not used")
+
+            # the table has no dense gradients, and the optimizer keeps only its moments for it
+            self.assertEqual(model.gradients.size, model.parameters.size - 50 * 4)
+            state = model.optimizer._state.get(id(model.layers[0].weights))
+            self.assertTrue(state is None or all(b.shape == (50, 4) for b in state.buffers))
+            self.assertLessEqual(len(state.buffers) if state else 0, 2, f"{optimizer} allocated scratch buffers for the table")
+
+    def test_sparse_updates_match_dense(self):
+        import neura
+
+        # when every row is used, the sparse path is the same as the dense one
+        for name in ("SGD", "Momentum", "RMSProp", "Adam", "AdamW"):
+            dense_optimizer, sparse_optimizer = getattr(neura.optimizers, name)(), getattr(neura.optimizers, name)()
+            dense = np.random.rand(5, 3)
+            sparse = dense.copy()
+
+            for _ in range(3):
+                gradients = np.random.randn(5, 3)
+                dense_optimizer.apply_gradients(dense, gradients)
+                sparse_optimizer.apply_sparse_gradients(sparse, np.arange(5), gradients)
+
+            self.assertTrue(np.allclose(dense, sparse), f"wrong {name} sparse update")
+
+    def test_invalid_ids(self):
+        model = self._create_model("sgd")
+
+        with self.assertRaises(ValueError):
+            model.predict(np.array([[0, 1, 50]]), verbose=False)
+
+        with self.assertRaises(ValueError):
+            model.predict(np.array([[0, 1, .5]]), verbose=False)
+
+    def test_save_load(self):
+        import neura
+
+        model = self._create_model("adam")
+        model.train(self._ids(16, 3), np.random.rand(16, 2), batch_size=4, epochs=1, verbose=False)
+        ids = self._ids(4, 3)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "model.neura")
+            model.save(path)
+            loaded = neura.model.Model.load(path, mmap=False)
+
+        self.assertTrue(np.array_equal(loaded.layers[0].weights, model.layers[0].weights))
+        self.assertTrue(np.allclose(loaded.predict(ids, verbose=False), model.predict(ids, verbose=False)))
+
+        loaded.freeze()
+        self.assertTrue(np.allclose(loaded.predict(ids, verbose=False), model.predict(ids, verbose=False)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+from typing import Any, cast
+import numpy as np
+
+class TestLosses(unittest.TestCase):
+    def _all_losses(self, **kwargs):
+        import neura
+
+        return [
+            neura.losses.MeanAbsoluteError(**kwargs),
+            neura.losses.MeanSquaredError(**kwargs),
+            neura.losses.BinaryCrossEntropy(**kwargs),
+            neura.losses.HingeLoss(**kwargs),
+            neura.losses.LogCoshLoss(**kwargs),
+            neura.losses.HuberLoss(delta=.3, **kwargs),
+            neura.losses.CategoricalCrossEntropy(**kwargs),
+        ]
+
+    def test_reductions(self):
+        import neura
+
+        y_true = np.random.rand(6, 3)
+        y_pred = np.random.rand(6, 3) * .8 + .1
+        weights = np.random.rand(6)
+
+        mse = neura.losses.MeanSquaredError(reduction="none")
+        per_sample = np.mean((y_true - y_pred) ** 2, axis=1)
+        self.assertEqual(mse(y_true, y_pred).shape, (6,))
+        self.assertTrue(np.allclose(mse(y_true, y_pred), per_sample))
+        self.assertTrue(np.allclose(mse(y_true, y_pred, sample_weight=weights), per_sample * weights))
+
+        self.assertTrue(np.isclose(neura.losses.MeanSquaredError()(y_true, y_pred), per_sample.mean()))
+        self.assertTrue(np.isclose(neura.losses.MeanSquaredError(reduction="sum")(y_true, y_pred, sample_weight=weights),
+                                   np.sum(per_sample * weights)))
+
+        cce = neura.losses.CategoricalCrossEntropy(reduction="none")
+        self.assertTrue(np.allclose(cce(y_true, y_pred), -np.sum(y_true * np.log(y_pred), axis=1)))
+
+        with self.assertRaises(ValueError):
+            # not a Reduction on purpose
+            neura.losses.MeanSquaredError(reduction=cast(Any, "average"))
+
+        with self.assertRaises(ValueError):
+            mse(y_true, y_pred, sample_weight=np.ones(5))
+
+    def test_derivatives_match_numerical(self):
+        y_true = np.eye(4)[np.random.randint(0, 4, 5)]
+        y_pred = np.random.rand(5, 4) * .8 + .1
+        weights = np.random.rand(5)
+
+        epsilon = 1e-6
+        for reduction in ("mean", "sum", "none"):
+            for loss in self._all_losses(reduction=reduction):
+                analytical = loss.derivative(y_true, y_pred, sample_weight=weights)
+                numerical = np.zeros_like(y_pred)
+
+                for index in np.ndindex(y_pred.shape):
+                    shifted = y_pred.copy()
+                    shifted[index] += epsilon
+                    loss_plus = np.sum(loss(y_true, shifted, sample_weight=weights))
+                    shifted[index] -= 2 * epsilon
+                    loss_minus = np.sum(loss(y_true, shifted, sample_weight=weights))
+                    numerical[index] = (loss_plus - loss_minus) / (2 * epsilon)
+
+                self.assertTrue(np.allclose(analytical, numerical, atol=1e-5),
+                                f"wrong {type(loss).__name__} derivative ({reduction})")
+
+    def test_out_buffer(self):
+        y_true = np.random.rand(4, 3)
+        y_pred = np.random.rand(4, 3) * .8 + .1
+
+        for loss in self._all_losses():
+            out = np.empty_like(y_pred)
+            result = loss.derivative(y_true, y_pred, out=out)
+            self.assertIs(result, out, f"{type(loss).__name__} did not write in the provided buffer")
+            self.assertTrue(np.allclose(out, loss.derivative(y_true, y_pred)))
+
+    def test_model_sample_weight(self):
+        import neura
+
+        model = neura.model.Model([neura.layers.Dense(2, input_shape=(3,))])
+        model.compile(loss=neura.losses.MeanSquaredError(), optimizer=neura.optimizers.SGD(learning_rate=0))
+
+        x, y = np.random.rand(4, 3), np.random.rand(4, 2)
+        model.compute_gradients(y[:2], model.forward(x[:2]))
+        expected = model.gradients.copy()
+
+        # the samples with no weight do not count (but the batch is still 4 samples long)
+        model.compute_gradients(y, model.forward(x), sample_weight=np.array([2., 2., 0., 0.]))
+        self.assertTrue(np.allclose(model.gradients, expected))
+
+        with self.assertRaises(ValueError):
+            model.compile(loss=neura.losses.MeanSquaredError(reduction="none"))
+
+if __name__ == '__main__':
+    unittest.main()
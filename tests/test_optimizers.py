@@ -0,0 +1,72 @@
+import unittest
+import numpy as np
+
+class TestOptimizers(unittest.TestCase):
+    def _minimize(self, optimizer, steps=500):
+        # minimize f(w) = sum((w - target)^2)
+        target = np.array([1., -2., 3.])
+        weights = np.zeros(3)
+        for _ in range(steps):
+            optimizer.apply_gradients(weights, 2 * (weights - target))
+        return weights, target
+
+    def test_convergence(self):
+        import neura
+
+        for optimizer in [
+            neura.optimizers.SGD(learning_rate=.1),
+            neura.optimizers.Momentum(learning_rate=.05),
+            neura.optimizers.Momentum(learning_rate=.05, nesterov=True),
+            neura.optimizers.RMSProp(learning_rate=.05),
+            neura.optimizers.Adam(learning_rate=.1),
+            neura.optimizers.AdamW(learning_rate=.1, weight_decay=0),
+        ]:
+            weights, target = self._minimize(optimizer)
+            self.assertTrue(np.allclose(weights, target, atol=1e-2), f"{optimizer.name} did not converge")
+
+    def test_adam_step(self):
+        import neura
+
+        optimizer = neura.optimizers.Adam(learning_rate=.1)
+        weights = np.array([1., 2.])
+        m = np.zeros(2)
+        v = np.zeros(2)
+
+        expected = weights.copy()
+        for t in range(1, 4):
+            gradients = np.array([.5, -1.]) * t
+            m = .9 * m + .1 * gradients
+            v = .999 * v + .001 * gradients ** 2
+            m_hat = m / (1 - .9 ** t)
+            v_hat = v / (1 - .999 ** t)
+            expected -= .1 * m_hat / (np.sqrt(v_hat) + 1e-7)
+
+            optimizer.apply_gradients(weights, gradients)
+
+        self.assertTrue(np.allclose(weights, expected), "wrong Adam update")
+
+    def test_state_buffers_reused(self):
+        import neura
+
+        optimizer = neura.optimizers.Adam()
+        weights = np.zeros(4)
+        optimizer.apply_gradients(weights, np.ones(4))
+        buffers = optimizer.get_state(weights, buffers=3).buffers
+
+        optimizer.apply_gradients(weights, np.ones(4))
+        self.assertTrue(all(a is b for a, b in zip(buffers, optimizer.get_state(weights, buffers=3).buffers)),
+                        "state buffers were reallocated")
+
+    def test_compile_with_name(self):
+        import neura
+
+        model = neura.model.Model([neura.layers.Dense(4, input_shape=(4,))])
+        model.compile(loss=neura.losses.MeanSquaredError(), optimizer="adam")
+        self.assertIsInstance(model.optimizer, neura.optimizers.Adam)
+
+        with self.assertRaises(ValueError):
+            model.compile(loss=neura.losses.MeanSquaredError(), optimizer="unknown")
+
+
+if __name__ == '__main__':
+    unittest.main()
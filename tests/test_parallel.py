@@ -0,0 +1,105 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+
+class TestDataParallel(unittest.TestCase):
+    def _create_model(self):
+        import neura
+
+        model = neura.model.Model([
+            neura.layers.Dense(8, activation="tanh", input_shape=(4,)),
+            neura.layers.Dense(2),
+        ], seed=3)
+        model.compile(loss=neura.losses.MeanSquaredError(), optimizer=neura.optimizers.Adam(learning_rate=0.01))
+        return model
+
+    def setUp(self) -> None:
+        self.x = np.random.rand(50, 4)
+        self.y = np.stack([self.x.sum(axis=1), self.x[:, 0] - self.x[:, 1]], axis=1)
+
+    def test_same_as_single_process(self):
+        expected = self._create_model()
+        expected.train(self.x, self.y, batch_size=7, epochs=3, verbose=False)
+
+        model = self._create_model()
+        model.train(self.x, self.y, batch_size=7, epochs=3, verbose=False, workers=3)
+
+        self.assertTrue(np.allclose(model.parameters, expected.parameters), "parallel training gives different parameters")
+        self.assertNotIsInstance(model.parameters.base, memoryview, "the parameters must be moved out of shared memory")
+
+    def test_loss_reductions(self):
+        import neura
+
+        for reduction in ("mean", "sum"):
+            models = []
+            for workers in (1, 2):
+                model = self._create_model()
+                model.compile(loss=neura.losses.MeanSquaredError(reduction=reduction),
+                              optimizer=neura.optimizers.SGD(learning_rate=0.01))
+                history = model.train(self.x, self.y, batch_size=8, epochs=2, verbose=False, workers=workers)
+                models.append((model, history))
+
+            (expected, expected_history), (model, history) = models
+            self.assertTrue(np.allclose(model.parameters, expected.parameters), f"wrong steps with reduction='{reduction}'")
+            self.assertTrue(np.allclose(history["loss"], expected_history["loss"]))
+
+    def test_trainer_reuse(self):
+        import neura
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "x.npy")
+        np.save(path, self.x)
+
+        expected = self._create_model()
+        model = self._create_model()
+
+        # more workers than samples in a batch, memory mapped inputs and the optimizer state kept
+        with neura.model.DataParallel(model, workers=4) as trainer:
+            for _ in range(2):
+                trainer.train(np.load(path, mmap_mode="r"), self.y, batch_size=3, epochs=1, verbose=False)
+                expected.train(self.x, self.y, batch_size=3, epochs=1, verbose=False)
+            self.assertTrue(trainer.running)
+
+        self.assertFalse(trainer.running)
+        self.assertTrue(np.allclose(model.parameters, expected.parameters))
+
+    def test_memory_mapped_files(self):
+        from unittest import mock
+        from neura.model import parallel
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        x_path, y_path = os.path.join(directory.name, "x.npy"), os.path.join(directory.name, "y.npy")
+        np.save(x_path, self.x)
+        np.save(y_path, self.y)
+
+        share = parallel._SharedArrays.share
+        handles = []
+
+        def record(shared, array):
+            handles.append(share(shared, array))
+            return handles[-1]
+
+        expected = self._create_model()
+        expected.train(self.x, self.y, batch_size=7, epochs=2, verbose=False)
+
+        # the files are reopened by the workers, not copied to shared memory
+        model = self._create_model()
+        with mock.patch.object(parallel._SharedArrays, "share", record):
+            model.train(np.load(x_path, mmap_mode="r"), np.load(y_path, mmap_mode="r"),
+                        batch_size=7, epochs=2, verbose=False, workers=2)
+
+        self.assertEqual([handle[0] for handle in handles], ["memmap", "memmap"])
+        self.assertTrue(np.allclose(model.parameters, expected.parameters))
+
+    def test_invalid_arguments(self):
+        from neura.preprocessing import DataLoader
+
+        model = self._create_model()
+        with self.assertRaises(ValueError):
+            model.train(self.x, self.y, workers=0, verbose=False)
+
+        with self.assertRaises(ValueError):
+            model.train(DataLoader(self.x, self.y), workers=2, verbose=False)
@@ -46,5 +46,78 @@ class TestPredictions(unittest.TestCase):
         model.add_layer(neura.layers.Dense(8))
         self.assertEqual(model.output_shape, (8,), "incorrect model output shape {}".format(model.output_shape))
 
+    def test_dense_matches_nodes(self):
+        import neura
+
+        model = neura.model.Model([
+            neura.layers.Dense(16, activation=neura.activation.LeakyReLu(), input_shape=(8,)),
+            neura.layers.Dense(4, activation="tanh")
+        ])
+
+        layer = model.layers[0]
+        x = np.random.rand(8)
+        expected = np.array([node.calc(x) for node in layer.nodes])
+        self.assertTrue(np.allclose(layer.forward(x[np.newaxis])[0], expected), "dense output differs from its nodes")
+
+        # node weights are views into the weight matrix of the layer
+        layer.nodes[3].weights[0] = 42
+        self.assertEqual(layer.weights[0, 3], 42, "node weights are not a view of the layer weights")
+
+    def test_batch_prediction(self):
+        import neura
+
+        model = neura.model.Model([
+            neura.layers.Flatten(input_shape=(4, 4)),
+            neura.layers.Dense(8, activation=neura.activation.Sigmoid()),
+            neura.layers.Dropout(.5),
+            neura.layers.Dense(3)
+        ])
+
+        x = np.random.rand(5, 4, 4)
+        prediction = model.predict(x, verbose=False)
+        self.assertEqual(prediction.shape, (5, 3), f"incorrect batch output shape {prediction.shape}")
+
+        for i, sample in enumerate(x):
+            self.assertTrue(np.allclose(model.predict(sample, verbose=False), prediction[i]),
+                            "batch prediction differs from single sample prediction")
+
+    def test_frozen_plan(self):
+        import neura
+
+        model = neura.model.Model([
+            neura.layers.Flatten(input_shape=(4, 3)),
+            neura.layers.Reshape((3, 4)),
+            neura.layers.Flatten(),
+            neura.layers.Dense(16, activation=neura.activation.Swish()),
+            neura.layers.Dropout(.5),
+            neura.layers.Dense(6, activation="linear"),
+            neura.layers.Reshape((2, 3)),
+        ])
+        model.compile(loss=neura.losses.MeanSquaredError(), optimizer=neura.optimizers.SGD(.1))
+
+        x = np.random.rand(5, 4, 3)
+        expected = model.predict(x, verbose=False)
+
+        model.freeze()
+        # reshape (the first 3 layers), dense, dense, reshape: dropout is removed
+        assert model._plan is not None
+        self.assertEqual(len(model._plan.steps), 4)
+        self.assertTrue(np.allclose(model.predict(x, verbose=False), expected), "the plan predicts differently")
+        self.assertTrue(np.allclose(model.predict(x[0], verbose=False), expected[0]))
+
+        # training still goes through the layers, and the plan sees the new parameters
+        model.train(x, np.zeros((5, 2, 3)), batch_size=5, epochs=1, verbose=False)
+        model.unfreeze()
+        expected = model.predict(x, verbose=False)
+        model.freeze()
+        self.assertTrue(np.allclose(model.predict(x, verbose=False), expected))
+
+        copy = model.copy()
+        copy.parameters[:] = 0
+        self.assertTrue(np.allclose(model.predict(x, verbose=False), expected), "the copy shares the plan")
+
+        with self.assertRaises(ValueError):
+            model.predict(np.random.rand(5, 3, 4), verbose=False)
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
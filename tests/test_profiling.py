@@ -0,0 +1,86 @@
+import io
+import unittest
+import contextlib
+from typing import cast
+import numpy as np
+
+class TestProfiling(unittest.TestCase):
+    def _create_model(self):
+        import neura
+
+        model = neura.model.Model([
+            neura.layers.Flatten(input_shape=(2, 3)),
+            neura.layers.Dense(8, activation="relu"),
+            neura.layers.Dense(2),
+        ])
+        model.compile(loss=neura.losses.MeanSquaredError())
+        return model
+
+    def test_hook_calls(self):
+        import neura
+
+        calls = []
+
+        class Recorder(neura.profiling.Hook):
+            def pre_forward(self, index, layer, x):
+                calls.append(("pre_forward", index, np.shape(x)))
+
+            def post_forward(self, index, layer, outputs):
+                calls.append(("post_forward", index, np.shape(outputs)))
+
+            def pre_backward(self, index, layer, output_gradients):
+                calls.append(("pre_backward", index, np.shape(output_gradients)))
+
+            def post_backward(self, index, layer, input_gradients):
+                calls.append(("post_backward", index, np.shape(input_gradients) if input_gradients is not None else None))
+
+        model = self._create_model()
+        recorder = Recorder()
+        model.add_hook(recorder)
+
+        x = np.random.rand(4, 2, 3)
+        model.backward(np.zeros((4, 2)), model.forward(x))
+
+        self.assertEqual(calls, [
+            ("pre_forward", 0, (4, 2, 3)), ("post_forward", 0, (4, 6)),
+            ("pre_forward", 1, (4, 6)), ("post_forward", 1, (4, 8)),
+            ("pre_forward", 2, (4, 8)), ("post_forward", 2, (4, 2)),
+            ("pre_backward", 2, (4, 2)), ("post_backward", 2, (4, 8)),
+            ("pre_backward", 1, (4, 8)), ("post_backward", 1, (4, 6)),
+            ("pre_backward", 0, (4, 6)), ("post_backward", 0, None),
+        ])
+
+        model.remove_hook(recorder)
+        calls.clear()
+        model.predict(x, verbose=False)
+        self.assertEqual(calls, [])
+
+        with self.assertRaises(ValueError):
+            # not a Hook on purpose
+            model.add_hook(cast(neura.profiling.Hook, object()))
+
+    def test_profiler(self):
+        import neura
+
+        model = self._create_model()
+        profiler = neura.profiling.Profiler()
+        model.add_hook(profiler)
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            model.train(np.random.rand(10, 2, 3), np.random.rand(10, 2), batch_size=5, epochs=2, verbose=False)
+
+        dense = profiler.layers[1]
+        self.assertEqual(dense.type, "Dense")
+        self.assertEqual((dense.forward_calls, dense.backward_calls), (4, 4))
+        self.assertGreater(dense.total_time, 0)
+        # 2 operations per weight and sample, plus the outputs
+        self.assertEqual(dense.flops, 4 * (2 * 5 * 48 + 5 * 8) + 4 * (4 * 5 * 48 + 5 * 6))
+        # Flatten returns views and does no matrix product
+        self.assertEqual((profiler.layers[0].flops, profiler.layers[0].bytes), (0, 0))
+        # its outputs and the gradients of its input
+        self.assertEqual(dense.bytes, 4 * 5 * 8 * 8 + 4 * 5 * 6 * 8)
+
+        report = output.getvalue()
+        self.assertIn("Dense", report)
+        self.assertIn("Flatten", report)
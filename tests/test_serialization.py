@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+
+class TestSerialization(unittest.TestCase):
+    def setUp(self) -> None:
+        import neura
+
+        self.model = neura.model.Model([
+            neura.layers.Flatten(input_shape=(4, 4)),
+            neura.layers.Dense(8, activation=neura.activation.PReLU(.3), bias=True),
+            neura.layers.Dropout(.2, seed=1),
+            neura.layers.Dense(6, activation="sigmoid"),
+            neura.layers.Reshape((2, 3)),
+        ], name="Saved")
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "model.neura")
+
+    def test_save_load(self):
+        import neura
+
+        x = np.random.rand(3, 4, 4)
+        expected = self.model.predict(x, verbose=False)
+        self.model.save(self.path)
+
+        for mmap in (True, False):
+            model = neura.model.Model.load(self.path, mmap=mmap)
+
+            self.assertEqual(model.name, "Saved")
+            self.assertEqual([type(l) for l in model.layers], [type(l) for l in self.model.layers])
+            self.assertEqual(model.output_shape, (2, 3))
+            self.assertTrue(np.array_equal(model.get_weights(), self.model.get_weights()))
+            self.assertTrue(np.allclose(model.predict(x, verbose=False), expected), "loaded model predicts differently")
+            self.assertEqual(isinstance(model.parameters, np.memmap), mmap)
+            del model
+
+    def test_mmap_does_not_modify_file(self):
+        import neura
+
+        self.model.save(self.path)
+        with open(self.path, "rb") as fp:
+            content = fp.read()
+
+        model = neura.model.Model.load(self.path, mmap=True)
+        model.layers[1].weights += 1
+        del model
+
+        with open(self.path, "rb") as fp:
+            self.assertEqual(fp.read(), content, "the model file was modified")
+
+    def test_invalid_file(self):
+        import neura
+
+        with open(self.path, "wb") as fp:
+            fp.write(b"not a model")
+
+        with self.assertRaises(ValueError):
+            neura.model.Model.load(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import asyncio
+import unittest
+import numpy as np
+
+class TestServing(unittest.TestCase):
+    def setUp(self) -> None:
+        import neura
+
+        self.model = neura.model.Model([
+            neura.layers.Dense(6, activation="relu", input_shape=(3,)),
+            neura.layers.Dense(2, activation="sigmoid"),
+        ], seed=0)
+
+    def test_batched_predictions(self):
+        import neura
+
+        x = np.random.rand(10, 3)
+        expected = self.model.predict(x, verbose=False)
+
+        async def client():
+            async with neura.serving.BatchingServer(self.model, max_batch_size=4, max_wait=.2) as server:
+                results = await asyncio.gather(*(server.predict(sample) for sample in x))
+            return results, server.stats
+
+        results, stats = asyncio.run(client())
+
+        self.assertTrue(np.allclose(np.stack(results), expected), "batched predictions differ")
+        self.assertEqual(stats.requests, 10)
+        self.assertEqual(stats.batches, 3)
+        self.assertAlmostEqual(stats.mean_batch_size, 10 / 3)
+        self.assertGreater(stats.mean_latency, 0)
+        self.assertGreaterEqual(stats.max_latency, stats.mean_latency)
+
+    def test_max_wait(self):
+        import neura
+
+        async def client():
+            server = neura.serving.BatchingServer(self.model, max_batch_size=64, max_wait=0)
+            first = await server.predict(np.ones(3))
+            second = await server.predict(np.zeros(3))
+            await server.stop()
+            return first, second, server.stats
+
+        first, second, stats = asyncio.run(client())
+
+        self.assertEqual(first.shape, (2,))
+        self.assertTrue(np.allclose(second, self.model.predict(np.zeros(3), verbose=False)))
+        self.assertEqual(stats.batches, 2, "requests should not wait for a full batch")
+
+    def test_invalid_input(self):
+        import neura
+
+        async def client():
+            async with neura.serving.BatchingServer(self.model) as server:
+                with self.assertRaises(ValueError):
+                    await server.predict(np.ones((2, 3)))
+                return await server.predict(np.ones(3))
+
+        self.assertEqual(asyncio.run(client()).shape, (2,))
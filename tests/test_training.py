@@ -0,0 +1,361 @@
+import unittest
+import numpy as np
+
+class TestTraining(unittest.TestCase):
+    def _create_model(self):
+        import neura
+
+        model = neura.model.Model([
+            neura.layers.Dense(8, activation="tanh", input_shape=(4,)),
+            neura.layers.Dropout(.1),
+            neura.layers.Dense(2)
+        ])
+        model.compile(loss=neura.losses.MeanSquaredError(), optimizer=neura.optimizers.SGD(learning_rate=0.01))
+        return model
+
+    def test_loss_decreases(self):
+        model = self._create_model()
+
+        x = np.random.rand(50, 4)
+        y = np.stack([x.sum(axis=1), x[:, 0] - x[:, 1]], axis=1)
+
+        initial_loss = model.evaluate(x, y)[0]
+        model.train(x, y, batch_size=8, epochs=20, verbose=False)
+        final_loss = model.evaluate(x, y)[0]
+
+        self.assertLess(final_loss, initial_loss, "training did not reduce the loss")
+
+    def test_shuffled_training(self):
+        model = self._create_model()
+
+        x = np.random.rand(50, 4)
+        y = np.stack([x.sum(axis=1), x[:, 0] - x[:, 1]], axis=1)
+        x_copy, y_copy = x.copy(), y.copy()
+
+        initial_loss = model.evaluate(x, y)[0]
+        model.train(x, y, batch_size=8, epochs=20, shuffle=True, verbose=False)
+
+        self.assertLess(model.evaluate(x, y)[0], initial_loss, "training did not reduce the loss")
+        self.assertTrue(np.array_equal(x, x_copy) and np.array_equal(y, y_copy), "the data must not be modified")
+
+    def test_training_flag_reset(self):
+        model = self._create_model()
+
+        x = np.random.rand(10, 4)
+        y = np.random.rand(10, 2)
+
+        # 10 samples with a batch size of 4 leave a partial batch of 2
+        model.train(x, y, batch_size=4, epochs=1, verbose=False)
+        self.assertFalse(any(layer.training for layer in model.layers), "layers left in training mode")
+
+    def test_invalid_batch_size(self):
+        model = self._create_model()
+
+        with self.assertRaises(ValueError):
+            model.train(np.random.rand(10, 4), np.random.rand(10, 2), batch_size=0, verbose=False)
+
+    def test_invalid_dropout_rate(self):
+        import neura
+
+        for rate in (1, 1.5, -.1):
+            with self.assertRaises(ValueError):
+                neura.layers.Dropout(rate)
+
+    def test_gradients_match_numerical(self):
+        import neura
+
+        model = neura.model.Model([
+            neura.layers.Flatten(input_shape=(2, 3)),
+            neura.layers.Dense(5, activation="tanh", bias=True),
+            neura.layers.Dense(2, activation="sigmoid", bias=True)
+        ])
+        model.compile(loss=neura.losses.MeanSquaredError(), optimizer=neura.optimizers.SGD(learning_rate=0))
+
+        x = np.random.rand(4, 2, 3)
+        y = np.random.rand(4, 2)
+        model.backward(y, model.forward(x))
+
+        epsilon = 1e-6
+        for layer in model.layers[1:]:
+            for params, analytical in ((layer.weights, layer.weights_gradient), (layer.bias, layer.bias_gradient)):
+                numerical = np.zeros_like(params)
+
+                for index in np.ndindex(params.shape):
+                    original = params[index]
+                    params[index] = original + epsilon
+                    loss_plus = model.evaluate(x, y)[0]
+                    params[index] = original - epsilon
+                    loss_minus = model.evaluate(x, y)[0]
+                    params[index] = original
+                    numerical[index] = (loss_plus - loss_minus) / (2 * epsilon)
+
+                self.assertTrue(np.allclose(analytical, numerical, atol=1e-6), "wrong gradients")
+
+    def test_flat_parameters(self):
+        model = self._create_model()
+
+        # every layer holds views into the parameters of the model
+        model.parameters.fill(1)
+        self.assertTrue(all(np.all(layer.weights == 1) for layer in model.layers))
+        self.assertTrue(all(np.all(node.weights == 1) for node in model.layers[0].nodes))
+
+        weights = model.get_weights()
+        copy = model.copy()
+        model.train(np.random.rand(10, 4), np.random.rand(10, 2), epochs=1, verbose=False)
+
+        self.assertFalse(np.array_equal(weights, model.get_weights()), "training did not change the parameters")
+        self.assertTrue(np.array_equal(weights, copy.get_weights()), "the copy was modified")
+
+        copy.layers[0].weights[0, 0] = 5
+        self.assertEqual(copy.parameters[0], 5, "copied layers are not views into the parameters")
+
+    def test_layers_without_parameters(self):
+        import neura
+
+        model = neura.model.Model([
+            neura.layers.Flatten(input_shape=(28, 28)),
+            neura.layers.Dropout(.1),
+            neura.layers.Reshape((784,)),
+            neura.layers.Dense(10),
+        ])
+
+        self.assertEqual([layer.parameter_count for layer in model.layers[:3]], [0, 0, 0])
+        self.assertEqual(model.parameters.size, 784 * 10)
+
+        model.add_layer(neura.layers.Dense(5, bias=True))
+        self.assertIn(f"Total number of parameters: {784 * 10 + 10 * 5 + 5}", model.summary(verbose=False))
+
+    def test_frozen_layers(self):
+        import neura
+
+        x = np.random.rand(20, 4)
+        y = np.random.rand(20, 2)
+
+        for optimizer in ("adam", "adamw", "momentum"):
+            # frozen from the start, or after the optimizer has built some state
+            for epochs_before in (0, 2):
+                model = neura.model.Model([
+                    neura.layers.Dense(8, activation="tanh", input_shape=(4,), bias=True),
+                    neura.layers.Dense(2),
+                ], seed=0)
+                model.compile(loss=neura.losses.MeanSquaredError(), optimizer=optimizer)
+                if epochs_before:
+                    model.train(x, y, batch_size=4, epochs=epochs_before, verbose=False)
+
+                frozen = model.layers[0]
+                frozen.trainable = False
+                weights, bias, other = frozen.weights.copy(), frozen.bias.copy(), model.layers[1].weights.copy()
+                model.train(x, y, batch_size=4, epochs=2, verbose=False)
+
+                self.assertTrue(np.array_equal(frozen.weights, weights), f"{optimizer} changed the frozen weights")
+                self.assertTrue(np.array_equal(frozen.bias, bias), f"{optimizer} changed the frozen bias")
+                self.assertFalse(np.array_equal(model.layers[1].weights, other))
+
+    def test_float32(self):
+        import neura
+
+        model = neura.model.Model([
+            neura.layers.Flatten(input_shape=(2, 2)),
+            neura.layers.Dense(8, activation=neura.activation.PReLU(.2), bias=True),
+            neura.layers.Dropout(.1),
+            neura.layers.Dense(3, activation="sigmoid")
+        ], dtype="float32")
+        model.compile(loss=neura.losses.BinaryCrossEntropy(), optimizer="adam")
+
+        x = np.random.rand(10, 2, 2)
+        y = np.random.rand(10, 3)
+        model.train(x, y, batch_size=4, epochs=2, verbose=False)
+
+        self.assertEqual(model.parameters.dtype, np.float32)
+        self.assertEqual(model.gradients.dtype, np.float32)
+        self.assertEqual(model.predict(x, verbose=False).dtype, np.float32)
+        self.assertTrue(all(b.dtype == np.float32 for s in model.optimizer._state.values() for b in s.buffers))
+
+    def test_default_dtype(self):
+        import neura
+
+        neura.utils.set_floatx("float32")
+        self.addCleanup(neura.utils.set_floatx, "float64")
+        self.assertEqual(neura.model.Model().dtype, np.float32)
+
+        with self.assertRaises(ValueError):
+            neura.utils.set_floatx("int32")
+
+    def test_workspace(self):
+        import tracemalloc
+        import neura
+
+        def create():
+            model = neura.model.Model([
+                neura.layers.Flatten(input_shape=(4, 4)),
+                neura.layers.Dense(32, activation="relu"),
+                neura.layers.Dropout(.2, seed=1),
+                neura.layers.Dense(3, activation="softmax"),
+            ], seed=0)
+            model.compile(loss=neura.losses.MeanSquaredError(), optimizer="adam")
+            return model
+
+        x = np.random.rand(20, 4, 4)
+        y = np.random.rand(20, 3)
+
+        expected = create()
+        expected.train(x, y, batch_size=8, epochs=2, verbose=False)
+
+        model = create()
+        model.use_workspace()
+        model.train(x, y, batch_size=8, epochs=2, verbose=False)
+        self.assertTrue(np.allclose(model.parameters, expected.parameters), "the workspace changes the training")
+
+        # the predictions are not overwritten by the next batch
+        first = model.predict(x[:8], verbose=False)
+        model.predict(x[8:16], verbose=False)
+        self.assertTrue(np.allclose(first, expected.predict(x[:8], verbose=False)))
+
+        # once the buffers exist, a training step allocates almost nothing:
+        # neither a full batch of activations nor a copy of the parameters
+        x, y = np.random.rand(256, 16, 16), np.random.rand(256, 3)
+        for optimizer in ("adam", "sgd"):
+            for activation in ("relu", "swish", "leakyrelu", "prelu"):
+                model = neura.model.Model([
+                    neura.layers.Flatten(input_shape=(16, 16)),
+                    neura.layers.Dense(64, activation=activation),
+                    neura.layers.Dropout(.2, seed=1),
+                    neura.layers.Dense(3, activation="softmax"),
+                ], seed=0)
+                model.compile(loss=neura.losses.MeanSquaredError(), optimizer=optimizer)
+                model.use_workspace()
+
+                model._set_training(True)
+                model.backward(y, model.forward(x))
+                tracemalloc.start()
+                try:
+                    model.backward(y, model.forward(x))
+                    peak = tracemalloc.get_traced_memory()[1]
+                finally:
+                    tracemalloc.stop()
+                    model._set_training(False)
+
+                self.assertLess(peak, min(model.parameters.nbytes, 256 * 64 * 8) / 4,
+                                f"a training step with {optimizer} and {activation} allocated a large array")
+
+        # nor does computing the loss and the metrics of a batch
+        x, y = np.random.rand(512, 8), np.random.rand(512, 64)
+        for loss in (neura.losses.MeanSquaredError(), neura.losses.BinaryCrossEntropy(), neura.losses.HuberLoss(),
+                     neura.losses.LogCoshLoss(), neura.losses.CategoricalCrossEntropy()):
+            model = neura.model.Model([neura.layers.Dense(64, activation="sigmoid", input_shape=(8,))], seed=0)
+            model.compile(loss=loss, optimizer="sgd", metrics=["mae", "mse"])
+            model.use_workspace()
+
+            y_pred = model.forward(x)
+            expected_logs = model._batch_logs(y, y_pred)
+            tracemalloc.start()
+            try:
+                logs = model._batch_logs(y, y_pred)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+            self.assertEqual(logs, expected_logs)
+            self.assertLess(peak, y.nbytes / 4, f"the logs of {type(loss).__name__} allocated a large array")
+
+    def test_softmax_cross_entropy(self):
+        import warnings
+        import neura
+
+        model = neura.model.Model([
+            neura.layers.Dense(5, activation="tanh", input_shape=(3,)),
+            neura.layers.Dense(4, activation="softmax")
+        ])
+        model.compile(loss=neura.losses.CategoricalCrossEntropy(), optimizer=neura.optimizers.SGD(learning_rate=0))
+
+        x = np.random.rand(6, 3)
+        y = np.eye(4)[np.random.randint(0, 4, 6)]
+        model.backward(y, model.forward(x))
+
+        epsilon = 1e-6
+        layer = model.layers[0]
+        numerical = np.zeros_like(layer.weights)
+        for index in np.ndindex(layer.weights.shape):
+            original = layer.weights[index]
+            layer.weights[index] = original + epsilon
+            loss_plus = model.evaluate(x, y)[0]
+            layer.weights[index] = original - epsilon
+            loss_minus = model.evaluate(x, y)[0]
+            layer.weights[index] = original
+            numerical[index] = (loss_plus - loss_minus) / (2 * epsilon)
+
+        self.assertTrue(np.allclose(layer.weights_gradient, numerical, atol=1e-6), "wrong gradients")
+
+        # the loss of the logits is the loss of the probabilities
+        logits = np.random.randn(6, 4)
+        probabilities = neura.activation.Softmax().apply_formula(logits)
+        loss = neura.losses.CategoricalCrossEntropy()
+        from_logits = neura.losses.CategoricalCrossEntropy(from_logits=True)
+        self.assertTrue(np.isclose(from_logits(y, logits), loss(y, probabilities)))
+        self.assertTrue(np.allclose(from_logits.derivative(y, logits), (probabilities - y) / 6))
+
+        # large logits: no overflow, and a loss that keeps growing instead of being clipped
+        logits = np.array([[1000., -1000., 0., 0.]])
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            value = from_logits(np.array([[0., 1., 0., 0.]]), logits)
+            gradient = from_logits.derivative(np.array([[0., 1., 0., 0.]]), logits)
+        self.assertTrue(np.isclose(value, 2000))
+        self.assertTrue(np.allclose(gradient, [[1, -1, 0, 0]]))
+
+    def test_checkpointing(self):
+        import tracemalloc
+        import neura
+
+        def create():
+            model = neura.model.Model([
+                neura.layers.Flatten(input_shape=(4, 4)),
+                *[layer for _ in range(4) for layer in (neura.layers.Dense(64, activation="tanh"),
+                                                         neura.layers.Dropout(.2, seed=1))],
+                neura.layers.Dense(3, activation="softmax"),
+            ], seed=0)
+            model.compile(loss=neura.losses.CategoricalCrossEntropy(), optimizer="adam")
+            return model
+
+        x = np.random.rand(20, 4, 4)
+        y = np.eye(3)[np.random.randint(0, 3, 20)]
+
+        expected = create()
+        expected.train(x, y, batch_size=8, epochs=2, verbose=False)
+
+        for checkpoints in (None, 1, 3, [4, 7]):
+            model = create()
+            model.use_checkpointing(checkpoints)
+            model.train(x, y, batch_size=8, epochs=2, verbose=False)
+            self.assertTrue(np.allclose(model.parameters, expected.parameters), f"checkpoints {checkpoints} change the training")
+
+        def peak_memory(model):
+            x, y = np.random.rand(512, 4, 4), np.eye(3)[np.random.randint(0, 3, 512)]
+            model._set_training(True)
+            tracemalloc.start()
+            try:
+                model.backward(y, model.forward(x))
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+                model._set_training(False)
+
+        model = create()
+        full = peak_memory(model)
+        model.use_checkpointing(3)
+        self.assertLess(peak_memory(model), full * .75, "checkpointing did not reduce the memory")
+
+        with self.assertRaises(ValueError):
+            model.use_checkpointing([20])
+
+        # the buffers of a workspace would keep every activation
+        with self.assertRaises(ValueError):
+            model.use_workspace()
+
+        model.use_checkpointing(enabled=False)
+        model.use_workspace()
+        with self.assertRaises(ValueError):
+            model.use_checkpointing(3)
+
+if __name__ == '__main__':
+    unittest.main()